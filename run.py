@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 """
 Main entry point for YOLOv8 Inference Validator
+
+Run without arguments to start the GUI, or with a subcommand
+(e.g. ``python run.py batch ...``) to run headless.
 """
 
+import multiprocessing
 import sys
 from pathlib import Path
 
@@ -10,7 +14,14 @@ from pathlib import Path
 src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
-from yolo_validator.app import main
-
 if __name__ == "__main__":
+    # Lets `batch --workers N` start its worker processes from a frozen
+    # build instead of relaunching the application (no-op otherwise)
+    multiprocessing.freeze_support()
+    
+    if len(sys.argv) > 1:
+        from yolo_validator.cli import main as cli_main
+        sys.exit(cli_main())
+
+    from yolo_validator.app import main
     main()
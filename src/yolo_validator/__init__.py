@@ -8,6 +8,12 @@ __author__ = "Ketan Kolge"
 __email__ = "k_kolge@yahoo.com"
 __license__ = "MIT"
 
-from .app import YOLOValidatorApp
-
 __all__ = ['YOLOValidatorApp']
+
+
+def __getattr__(name):
+    # Import the GUI lazily so the headless CLI never pulls in tkinter or PIL
+    if name == 'YOLOValidatorApp':
+        from .app import YOLOValidatorApp
+        return YOLOValidatorApp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,17 @@
+"""
+Allow running the package with ``python -m yolo_validator``.
+
+``python -m yolo_validator batch ...`` runs headless; without arguments the
+GUI is started.
+"""
+
+import sys
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        from .cli import main as cli_main
+        sys.exit(cli_main())
+
+    from .app import main
+    main()
@@ -4,22 +4,62 @@ YOLOv8 Inference Validation Tool
 A tkinter-based GUI application for validating YOLOv8 inference results.
 """
 
+from __future__ import annotations
+
+import time
+
+# Start of the GUI import, for the time-to-first-window measurement
+_STARTED = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk
+import importlib
 import os
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .modules.image_loader import ImageCache, ImagePrefetcher
+from .modules.metrics import metrics
+from .widgets import BoxOverlay, ManualEntryPanel, MetricsPanel
+
+# Modules that pull in NumPy, Pillow or PyYAML are imported where they are
+# first used, so the window appears before they load
+if TYPE_CHECKING:
+    from PIL import Image, ImageTk
+    from .modules.validator import InferenceValidator
+    from .modules.label_table import LabelTable
+    from .modules.dataset_loader import DatasetLoader
+    from .modules.session import ValidationSession
+    from .modules.session_journal import SessionJournal
+
+# Imported on a background thread once the window is shown, so that first
+# use does not stall the GUI
+PRELOAD_MODULES = (
+    'numpy',
+    'PIL.ImageTk',
+    '.modules.dataset_loader',
+    '.modules.session',
+    '.modules.session_journal',
+    '.modules.data_exporter',
+)
 
-from .modules.yaml_parser import YAMLParser
-from .modules.validator import InferenceValidator
-from .modules.data_exporter import DataExporter
+# Set to print the time to first window and exit, e.g. to check a build
+STARTUP_CHECK_ENV = 'YOLO_VALIDATOR_STARTUP_CHECK'
 
 
 class YOLOValidatorApp:
     """Main application class for YOLO inference validation."""
     
+    # Memory budget for resized preview images kept for revisits
+    IMAGE_CACHE_BYTES = 256 * 1024 * 1024
+    
+    # Quiet period after the last <Configure> event before re-rendering
+    RESIZE_DEBOUNCE_MS = 150
+    
+    # Milliseconds between checks for dataset loading progress
+    LOADER_POLL_MS = 50
+    
     def __init__(self, root: tk.Tk):
         """Initialize the application."""
         self.root = root
@@ -31,15 +71,41 @@ class YOLOValidatorApp:
         self.class_names: Dict[int, str] = {}
         self.images: List[Path] = []
         self.current_index: int = 0
-        self.validation_data: List[Dict] = []
+        self.session: Optional[ValidationSession] = None
+        self.journal: Optional[SessionJournal] = None
         
         # Validator and exporter
         self.validator: Optional[InferenceValidator] = None
-        self.exporter = DataExporter()
+        self.label_table: Optional[LabelTable] = None
+        
+        # Background decoder for the current image and its neighbours
+        self.image_cache = ImageCache(self.IMAGE_CACHE_BYTES)
+        # Images are decoded once at screen resolution, so resizing the window
+        # re-scales from memory instead of decoding from disk again
+        self.prefetcher = ImagePrefetcher(
+            self.root, cache=self.image_cache,
+            source_size=(self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+        )
+        self.display_size: Optional[Tuple[int, int]] = None
+        self._resize_job: Optional[str] = None
+        
+        # Hit rates of both image caches are shown in the metrics panel
+        metrics.register_cache('preview_cache', self.image_cache)
+        metrics.register_cache('source_cache', self.prefetcher.source_cache)
+        self.metrics_panel: Optional[MetricsPanel] = None
+        self._image_requested_at = 0.0
+        
+        # Background dataset loading; label_table stays None until it finishes
+        self.loader: Optional[DatasetLoader] = None
+        self._preview_requested = False
+        self._single_table: Optional[Tuple[int, LabelTable]] = None
         
         # UI components
         self.current_image_label: Optional[tk.Label] = None
-        self.manual_entry_widgets: Dict[str, ttk.Spinbox] = {}
+        self.manual_panel: Optional[ManualEntryPanel] = None
+        
+        # Detected counts of the current image by class ID (None: no label file)
+        self.current_detection_counts: Optional[Dict[int, int]] = None
         
         self._setup_ui()
         self._bind_shortcuts()
@@ -81,6 +147,11 @@ class YOLOValidatorApp:
         self.folder_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=5)
         ttk.Button(section_frame, text="Browse", command=self._browse_folder).grid(row=0, column=2, padx=5)
         
+        # Walk nested predict folders (the folder entry may also be a glob pattern)
+        self.recursive_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(section_frame, text="Include subfolders",
+                        variable=self.recursive_var).grid(row=0, column=3, padx=5)
+        
         # YAML file selection
         ttk.Label(section_frame, text="Class Config (YAML):").grid(row=1, column=0, sticky=tk.W, padx=5)
         self.yaml_entry = ttk.Entry(section_frame, width=50)
@@ -88,8 +159,9 @@ class YOLOValidatorApp:
         ttk.Button(section_frame, text="Browse", command=self._browse_yaml).grid(row=1, column=2, padx=5)
         
         # Load button
-        ttk.Button(section_frame, text="Load Dataset", command=self._load_dataset, 
-                  style="Accent.TButton").grid(row=2, column=0, columnspan=3, pady=10)
+        self.load_button = ttk.Button(section_frame, text="Load Dataset",
+                                      command=self._load_dataset, style="Accent.TButton")
+        self.load_button.grid(row=2, column=0, columnspan=4, pady=10)
     
     def _create_summary_section(self, parent: ttk.Frame, row: int):
         """Create the summary/statistics section."""
@@ -109,6 +181,12 @@ class YOLOValidatorApp:
         self.progress_label = ttk.Label(summary_container, text="Progress: 0 of 0", 
                                        font=("Arial", 9, "bold"))
         self.progress_label.pack(side=tk.LEFT, padx=5)
+        
+        # Dataset loading progress, shown only while loading
+        self.cancel_load_button = ttk.Button(summary_container, text="Cancel",
+                                             command=self._cancel_loading)
+        self.load_progress = ttk.Progressbar(summary_container, length=200,
+                                             mode='determinate')
     
     def _create_main_content_section(self, parent: ttk.Frame, row: int):
         """Create the main content section with image on left and controls on right."""
@@ -144,9 +222,28 @@ class YOLOValidatorApp:
         self.image_canvas = tk.Canvas(section_frame, bg='gray')
         self.image_canvas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
+        # Persistent canvas items, updated in place for every image
+        self.image_item = self.image_canvas.create_image(0, 0, anchor=tk.CENTER)
+        self.loading_item = self.image_canvas.create_text(
+            0, 0, text="Loading...", fill="white", state=tk.HIDDEN)
+        self.box_overlay = BoxOverlay(self.image_canvas)
+        
         # Image filename label at bottom
         self.filename_label = ttk.Label(section_frame, text="", font=("Arial", 9, "bold"))
         self.filename_label.grid(row=1, column=0, sticky=tk.W, padx=5, pady=2)
+        
+        options_frame = ttk.Frame(section_frame)
+        options_frame.grid(row=1, column=0, sticky=tk.E, padx=5, pady=2)
+        
+        # Overlay toggle - draw predicted boxes over the preview
+        self.show_boxes_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(options_frame, text="Show boxes", variable=self.show_boxes_var,
+                        command=self._toggle_boxes).pack(side=tk.LEFT, padx=5)
+        
+        # Preview quality toggle - full resolution decoding for small objects
+        self.full_quality_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Full quality", variable=self.full_quality_var,
+                        command=self._toggle_full_quality).pack(side=tk.LEFT)
     
     def _create_detection_section(self, parent: ttk.Frame, row: int):
         """Create the detection results section."""
@@ -172,27 +269,20 @@ class YOLOValidatorApp:
         self.detection_text = ttk.Label(self.detection_frame, text="No detections", 
                                        font=("Arial", 9))
         self.detection_text.pack(anchor=tk.W, padx=2, pady=2)
+        
+        # Pool of per-class row labels, reused across images
+        self.detection_rows: List[ttk.Label] = []
+        self.detection_row_texts: List[Optional[str]] = []
+        self.detection_rows_shown = 0
     
     def _create_manual_entry_section(self, parent: ttk.Frame, row: int):
         """Create the manual entry section."""
         section_frame = ttk.LabelFrame(parent, text="Manual Entry", padding="5")
         section_frame.grid(row=row, column=0, sticky=(tk.W, tk.E))
         
-        # Scrollable container for manual entry widgets with limited height
-        canvas = tk.Canvas(section_frame, height=250)
-        scrollbar = ttk.Scrollbar(section_frame, orient="vertical", command=canvas.yview)
-        self.manual_container = ttk.Frame(canvas)
-        
-        self.manual_container.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=self.manual_container, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.grid(row=0, column=0, sticky=(tk.W, tk.E))
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        # Virtualized class list: widgets exist only for the visible rows
+        self.manual_panel = ManualEntryPanel(section_frame)
+        self.manual_panel.grid(row=0, column=0, sticky=(tk.W, tk.E))
     
     def _create_navigation_section(self, parent: ttk.Frame, row: int):
         """Create the navigation and export section."""
@@ -219,6 +309,17 @@ class YOLOValidatorApp:
         self.export_button = ttk.Button(section_frame, text="Export to CSV", 
                                        command=self._export_data, state=tk.DISABLED)
         self.export_button.pack(side=tk.RIGHT, padx=5)
+        
+        # Resume button - load counts from a previous export
+        self.import_button = ttk.Button(section_frame, text="Resume from CSV",
+                                       command=self._import_data, state=tk.DISABLED)
+        self.import_button.pack(side=tk.RIGHT, padx=5)
+        
+        # Threshold button - best confidence threshold for the saved counts
+        self.threshold_button = ttk.Button(section_frame, text="Best Threshold",
+                                          command=self._show_threshold_sweep,
+                                          state=tk.DISABLED)
+        self.threshold_button.pack(side=tk.RIGHT, padx=5)
     
     def _bind_shortcuts(self):
         """Bind keyboard shortcuts."""
@@ -226,6 +327,8 @@ class YOLOValidatorApp:
         self.root.bind('<Right>', lambda e: self._next_image())
         self.root.bind('<Control-s>', lambda e: self._save_current())
         self.root.bind('<Control-e>', lambda e: self._export_data())
+        self.root.bind('<F12>', lambda e: self._toggle_metrics_panel())
+        self.image_canvas.bind('<Configure>', self._on_canvas_configure)
     
     def _browse_folder(self):
         """Browse for results folder."""
@@ -245,7 +348,7 @@ class YOLOValidatorApp:
             self.yaml_entry.insert(0, yaml_file)
     
     def _load_dataset(self):
-        """Load and validate the dataset."""
+        """Start loading and validating the dataset in the background."""
         folder_path = self.folder_entry.get()
         yaml_path = self.yaml_entry.get()
         
@@ -257,48 +360,214 @@ class YOLOValidatorApp:
             messagebox.showerror("Error", "Please select a YAML configuration file")
             return
         
-        try:
-            # Parse YAML
-            self.yaml_file = Path(yaml_path)
-            yaml_parser = YAMLParser(self.yaml_file)
-            self.class_names = yaml_parser.get_class_names()
-            
-            # Initialize validator
-            self.results_folder = Path(folder_path)
-            self.validator = InferenceValidator(self.results_folder, self.class_names)
+        self._reset_dataset()
+        self.summary_label.config(text="Scanning folder...")
+        self.load_button.config(state=tk.DISABLED)
+        self.load_progress.config(mode='indeterminate')
+        self.load_progress.pack(side=tk.LEFT, padx=5)
+        self.cancel_load_button.pack(side=tk.LEFT, padx=5)
+        
+        # Scanning and label parsing run on a worker thread; the dataset
+        # becomes interactive as soon as the image index is complete
+        self.yaml_file = Path(yaml_path)
+        from .modules.dataset_loader import DatasetLoader
+        
+        self.loader = DatasetLoader(folder_path, self.yaml_file,
+                                    recursive=self.recursive_var.get())
+        self.loader.start()
+        self.root.after(self.LOADER_POLL_MS, self._poll_loader)
+    
+    def _reset_dataset(self):
+        """Forget the current dataset and disable dataset actions."""
+        self.validator = None
+        self.label_table = None
+        self.session = None
+        self.journal = None
+        self.images = []
+        self.current_index = 0
+        self._single_table = None
+        self._preview_requested = False
+        
+        self.prefetcher.clear()
+        self.image_cache.clear()
+        self.image_canvas.itemconfigure(self.image_item, state=tk.HIDDEN)
+        self.image_canvas.itemconfigure(self.loading_item, state=tk.HIDDEN)
+        self.box_overlay.clear()
+        self.filename_label.config(text="")
+        self.manual_panel.set_classes([])
+        
+        for button in (self.prev_button, self.next_button, self.save_button,
+                       self.export_button, self.import_button, self.threshold_button):
+            button.config(state=tk.DISABLED)
+    
+    def _finish_loading(self):
+        """Hide the loading progress controls."""
+        self.loader = None
+        self.load_progress.stop()
+        self.load_progress.pack_forget()
+        self.cancel_load_button.pack_forget()
+        self.load_button.config(state=tk.NORMAL)
+    
+    def _cancel_loading(self):
+        """Ask the background loader to stop."""
+        if self.loader is not None:
+            self.loader.cancel()
+            self.summary_label.config(text="Cancelling...")
+    
+    def _poll_loader(self):
+        """Apply progress events from the background loader on the Tk thread."""
+        loader = self.loader
+        if loader is None:
+            return
+        
+        for event in loader.drain():
+            kind = event[0]
             
-            # Get images and validate
-            self.images = self.validator.get_image_files()
+            if kind == 'scan':
+                self._on_scan_progress(*event[1:])
+            elif kind == 'indexed':
+                self._on_dataset_indexed(*event[1:])
+            elif kind == 'labels':
+                self._on_labels_progress(*event[1:])
+            elif kind == 'done':
+                self._on_dataset_loaded(event[1])
+            elif kind == 'cancelled':
+                self._reset_dataset()
+                self._finish_loading()
+                self.summary_label.config(text="Loading cancelled")
+            elif kind == 'error':
+                self._reset_dataset()
+                self._finish_loading()
+                self.summary_label.config(text="No dataset loaded")
+                messagebox.showerror("Error", f"Failed to load dataset: {str(event[1])}")
             
-            if not self.images:
-                messagebox.showerror("Error", "No images found in the results folder")
+            if self.loader is not loader:
                 return
+        
+        self.root.after(self.LOADER_POLL_MS, self._poll_loader)
+    
+    def _on_scan_progress(self, images_found: int, first_image: Path):
+        """Show scan progress and a first preview while the folder is scanned."""
+        self.summary_label.config(text=f"Scanning folder... {images_found} images found")
+        self.load_progress.step()
+        
+        # Show the first image found right away, before the index is sorted
+        if not self._preview_requested:
+            self._preview_requested = True
+            self.prefetcher.request(first_image, self._canvas_size(),
+                                    self._on_preview_decoded)
+    
+    def _on_preview_decoded(self, image_path: Path, canvas_size: Tuple[int, int],
+                            img: Optional[Image.Image], error: Optional[Exception]):
+        """Display the scan preview unless the dataset is already interactive."""
+        if self.session is not None or self.loader is None or error is not None:
+            return
+        
+        self.filename_label.config(text=f"File: {image_path.name}")
+        from PIL import ImageTk
+        
+        self._show_photo(ImageTk.PhotoImage(img), canvas_size, show_boxes=False)
+    
+    def _on_dataset_indexed(self, validator: InferenceValidator, images: List[Path],
+                            validation_summary: Dict):
+        """Make the dataset interactive once the image index is complete."""
+        if not images:
+            self._reset_dataset()
+            self._finish_loading()
+            self.summary_label.config(text="No dataset loaded")
+            messagebox.showerror("Error", "No images found in the results folder")
+            return
+        
+        from .modules.session import ValidationSession
+        from .modules.session_journal import SessionJournal
+        
+        self.validator = validator
+        self.results_folder = validator.results_folder
+        self.class_names = self.loader.class_names
+        self.images = images
+        
+        # Indices of the preview may now refer to other images
+        self.box_overlay.clear()
+        
+        # Detected counts are filled in when the label files are parsed
+        self.session = ValidationSession(validator.get_image_names(),
+                                         self.class_names)
+        
+        # Resume manual counts saved in an earlier session
+        self.journal = SessionJournal(validator.state_folder / SessionJournal.JOURNAL_FILENAME)
+        try:
+            validator.state_folder.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            print(f"Error creating session folder {validator.state_folder}: {e}")
+        restored = self.journal.replay(self.session)
+        if not self.journal.is_compact(self.session):
+            try:
+                self.journal.compact(self.session)
+            except OSError as e:
+                print(f"Error compacting session journal {self.journal.journal_path}: {e}")
+        
+        # Update summary
+        self._update_summary(validation_summary)
+        
+        # Setup manual entry widgets
+        self._setup_manual_entry_widgets()
+        
+        # Load first image (or the first unreviewed one when resuming)
+        self.prefetcher.clear()
+        first_unprocessed = self.session.first_unprocessed()
+        self.current_index = first_unprocessed if first_unprocessed is not None else 0
+        self._load_current_image()
+        
+        # Enable navigation and saving; exports wait for all labels
+        self._update_navigation_buttons()
+        self.save_button.config(state=tk.NORMAL)
+        self.load_progress.stop()
+        self.load_progress.config(mode='determinate', value=0)
+        
+        if restored:
+            self.progress_label.config(
+                text=f"Resumed {self.session.processed_count} previously saved images")
+    
+    def _on_labels_progress(self, files_done: int, total_files: int):
+        """Show label parsing progress."""
+        self.load_progress.config(maximum=max(total_files, 1), value=files_done)
+    
+    def _on_dataset_loaded(self, label_table: LabelTable):
+        """Switch to the complete label table once every label file is parsed."""
+        self.label_table = label_table
+        self._single_table = None
+        num_class_ids = max(self.class_names) + 1 if self.class_names else 0
+        self.session.load_detections(label_table.has_label,
+                                     label_table.count_matrix(num_class_ids))
+        
+        self._finish_loading()
+        self.export_button.config(state=tk.NORMAL)
+        self.import_button.config(state=tk.NORMAL)
+        self.threshold_button.config(state=tk.NORMAL)
+        
+        # Redraw the current image's detections from the full table
+        self._load_detections()
+        self._show_current_image()
+        self._update_progress()
+    
+    def _current_labels(self) -> Tuple[LabelTable, int]:
+        """
+        Get the label table holding the current image and its row in it.
+        
+        While label files are still being parsed in the background, the
+        current image's label file is parsed on its own.
+        """
+        if self.label_table is not None:
+            return self.label_table, self.current_index
+        
+        if self._single_table is None or self._single_table[0] != self.current_index:
+            from .modules.label_table import load_label_table
             
-            # Validate labels
-            validation_summary = self.validator.validate_labels()
-            
-            # Update summary
-            self._update_summary(validation_summary)
-            
-            # Initialize validation data storage
-            self.validation_data = [{"processed": False} for _ in self.images]
-            
-            # Load first image
-            self.current_index = 0
-            self._load_current_image()
-            
-            # Enable navigation
-            self._update_navigation_buttons()
-            self.save_button.config(state=tk.NORMAL)
-            self.export_button.config(state=tk.NORMAL)
-            
-            # Setup manual entry widgets
-            self._setup_manual_entry_widgets()
-            
-            messagebox.showinfo("Success", "Dataset loaded successfully!")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load dataset: {str(e)}")
+            image_path = self.images[self.current_index]
+            self._single_table = (self.current_index, load_label_table(
+                [image_path], [self.validator.get_label_file(image_path)]))
+        
+        return self._single_table[1], 0
     
     def _update_summary(self, validation_summary: Dict):
         """Update the summary section."""
@@ -315,60 +584,21 @@ class YOLOValidatorApp:
     
     def _update_progress(self):
         """Update the progress label."""
-        if not self.validation_data:
+        if not self.session:
             return
         
-        processed = sum(1 for item in self.validation_data if item.get("processed", False))
-        total = len(self.validation_data)
+        processed = self.session.processed_count
+        total = len(self.session)
         
         self.progress_label.config(text=f"Progress: {processed} of {total} processed")
     
     def _setup_manual_entry_widgets(self):
-        """Setup manual entry widgets for all classes."""
-        # Clear existing widgets
-        for widget in self.manual_container.winfo_children():
-            widget.destroy()
-        
-        self.manual_entry_widgets.clear()
-        
-        # Create a compact grid with 2 columns of class entries
-        num_classes = len(self.class_names)
-        mid_point = (num_classes + 1) // 2
-        
-        sorted_classes = sorted(self.class_names.items())
-        
-        # Left column
-        for idx, (class_id, class_name) in enumerate(sorted_classes[:mid_point]):
-            row = idx
-            
-            # Truncate long class names
-            display_name = class_name if len(class_name) <= 25 else class_name[:22] + "..."
-            
-            ttk.Label(self.manual_container, text=display_name, font=("Arial", 8)).grid(
-                row=row, column=0, padx=2, pady=1, sticky=tk.W)
-            
-            spinbox = ttk.Spinbox(self.manual_container, from_=0, to=100, width=5)
-            spinbox.set(0)
-            spinbox.grid(row=row, column=1, padx=2, pady=1, sticky=tk.W)
-            
-            self.manual_entry_widgets[class_name] = spinbox
-        
-        # Right column
-        for idx, (class_id, class_name) in enumerate(sorted_classes[mid_point:]):
-            row = idx
-            
-            # Truncate long class names
-            display_name = class_name if len(class_name) <= 25 else class_name[:22] + "..."
-            
-            ttk.Label(self.manual_container, text=display_name, font=("Arial", 8)).grid(
-                row=row, column=2, padx=2, pady=1, sticky=tk.W)
-            
-            spinbox = ttk.Spinbox(self.manual_container, from_=0, to=100, width=5)
-            spinbox.set(0)
-            spinbox.grid(row=row, column=3, padx=2, pady=1, sticky=tk.W)
-            
-            self.manual_entry_widgets[class_name] = spinbox
+        """Setup the manual entry panel for all classes."""
+        # One row per class name, in class ID order
+        class_names = list(dict.fromkeys(name for _, name in sorted(self.class_names.items())))
+        self.manual_panel.set_classes(class_names)
     
+    @metrics.timed('ui.navigate')
     def _load_current_image(self):
         """Load and display the current image."""
         if not self.images or self.current_index >= len(self.images):
@@ -379,36 +609,7 @@ class YOLOValidatorApp:
         # Update filename label
         self.filename_label.config(text=f"File: {current_image_path.name}")
         
-        # Load and display image
-        try:
-            img = Image.open(current_image_path)
-            
-            # Resize to fit canvas while maintaining aspect ratio
-            canvas_width = self.image_canvas.winfo_width()
-            canvas_height = self.image_canvas.winfo_height()
-            
-            # Use default size if canvas not yet rendered
-            if canvas_width <= 1:
-                canvas_width = 800
-            if canvas_height <= 1:
-                canvas_height = 400
-            
-            img.thumbnail((canvas_width, canvas_height), Image.Resampling.LANCZOS)
-            
-            photo = ImageTk.PhotoImage(img)
-            
-            # Clear canvas and display image
-            self.image_canvas.delete("all")
-            self.image_canvas.create_image(
-                canvas_width // 2, canvas_height // 2, 
-                image=photo, anchor=tk.CENTER
-            )
-            
-            # Keep a reference to prevent garbage collection
-            self.image_canvas.image = photo
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load image: {str(e)}")
+        self._show_current_image()
         
         # Load detection results
         self._load_detections()
@@ -420,113 +621,233 @@ class YOLOValidatorApp:
         self._update_navigation_buttons()
         self._update_progress()
     
+    def _canvas_size(self) -> Tuple[int, int]:
+        """Get the size of the image canvas."""
+        canvas_width = self.image_canvas.winfo_width()
+        canvas_height = self.image_canvas.winfo_height()
+        
+        # Use default size if canvas not yet rendered
+        if canvas_width <= 1:
+            canvas_width = 800
+        if canvas_height <= 1:
+            canvas_height = 400
+        
+        return canvas_width, canvas_height
+    
+    def _show_current_image(self):
+        """Display the current image, decoding it in the background if needed."""
+        current_image_path = self.images[self.current_index]
+        
+        # Resize to fit canvas while maintaining aspect ratio
+        canvas_size = self._canvas_size()
+        canvas_width, canvas_height = canvas_size
+        
+        # Revisited images come from the cache; others are decoded on the
+        # prefetcher's worker threads (immediately if already prefetched)
+        self.display_size = canvas_size
+        self.prefetcher.cancel_stale(current_image_path, canvas_size)
+        photo = self.image_cache.get((current_image_path, canvas_size))
+        
+        if photo is not None:
+            self._show_photo(photo, canvas_size)
+        else:
+            self.image_canvas.itemconfigure(self.image_item, state=tk.HIDDEN)
+            self.image_canvas.coords(self.loading_item, canvas_width // 2, canvas_height // 2)
+            self.image_canvas.itemconfigure(self.loading_item, state=tk.NORMAL)
+            self.box_overlay.hide()
+            self._image_requested_at = time.perf_counter()
+            self.prefetcher.request(current_image_path, canvas_size,
+                                    self._on_image_decoded)
+        
+        self.prefetcher.prefetch(self.images, self.current_index, canvas_size)
+    
+    def _on_canvas_configure(self, event: tk.Event):
+        """Re-render the preview once the canvas has stopped changing size."""
+        if self._resize_job is not None:
+            self.root.after_cancel(self._resize_job)
+        self._resize_job = self.root.after(self.RESIZE_DEBOUNCE_MS, self._on_resize_settled)
+    
+    def _on_resize_settled(self):
+        """Show the current image at the new canvas size."""
+        self._resize_job = None
+        
+        size = (self.image_canvas.winfo_width(), self.image_canvas.winfo_height())
+        if self.images and min(size) > 1 and size != self.display_size:
+            self._show_current_image()
+    
+    def _toggle_metrics_panel(self):
+        """Open or close the performance metrics panel."""
+        if self.metrics_panel is not None and self.metrics_panel.winfo_exists():
+            self.metrics_panel.close()
+            self.metrics_panel = None
+        else:
+            self.metrics_panel = MetricsPanel(self.root, metrics)
+    
+    def _toggle_boxes(self):
+        """Show or hide the box overlay; the image itself is not redrawn."""
+        self.box_overlay.set_visible(self.show_boxes_var.get())
+    
+    def _toggle_full_quality(self):
+        """Switch between fast draft decoding and full resolution decoding."""
+        self.prefetcher.full_quality = self.full_quality_var.get()
+        
+        # Previews decoded in the other mode are no longer wanted
+        self.prefetcher.clear()
+        self.image_cache.clear()
+        
+        if self.images:
+            self._show_current_image()
+    
+    def _on_image_decoded(self, image_path: Path, canvas_size: Tuple[int, int],
+                          img: Optional[Image.Image], error: Optional[Exception]):
+        """Cache a decoded image and display it if it is still the current one."""
+        if (not self.images or self.images[self.current_index] != image_path
+                or canvas_size != self.display_size):
+            return
+        
+        if error is not None:
+            messagebox.showerror("Error", f"Failed to load image: {str(error)}")
+            return
+        
+        from PIL import ImageTk
+        
+        photo = ImageTk.PhotoImage(img)
+        self.image_cache.put((image_path, canvas_size), photo,
+                             img.width * img.height * 4)
+        self._show_photo(photo, canvas_size)
+        
+        # Time the user waited on the loading placeholder
+        if metrics.enabled:
+            metrics.record('ui.image_wait', time.perf_counter() - self._image_requested_at)
+    
+    @metrics.timed('ui.draw_image')
+    def _show_photo(self, photo: ImageTk.PhotoImage, canvas_size: Tuple[int, int],
+                    show_boxes: bool = True):
+        """Display a display-ready image centred on the canvas."""
+        canvas_width, canvas_height = canvas_size
+        center_x, center_y = canvas_width // 2, canvas_height // 2
+        
+        # Display image in the persistent image item
+        self.image_canvas.itemconfigure(self.loading_item, state=tk.HIDDEN)
+        self.image_canvas.coords(self.image_item, center_x, center_y)
+        self.image_canvas.itemconfigure(self.image_item, image=photo, state=tk.NORMAL)
+        
+        # Keep a reference to prevent garbage collection
+        self.image_canvas.image = photo
+        
+        if not show_boxes:
+            self.box_overlay.hide()
+            return
+        
+        import numpy as np
+        
+        # Boxes follow the displayed image rectangle
+        image_box = (center_x - photo.width() // 2, center_y - photo.height() // 2,
+                     photo.width(), photo.height())
+        table, row = self._current_labels()
+        rows = table.image_slice(row)
+        self.box_overlay.draw(
+            (self.current_index, table is self.label_table), table.class_id[rows],
+            np.column_stack((table.x[rows], table.y[rows], table.w[rows], table.h[rows])),
+            image_box
+        )
+    
+    @metrics.timed('ui.detections')
     def _load_detections(self):
         """Load and display detection results for current image."""
         if not self.validator or self.current_index >= len(self.images):
             return
         
-        current_image_path = self.images[self.current_index]
-        detections = self.validator.get_detections(current_image_path)
+        import numpy as np
         
-        # Clear previous detection display
-        for widget in self.detection_frame.winfo_children():
-            widget.destroy()
+        # Count once per image; the counts are shared with the manual entry panel
+        table, row = self._current_labels()
+        if table.has_label[row]:
+            class_ids, counts = np.unique(table.class_id[table.image_slice(row)],
+                                          return_counts=True)
+            self.current_detection_counts = dict(zip(class_ids.tolist(), counts.tolist()))
+        else:
+            self.current_detection_counts = None
         
-        if detections is None:
+        if self.current_detection_counts is None:
             # No label file exists
-            self.detection_text = ttk.Label(
-                self.detection_frame, 
-                text="⚠ No label file\nEnter counts manually",
-                font=("Arial", 8, "bold"),
-                foreground="orange"
-            )
-            self.detection_text.pack(anchor=tk.W, padx=2, pady=2)
-        elif len(detections) == 0:
+            self.detection_text.config(text="⚠ No label file\nEnter counts manually",
+                                       font=("Arial", 8, "bold"), foreground="orange")
+        elif not self.current_detection_counts:
             # Label file exists but is empty
-            self.detection_text = ttk.Label(
-                self.detection_frame, 
-                text="ℹ No objects detected",
-                font=("Arial", 8),
-                foreground="blue"
-            )
-            self.detection_text.pack(anchor=tk.W, padx=2, pady=2)
+            self.detection_text.config(text="ℹ No objects detected",
+                                       font=("Arial", 8), foreground="blue")
         else:
-            # Display detection counts in compact format
-            detection_counts = Counter(detections)
-            
-            # Create grid for compact display
-            for idx, (class_id, count) in enumerate(sorted(detection_counts.items())):
-                class_name = self.class_names.get(class_id, f"Unknown ({class_id})")
-                # Truncate long names
-                display_name = class_name if len(class_name) <= 20 else class_name[:17] + "..."
-                
-                label = ttk.Label(self.detection_frame, 
-                                 text=f"{display_name}: {count}",
-                                 font=("Arial", 8))
-                label.pack(anchor=tk.W, padx=2, pady=1)
-            detection_counts = Counter(detections)
-            
-            text_parts = ["Detected:"]
-            for class_id, count in sorted(detection_counts.items()):
-                class_name = self.class_names.get(class_id, f"Unknown ({class_id})")
-                text_parts.append(f"  • {class_name}: {count}")
-            
-            self.detection_text = ttk.Label(
-                self.detection_frame, 
-                text="\n".join(text_parts),
-                font=("Arial", 10),
-                foreground="green"
-            )
-            self.detection_text.pack(anchor=tk.W, padx=5, pady=5)
+            self.detection_text.config(text="Detected:", font=("Arial", 10),
+                                       foreground="green")
+        
+        lines = []
+        for class_id, count in sorted((self.current_detection_counts or {}).items()):
+            class_name = self.class_names.get(class_id, f"Unknown ({class_id})")
+            # Truncate long names
+            display_name = class_name if len(class_name) <= 20 else class_name[:17] + "..."
+            lines.append(f"  • {display_name}: {count}")
+        
+        self._show_detection_rows(lines)
+    
+    def _show_detection_rows(self, lines: List[str]):
+        """
+        Show one line per detected class, reusing the pooled row labels.
+        
+        Labels are created only when an image has more classes than any
+        image before it; surplus labels are hidden, not destroyed.
+        
+        Args:
+            lines: Text of each row
+        """
+        while len(self.detection_rows) < len(lines):
+            self.detection_rows.append(ttk.Label(self.detection_frame, font=("Arial", 9)))
+            self.detection_row_texts.append(None)
+        
+        for index, line in enumerate(lines):
+            if self.detection_row_texts[index] != line:
+                self.detection_rows[index].config(text=line)
+                self.detection_row_texts[index] = line
+            if index >= self.detection_rows_shown:
+                self.detection_rows[index].pack(anchor=tk.W, padx=5, pady=0)
+        
+        for index in range(len(lines), self.detection_rows_shown):
+            self.detection_rows[index].pack_forget()
+        
+        self.detection_rows_shown = len(lines)
     
+    @metrics.timed('ui.manual_entry')
     def _load_manual_entries(self):
         """Load previously saved manual entries for current image."""
-        if self.current_index >= len(self.validation_data):
+        if not self.session or self.current_index >= len(self.session):
             return
         
-        saved_data = self.validation_data[self.current_index]
-        
-        # Reset all spinboxes first
-        for spinbox in self.manual_entry_widgets.values():
-            spinbox.set(0)
-        
-        # Load saved manual entries if any
-        if "manual_counts" in saved_data:
-            for class_name, count in saved_data["manual_counts"].items():
-                if class_name in self.manual_entry_widgets:
-                    self.manual_entry_widgets[class_name].set(count)
+        # Saved manual entries if any (unsaved images have none); only the
+        # visible rows whose value changed are redrawn
+        self.manual_panel.set_counts(
+            self.session.get_manual_counts(self.current_index),
+            present=[self.class_names[class_id]
+                     for class_id in self.current_detection_counts or {}
+                     if class_id in self.class_names]
+        )
     
     def _save_current(self):
         """Save the current image's validation data."""
-        if self.current_index >= len(self.validation_data):
+        if not self.session or self.current_index >= len(self.session):
             return
         
-        current_image_path = self.images[self.current_index]
-        
-        # Get detected counts
-        detected_counts = {}
-        detections = self.validator.get_detections(current_image_path)
-        if detections:
-            detection_counter = Counter(detections)
-            for class_id, count in detection_counter.items():
-                class_name = self.class_names.get(class_id, f"Unknown ({class_id})")
-                detected_counts[class_name] = count
+        # Detected counts were filled in for every image when the dataset loaded
         
         # Get manual counts
-        manual_counts = {}
-        for class_name, spinbox in self.manual_entry_widgets.items():
-            count = int(spinbox.get())
-            if count > 0:
-                manual_counts[class_name] = count
-        
-        # Save data
-        self.validation_data[self.current_index] = {
-            "image_name": current_image_path.name,
-            "detected_counts": detected_counts,
-            "manual_counts": manual_counts,
-            "has_label_file": detections is not None,
-            "processed": True
-        }
+        manual_counts = self.manual_panel.get_counts()
+        self.manual_panel.mark_used(manual_counts)
+        
+        # Save data, journaling it so a crash does not lose the review
+        self.session.save(self.current_index, manual_counts)
+        try:
+            self.journal.append(self.session, self.current_index)
+        except OSError as e:
+            print(f"Error writing session journal {self.journal.journal_path}: {e}")
         
         self._update_progress()
         
@@ -559,8 +880,8 @@ class YOLOValidatorApp:
         )
     
     def _export_data(self):
-        """Export validation data to CSV."""
-        if not self.validation_data:
+        """Export validation data to CSV, Parquet or Arrow."""
+        if not self.session:
             messagebox.showwarning("Warning", "No data to export")
             return
         
@@ -568,17 +889,124 @@ class YOLOValidatorApp:
         file_path = filedialog.asksaveasfilename(
             title="Save Validation Data",
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[("CSV files", "*.csv"),
+                       ("Parquet files (requires pyarrow)", "*.parquet"),
+                       ("Arrow IPC files (requires pyarrow)", "*.arrow"),
+                       ("All files", "*.*")]
         )
         
         if not file_path:
             return
         
+        from .modules.data_exporter import DataExporter
+        
         try:
-            self.exporter.export_to_csv(self.validation_data, self.class_names, file_path)
+            # Columnar formats are chosen by file extension
+            suffix = Path(file_path).suffix.lower()
+            if suffix in ('.parquet', '.arrow'):
+                DataExporter().export_to_columnar(self.session, file_path,
+                                                  file_format=suffix[1:])
+            else:
+                DataExporter().export_to_csv(self.session, self.class_names, file_path)
             messagebox.showinfo("Success", f"Data exported successfully to:\n{file_path}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export data: {str(e)}")
+    
+    def _import_data(self):
+        """Resume a session from a previously exported CSV."""
+        if not self.session:
+            messagebox.showwarning("Warning", "Load a dataset first")
+            return
+        
+        file_path = filedialog.askopenfilename(
+            title="Resume from Validation CSV",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        
+        if not file_path:
+            return
+        
+        from .modules.data_importer import DataImporter
+        
+        try:
+            # Detected counts stay those of the label files shown in the panel
+            counts = DataImporter().import_csv(Path(file_path), self.session,
+                                               include_detected=False)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to import data: {str(e)}")
+            return
+        
+        # Record the imported state in the journal so it survives a crash too
+        try:
+            self.journal.compact(self.session)
+        except OSError as e:
+            print(f"Error compacting session journal {self.journal.journal_path}: {e}")
+        
+        # Jump to the first image still to be reviewed
+        first_unprocessed = self.session.first_unprocessed()
+        if first_unprocessed is not None:
+            self.current_index = first_unprocessed
+        self._load_current_image()
+        
+        messagebox.showinfo("Success", f"Imported {counts['imported']} images "
+                            f"({counts['skipped']} rows not in this dataset)")
+    
+    @staticmethod
+    def _format_threshold(threshold: float) -> str:
+        """Format a sweep threshold (inf means no detection should be kept)."""
+        return "keep none" if threshold == float('inf') else f"{threshold:.3f}"
+    
+    def _show_threshold_sweep(self):
+        """Show the confidence threshold that best matches the saved manual counts."""
+        if not self.session or not self.session.processed_count:
+            messagebox.showwarning("Warning", "Save manual counts for some images first")
+            return
+        
+        from .modules.threshold_sweep import sweep_confidence
+        
+        try:
+            sweep = sweep_confidence(self.label_table, self.session)
+        except ValueError as e:
+            messagebox.showwarning("Warning", str(e))
+            return
+        
+        lines = [
+            f"Images compared: {self.session.processed_count}",
+            f"Best overall threshold: {self._format_threshold(sweep['overall_best_threshold'])} "
+            f"(count error {sweep['overall_best_error']} of "
+            f"{int(sweep['manual_total'].sum())} objects)",
+            ""
+        ]
+        
+        for column, class_name in enumerate(sweep['class_names']):
+            if sweep['manual_total'][column] or sweep['detected'][column, 0]:
+                lines.append(f"{class_name}: "
+                             f"{self._format_threshold(sweep['best_threshold'][column])} "
+                             f"(error {int(sweep['best_error'][column])})")
+        
+        messagebox.showinfo("Confidence Threshold", "\n".join(lines))
+
+
+def _preload_modules():
+    """Import the modules needed for loading a dataset ahead of first use."""
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name, __package__)
+        except ImportError as e:
+            print(f"Error preloading {name}: {e}")
+
+
+def _on_window_shown(root: tk.Tk):
+    """Record the time to first window and warm up the heavy modules."""
+    elapsed = time.perf_counter() - _STARTED
+    metrics.record('startup.first_window', elapsed)
+    
+    if os.environ.get(STARTUP_CHECK_ENV):
+        print(f"First window after {elapsed * 1000:.0f} ms")
+        root.destroy()
+        return
+    
+    threading.Thread(target=_preload_modules, name='preload', daemon=True).start()
 
 
 def main():
@@ -600,9 +1028,15 @@ def main():
     
     # Create app
     app = YOLOValidatorApp(root)
+    root.after_idle(_on_window_shown, root)
     
     # Run
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        if app.loader is not None:
+            app.loader.cancel()
+        app.prefetcher.shutdown()
 
 
 if __name__ == "__main__":
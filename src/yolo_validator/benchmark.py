@@ -0,0 +1,284 @@
+"""
+Performance benchmarks on synthetic YOLOv8 results folders.
+
+Generates results folders of a configurable size, times the loading and
+export paths, and writes the timings as JSON so that a release can be
+compared against a stored baseline. Like the CLI, this module must not
+import tkinter or PIL.
+"""
+
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from . import __version__
+from .modules.validator import InferenceValidator
+from .modules.data_exporter import DataExporter
+from .modules.session import ValidationSession
+
+
+# Supported distributions of the number of boxes per labelled image
+BOX_DISTRIBUTIONS = ('poisson', 'uniform', 'constant')
+
+# Operations timed by run_benchmarks, in order
+BENCHMARKS = ('get_image_files', 'validate_labels', 'get_detections',
+              'load_label_table', 'export_to_csv', 'export_summary_stats')
+
+# Version of the results file layout
+RESULTS_FORMAT = 1
+
+
+def _box_counts(rng: np.random.Generator, num_images: int, mean_boxes: float,
+                distribution: str) -> np.ndarray:
+    """Draw the number of boxes of every image."""
+    if distribution == 'poisson':
+        return rng.poisson(mean_boxes, num_images)
+    if distribution == 'uniform':
+        return rng.integers(0, int(round(2 * mean_boxes)) + 1, num_images)
+    if distribution == 'constant':
+        return np.full(num_images, int(round(mean_boxes)))
+
+    raise ValueError(f"Unknown box distribution: {distribution} "
+                     f"(expected one of {', '.join(BOX_DISTRIBUTIONS)})")
+
+
+def make_synthetic_results(root: Path, num_images: int, num_classes: int,
+                           mean_boxes: float = 5.0, distribution: str = 'poisson',
+                           missing_label_ratio: float = 0.1, seed: int = 0) -> Path:
+    """
+    Create a synthetic YOLOv8 results folder.
+
+    Images are empty ``.jpg`` files (none of the benchmarked operations
+    decode images). Label files hold random boxes with a confidence column,
+    and a ``data.yaml`` with the class names is written next to them.
+
+    Args:
+        root: Folder to create the results in
+        num_images: Number of images
+        num_classes: Number of classes
+        mean_boxes: Mean number of boxes per labelled image
+        distribution: Box count distribution ('poisson', 'uniform' or 'constant')
+        missing_label_ratio: Fraction of images without a label file
+        seed: Random seed; the same arguments always give the same folder
+
+    Returns:
+        Path to the written data.yaml
+    """
+    if num_images < 1 or num_classes < 1:
+        raise ValueError("Synthetic results need at least one image and one class")
+    if not 0.0 <= missing_label_ratio <= 1.0:
+        raise ValueError("missing_label_ratio must be between 0 and 1")
+
+    rng = np.random.default_rng(seed)
+    root = Path(root)
+    labels_folder = root / "labels"
+    labels_folder.mkdir(parents=True, exist_ok=True)
+
+    box_counts = _box_counts(rng, num_images, mean_boxes, distribution)
+    missing = rng.random(num_images) < missing_label_ratio
+    width = len(str(num_images - 1))
+
+    for index in range(num_images):
+        stem = f"img_{index:0{width}d}"
+        (root / f"{stem}.jpg").write_bytes(b"")
+        if missing[index]:
+            continue
+
+        count = int(box_counts[index])
+        class_ids = rng.integers(0, num_classes, count)
+        values = rng.random((count, 5))
+        lines = [f"{class_id} {x:.6f} {y:.6f} {w * 0.2:.6f} {h * 0.2:.6f} {conf:.4f}\n"
+                 for class_id, (x, y, w, h, conf) in zip(class_ids, values)]
+        (labels_folder / f"{stem}.txt").write_text("".join(lines))
+
+    yaml_path = root / "data.yaml"
+    names = ", ".join(f"'class_{class_id}'" for class_id in range(num_classes))
+    yaml_path.write_text(f"nc: {num_classes}\nnames: [{names}]\n")
+
+    return yaml_path
+
+
+def _time(func: Callable[[], object], repeat: int) -> Dict:
+    """Time a function over several runs."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+
+    return {'median_s': statistics.median(runs), 'min_s': min(runs), 'runs': runs}
+
+
+def run_benchmarks(results_folder: Path, class_names: Dict[int, str],
+                   output_folder: Path, repeat: int = 3) -> Dict[str, Dict]:
+    """
+    Time the loading and export operations on a results folder.
+
+    Each repetition of get_image_files uses a fresh validator so that the
+    directory scan is included; the other operations reuse the index.
+    load_label_table does not use the label cache.
+
+    Args:
+        results_folder: YOLOv8 results folder
+        class_names: Dictionary mapping class IDs to class names
+        output_folder: Folder the exported CSV files are written to
+        repeat: Number of runs of each operation
+
+    Returns:
+        Dictionary mapping each name in BENCHMARKS to its 'median_s',
+        'min_s' and per-run 'runs' timings in seconds
+    """
+    if repeat < 1:
+        raise ValueError("repeat must be at least 1")
+
+    results_folder = Path(results_folder)
+    output_folder = Path(output_folder)
+    output_folder.mkdir(parents=True, exist_ok=True)
+
+    timings = {
+        'get_image_files': _time(
+            lambda: InferenceValidator(results_folder, class_names).get_image_files(), repeat)
+    }
+
+    validator = InferenceValidator(results_folder, class_names)
+    images = validator.get_image_files()
+    timings['validate_labels'] = _time(validator.validate_labels, repeat)
+    timings['get_detections'] = _time(
+        lambda: [validator.get_detections(path) for path in images], repeat)
+
+    table = validator.load_label_table()
+    timings['load_label_table'] = _time(validator.load_label_table, repeat)
+
+    session = ValidationSession(validator.get_image_names(), class_names)
+    session.load_detections(table.has_label, table.count_matrix(max(class_names) + 1))
+    session.mark_all_processed()
+    session.manual[:] = session.detected
+
+    # The exporter reports every file it writes; keep that out of the output
+    exporter = DataExporter()
+    with redirect_stdout(io.StringIO()):
+        timings['export_to_csv'] = _time(lambda: exporter.export_to_csv(
+            session, class_names, str(output_folder / "validation_data.csv")), repeat)
+        timings['export_summary_stats'] = _time(lambda: exporter.export_summary_stats(
+            session, class_names, str(output_folder / "validation_summary.csv")), repeat)
+
+    return timings
+
+
+def benchmark_environment() -> Dict:
+    """Describe the machine and versions the benchmarks ran with."""
+    return {
+        'yolo_validator': __version__,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def compare_to_baseline(timings: Dict[str, Dict], baseline: Dict[str, Dict],
+                        tolerance: float = 0.25, min_delta_s: float = 0.005) -> List[Dict]:
+    """
+    Compare timings against a baseline.
+
+    The fastest run of each operation is compared, as it is the least
+    affected by other load on the machine.
+
+    Args:
+        timings: Timings from run_benchmarks
+        baseline: Timings of the baseline run
+        tolerance: Allowed slowdown as a fraction of the baseline time
+        min_delta_s: Slowdowns smaller than this many seconds are never
+            regressions, so that millisecond-scale operations do not flap
+
+    Returns:
+        One entry per benchmark present in both runs, with 'name',
+        'baseline_s', 'current_s', 'ratio' and 'regression'
+    """
+    comparison = []
+
+    for name, current in timings.items():
+        if name not in baseline:
+            continue
+
+        baseline_s = baseline[name]['min_s']
+        current_s = current['min_s']
+        ratio = current_s / baseline_s if baseline_s > 0 else float('inf')
+        comparison.append({
+            'name': name,
+            'baseline_s': baseline_s,
+            'current_s': current_s,
+            'ratio': ratio,
+            'regression': (ratio > 1.0 + tolerance
+                           and current_s - baseline_s > min_delta_s)
+        })
+
+    return comparison
+
+
+def write_results(path: Path, config: Dict, timings: Dict[str, Dict],
+                  comparison: Optional[List[Dict]] = None):
+    """
+    Write benchmark results as JSON.
+
+    Args:
+        path: Output JSON path
+        config: Synthetic dataset parameters
+        timings: Timings from run_benchmarks
+        comparison: Baseline comparison from compare_to_baseline, if any
+    """
+    results = {
+        'format': RESULTS_FORMAT,
+        'environment': benchmark_environment(),
+        'config': config,
+        'timings': timings
+    }
+    if comparison is not None:
+        results['comparison'] = comparison
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path: Path) -> Dict:
+    """
+    Read a results file written by write_results.
+
+    Args:
+        path: Results JSON path
+
+    Returns:
+        Dictionary with 'environment', 'config' and 'timings'
+    """
+    with open(path, encoding='utf-8') as f:
+        results = json.load(f)
+
+    if results.get('format') != RESULTS_FORMAT or 'timings' not in results:
+        raise ValueError(f"{path} is not a benchmark results file")
+
+    return results
+
+
+def print_timings(timings: Dict[str, Dict], comparison: Optional[List[Dict]] = None,
+                  file=sys.stdout):
+    """Print a timing table, with baseline ratios if available."""
+    ratios = {entry['name']: entry for entry in comparison or []}
+
+    for name, timing in timings.items():
+        line = (f"  {name:<22}{timing['median_s'] * 1000:>10.1f} ms"
+                f"  (min {timing['min_s'] * 1000:.1f} ms)")
+        if name in ratios:
+            entry = ratios[name]
+            line += f"  x{entry['ratio']:.2f} vs baseline"
+            if entry['regression']:
+                line += "  REGRESSION"
+        print(line, file=file)
@@ -1,5 +1,14 @@
 #!/bin/bash
 # Build script for YOLOv8 Inference Validation Tool
+#
+# Usage: build.sh [--lean]
+#   --lean  One-folder build without unused Pillow plugins and Tk data;
+#           starts faster than the default one-file executable
+
+SPEC="yolo_validator.spec"
+if [ "$1" = "--lean" ]; then
+    SPEC="yolo_validator_lean.spec"
+fi
 
 echo "Building YOLOv8 Validator executable..."
 echo "========================================"
@@ -13,13 +22,13 @@ echo "Cleaning previous builds..."
 rm -rf build/ dist/
 
 # Build the executable
-echo "Running PyInstaller..."
+echo "Running PyInstaller ($SPEC)..."
 cd src/yolo_validator
-pyinstaller --clean yolo_validator.spec
+pyinstaller --clean "$SPEC"
 
-# Move executable to project root dist folder
+# Move executable (or folder, for the lean build) to project root dist folder
 mkdir -p "$PROJECT_ROOT/dist"
-if [ -f "dist/YOLOv8_Validator" ]; then
+if [ -e "dist/YOLOv8_Validator" ]; then
     mv dist/YOLOv8_Validator "$PROJECT_ROOT/dist/"
     rm -rf dist/ build/
 fi
@@ -37,6 +46,16 @@ if [ -f "dist/YOLOv8_Validator" ]; then
     echo ""
     echo "To run the executable:"
     echo "  ./dist/YOLOv8_Validator"
+elif [ -f "dist/YOLOv8_Validator/YOLOv8_Validator" ]; then
+    echo ""
+    echo "✓ Build successful!"
+    echo "Application folder: dist/YOLOv8_Validator"
+    echo ""
+    echo "Folder size:"
+    du -sh dist/YOLOv8_Validator
+    echo ""
+    echo "To run the executable:"
+    echo "  ./dist/YOLOv8_Validator/YOLOv8_Validator"
 else
     echo ""
     echo "✗ Build failed!"
@@ -0,0 +1,349 @@
+"""
+Headless command line interface for YOLOv8 Inference Validator.
+
+Runs validation summaries without a display, e.g. as part of nightly
+inference jobs. This module must not import tkinter or PIL (directly or
+through the package ``__init__``) so that it starts fast and runs in
+minimal containers.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .modules.yaml_parser import YAMLParser
+from .modules.validator import InferenceValidator
+from .modules.data_exporter import DataExporter
+from .modules.data_importer import DataImporter
+from .modules.session import ValidationSession
+from .modules.evaluation import evaluate_detections
+from .modules.threshold_sweep import sweep_confidence
+from .modules.metrics import metrics
+from . import benchmark
+
+
+# Default output file extension per export format
+FORMAT_EXTENSIONS = {'csv': 'csv', 'parquet': 'parquet', 'arrow': 'arrow'}
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """
+    Scan a results folder and write the validation CSV and summary.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Process exit code
+    """
+    class_names = YAMLParser(Path(args.yaml)).get_class_names()
+    validator = InferenceValidator(args.results_folder, class_names,
+                                   recursive=args.recursive)
+
+    image_files = validator.get_image_files()
+    if not image_files:
+        print(f"No images found in {', '.join(args.results_folder)}", file=sys.stderr)
+        return 1
+
+    if args.sweep and not args.manual:
+        print("--sweep needs --manual counts to compare against", file=sys.stderr)
+        return 1
+
+    # Per-image and per-class counts as NumPy reductions over all boxes
+    class_ids = sorted(class_names)
+    num_classes = class_ids[-1] + 1 if class_ids else 0
+    has_label, count_matrix = validator.count_detections(
+        num_classes, workers=args.workers, use_cache=not args.no_cache
+    )
+
+    session = ValidationSession(validator.get_image_names(), class_names)
+    session.load_detections(has_label, count_matrix)
+
+    if args.manual:
+        # Only reviewed images have manual counts; exporting the others would
+        # count them as manual 0 in the error and agreement columns
+        DataImporter().import_csv(Path(args.manual), session, include_detected=False)
+        if not session.processed_count:
+            print(f"No images of {args.manual} are in the results folder", file=sys.stderr)
+            return 1
+    else:
+        session.mark_all_processed()
+
+    output_path = Path(args.output or f"validation_data.{FORMAT_EXTENSIONS[args.format]}")
+    summary_path = (Path(args.summary) if args.summary
+                    else output_path.with_name(f"{output_path.stem}_summary.csv"))
+
+    exporter = DataExporter()
+    if args.format == 'csv':
+        exporter.export_to_csv(session, class_names, str(output_path))
+    else:
+        exporter.export_to_columnar(session, str(output_path), layout=args.layout,
+                                    file_format=args.format)
+    exporter.export_summary_stats(session, class_names, str(summary_path))
+
+    summary = validator.validate_labels()
+    per_class = count_matrix.sum(axis=0)
+    print(f"Total: {summary['total_images']} | "
+          f"With Labels: {summary['images_with_labels']} | "
+          f"Without Labels: {summary['images_without_labels']} | "
+          f"Detections: {int(per_class.sum())}")
+
+    for class_id in class_ids:
+        print(f"  {class_names[class_id]}: {int(per_class[class_id])}")
+
+    if args.sweep:
+        table = validator.load_label_table(use_cache=not args.no_cache)
+        sweep = sweep_confidence(table, session, images=session.processed)
+        exporter.export_threshold_sweep(sweep, args.sweep)
+        _print_operating_point(sweep)
+
+    return 0
+
+
+def _format_threshold(threshold: float) -> str:
+    """Format a sweep threshold (inf means no detection should be kept)."""
+    return 'none' if threshold == float('inf') else f"{threshold:.3f}"
+
+
+def _print_operating_point(sweep: Dict):
+    """Print the best confidence thresholds of a sweep."""
+    print(f"Best confidence threshold: "
+          f"{_format_threshold(sweep['overall_best_threshold'])} "
+          f"(count error {sweep['overall_best_error']} of "
+          f"{int(sweep['manual_total'].sum())} manual objects)")
+
+    for column, class_name in enumerate(sweep['class_names']):
+        print(f"  {class_name}: {_format_threshold(sweep['best_threshold'][column])} "
+              f"(count error {int(sweep['best_error'][column])})")
+
+
+def run_evaluate(args: argparse.Namespace) -> int:
+    """
+    Match predictions to ground-truth labels and write accuracy metrics.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Process exit code
+    """
+    class_names = YAMLParser(Path(args.yaml)).get_class_names()
+    validator = InferenceValidator(args.results_folder, class_names,
+                                   recursive=args.recursive)
+
+    if not validator.get_image_files():
+        print(f"No images found in {', '.join(args.results_folder)}", file=sys.stderr)
+        return 1
+
+    class_ids = sorted(class_names)
+    num_classes = class_ids[-1] + 1 if class_ids else 0
+    predictions = validator.load_label_table(use_cache=not args.no_cache)
+    ground_truth = validator.load_ground_truth_table(Path(args.ground_truth))
+
+    metrics = evaluate_detections(predictions, ground_truth, num_classes)
+    DataExporter().export_evaluation(metrics, class_names, args.output)
+
+    print(f"mAP@0.5: {metrics['map50']:.4f} | mAP@0.5:0.95: {metrics['map50_95']:.4f}")
+
+    for class_id in class_ids:
+        print(f"  {class_names[class_id]}: "
+              f"P {metrics['precision'][class_id]:.3f} "
+              f"R {metrics['recall'][class_id]:.3f} "
+              f"AP50 {metrics['ap50'][class_id]:.3f}")
+
+    return 0
+
+
+def run_benchmark(args: argparse.Namespace) -> int:
+    """
+    Time loading and export on a synthetic results folder.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Process exit code (1 if a benchmark regressed against the baseline)
+    """
+    config = {
+        'images': args.images,
+        'classes': args.classes,
+        'mean_boxes': args.boxes,
+        'distribution': args.distribution,
+        'missing_label_ratio': args.missing_ratio,
+        'seed': args.seed,
+        'repeat': args.repeat
+    }
+    baseline = benchmark.load_results(Path(args.baseline)) if args.baseline else None
+    if baseline is not None and baseline['config'] != config:
+        print("Warning: the baseline was run with different parameters", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory(prefix='yolo_validator_bench_') as work_dir:
+        results_folder = Path(args.workdir or work_dir) / "results"
+        print(f"Generating {args.images} images in {results_folder}...")
+        yaml_path = benchmark.make_synthetic_results(
+            results_folder, args.images, args.classes, mean_boxes=args.boxes,
+            distribution=args.distribution, missing_label_ratio=args.missing_ratio,
+            seed=args.seed
+        )
+
+        class_names = YAMLParser(yaml_path).get_class_names()
+        timings = benchmark.run_benchmarks(results_folder, class_names,
+                                           Path(work_dir) / "exports", repeat=args.repeat)
+
+    comparison = (benchmark.compare_to_baseline(timings, baseline['timings'], args.tolerance)
+                  if baseline is not None else None)
+    benchmark.write_results(Path(args.output), config, timings, comparison)
+
+    print(f"Median of {args.repeat} runs:")
+    benchmark.print_timings(timings, comparison)
+    print(f"Results written to {args.output}")
+
+    if comparison and any(entry['regression'] for entry in comparison):
+        print(f"Slower than the baseline by more than {args.tolerance:.0%}",
+              file=sys.stderr)
+        return 1
+
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command line argument parser.
+
+    Returns:
+        Configured ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog='yolo-validator',
+        description='YOLOv8 Inference Validator (headless mode)'
+    )
+    parser.add_argument('--profile', metavar='PATH',
+                        help='Write p50/p95/p99 timings of the instrumented '
+                             'operations as JSON to PATH')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    batch = subparsers.add_parser(
+        'batch', help='Compute detection counts and summaries for a results folder'
+    )
+    batch.add_argument('results_folder', nargs='+',
+                       help='YOLOv8 results folders (images + labels/) or glob patterns '
+                            'such as "runs/detect/predict*"')
+    batch.add_argument('--recursive', action='store_true',
+                       help='Also index images in subfolders, each paired with its '
+                            'own labels/ folder')
+    batch.add_argument('--yaml', required=True, help='Class configuration (data.yaml)')
+    batch.add_argument('--manual',
+                       help='Previously exported CSV to take manual counts from; only '
+                            'the images it covers are exported')
+    batch.add_argument('-o', '--output',
+                       help='Output path (default: validation_data.<format extension>)')
+    batch.add_argument('--format', choices=sorted(FORMAT_EXTENSIONS), default='csv',
+                       help='Per-image output format (default: csv); parquet and '
+                            'arrow require pyarrow')
+    batch.add_argument('--layout', choices=['long', 'wide'], default='long',
+                       help='Columnar layout: one row per image and class with a '
+                            'non-zero count (long) or CSV-style columns (wide)')
+    batch.add_argument('--summary',
+                       help='Summary CSV path (default: <output>_summary.csv)')
+    batch.add_argument('--no-cache', action='store_true',
+                       help='Do not read or write the label cache')
+    batch.add_argument('--workers', type=int, default=1,
+                       help='Parse label files in N worker processes (default: 1)')
+    batch.add_argument('--sweep', metavar='PATH',
+                       help='Write a confidence-threshold sweep against the --manual '
+                            'counts to PATH and print the best operating point')
+    batch.set_defaults(func=run_batch)
+
+    evaluate = subparsers.add_parser(
+        'evaluate', help='Compute precision, recall and mAP against ground-truth labels'
+    )
+    evaluate.add_argument('results_folder', nargs='+',
+                          help='YOLOv8 results folders (images + labels/) or glob patterns '
+                               'such as "runs/detect/predict*"')
+    evaluate.add_argument('--recursive', action='store_true',
+                          help='Also index images in subfolders, each paired with its '
+                               'own labels/ folder')
+    evaluate.add_argument('--yaml', required=True, help='Class configuration (data.yaml)')
+    evaluate.add_argument('--ground-truth', required=True,
+                          help='Folder of ground-truth YOLO .txt labels')
+    evaluate.add_argument('-o', '--output', default='evaluation.csv',
+                          help='Per-class metrics CSV path (default: evaluation.csv)')
+    evaluate.add_argument('--no-cache', action='store_true',
+                          help='Do not read or write the label cache')
+    evaluate.set_defaults(func=run_evaluate)
+
+    bench = subparsers.add_parser(
+        'benchmark', help='Time loading and export on a synthetic results folder'
+    )
+    bench.add_argument('--images', type=int, default=10000,
+                       help='Number of synthetic images (default: 10000)')
+    bench.add_argument('--classes', type=int, default=10,
+                       help='Number of classes (default: 10)')
+    bench.add_argument('--boxes', type=float, default=5.0,
+                       help='Mean boxes per labelled image (default: 5)')
+    bench.add_argument('--distribution', choices=benchmark.BOX_DISTRIBUTIONS,
+                       default='poisson', help='Box count distribution (default: poisson)')
+    bench.add_argument('--missing-ratio', type=float, default=0.1,
+                       help='Fraction of images without a label file (default: 0.1)')
+    bench.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    bench.add_argument('--repeat', type=int, default=5,
+                       help='Runs per operation (default: 5)')
+    bench.add_argument('--workdir',
+                       help='Keep the synthetic results folder here instead of a '
+                            'temporary directory')
+    bench.add_argument('-o', '--output', default='benchmark.json',
+                       help='Results JSON path (default: benchmark.json)')
+    bench.add_argument('--baseline', help='Results JSON of an earlier run to compare against')
+    bench.add_argument('--tolerance', type=float, default=0.25,
+                       help='Allowed slowdown against the baseline (default: 0.25)')
+    bench.set_defaults(func=run_benchmark)
+
+    return parser
+
+
+def _write_profile(path: Path, command: str, elapsed: float):
+    """Write the metrics collected during a command as JSON."""
+    profile = {'command': command, 'elapsed_ms': elapsed * 1000}
+    profile.update(metrics.snapshot())
+
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, indent=2)
+    except OSError as e:
+        print(f"Error writing profile {path}: {e}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Main entry point for the command line interface.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    args = build_parser().parse_args(argv)
+
+    if args.profile:
+        metrics.reset()
+        metrics.enable()
+    start = time.perf_counter()
+
+    try:
+        return args.func(args)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.profile:
+            metrics.enable(False)
+            _write_profile(Path(args.profile), args.command, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,30 +4,29 @@ Module for exporting validation data to various formats.
 
 import csv
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Tuple, Union
 from datetime import datetime
 
+import numpy as np
+
+from .session import ValidationSession
+from .metrics import metrics
+
 
 class DataExporter:
     """Exporter for validation data."""
     
-    def export_to_csv(self, validation_data: List[Dict], class_names: Dict[int, str], 
-                      output_path: str):
+    @staticmethod
+    def _csv_headers(all_class_names: List[str]) -> List[str]:
         """
-        Export validation data to CSV format.
+        Build the CSV header row.
         
         Args:
-            validation_data: List of validation data dictionaries
-            class_names: Dictionary mapping class IDs to class names
-            output_path: Path to save the CSV file
+            all_class_names: Sorted class names
+            
+        Returns:
+            List of column names
         """
-        if not validation_data:
-            raise ValueError("No validation data to export")
-        
-        # Get all unique class names (sorted)
-        all_class_names = sorted(set(class_names.values()))
-        
-        # Prepare CSV headers
         headers = ['image_name', 'has_label_file']
         
         # Add detected count columns
@@ -41,98 +40,266 @@ class DataExporter:
         # Add summary columns
         headers.extend(['total_detected', 'total_manual', 'processed'])
         
+        return headers
+    
+    @metrics.timed('export.csv')
+    def export_to_csv(self, validation_data: Union[List[Dict], ValidationSession],
+                      class_names: Dict[int, str], output_path: str):
+        """
+        Export validation data to CSV format.
+        
+        Args:
+            validation_data: ValidationSession or list of validation data dictionaries
+            class_names: Dictionary mapping class IDs to class names
+            output_path: Path to save the CSV file
+        """
+        if not len(validation_data):
+            raise ValueError("No validation data to export")
+        
+        if isinstance(validation_data, ValidationSession):
+            counts = self.export_session_to_csv(validation_data, output_path)
+        else:
+            counts = self.export_stream_to_csv(validation_data, class_names, output_path)
+        
+        print(f"Exported {counts['exported']} records to {output_path}")
+    
+    def export_session_to_csv(self, session: ValidationSession, output_path: str,
+                              block_size: int = 4096) -> Dict[str, int]:
+        """
+        Export the processed images of a session straight from its count arrays.
+        
+        Args:
+            session: Validation session
+            output_path: Path to save the CSV file
+            block_size: Number of rows converted from NumPy at a time
+            
+        Returns:
+            Dictionary with 'exported' (processed) and 'skipped' record counts
+        """
+        processed = np.flatnonzero(session.processed)
+        
+        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(self._csv_headers(session.class_columns))
+            
+            for start in range(0, len(processed), block_size):
+                block = processed[start:start + block_size]
+                detected = session.detected[block]
+                manual = session.manual[block]
+                
+                writer.writerows(
+                    [session.image_names[index],
+                     'Yes' if has_label else 'No',
+                     *detected_row, *manual_row,
+                     total_detected, total_manual, 'Yes']
+                    for index, has_label, detected_row, manual_row,
+                        total_detected, total_manual in zip(
+                        block.tolist(), session.has_label[block].tolist(),
+                        detected.tolist(), manual.tolist(),
+                        detected.sum(axis=1).tolist(), manual.sum(axis=1).tolist())
+                )
+        
+        return {'exported': len(processed), 'skipped': len(session) - len(processed)}
+    
+    def export_stream_to_csv(self, records: Iterable[Dict], class_names: Dict[int, str],
+                             output_path: str) -> Dict[str, int]:
+        """
+        Export validation records to CSV as they arrive.
+        
+        Records are consumed in a single pass and written immediately through a
+        reused row buffer, so any iterator or generator can be exported in
+        constant memory.
+        
+        Args:
+            records: Iterable of validation data dictionaries
+            class_names: Dictionary mapping class IDs to class names
+            output_path: Path to save the CSV file
+            
+        Returns:
+            Dictionary with 'exported' (processed) and 'skipped' record counts
+        """
+        # Get all unique class names (sorted)
+        all_class_names = sorted(set(class_names.values()))
+        num_classes = len(all_class_names)
+        headers = self._csv_headers(all_class_names)
+        
+        # Row buffer reused for every record; columns are filled by position
+        row = [''] * len(headers)
+        row[-1] = 'Yes'
+        detected_start = 2
+        manual_start = detected_start + num_classes
+        
+        exported = 0
+        skipped = 0
+        
         # Write CSV
         with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            writer.writeheader()
+            writer = csv.writer(csvfile)
+            writer.writerow(headers)
             
-            for item in validation_data:
+            for item in records:
                 if not item.get('processed', False):
                     # Skip unprocessed items
+                    skipped += 1
                     continue
                 
-                row = {
-                    'image_name': item.get('image_name', ''),
-                    'has_label_file': 'Yes' if item.get('has_label_file', False) else 'No'
-                }
+                row[0] = item.get('image_name', '')
+                row[1] = 'Yes' if item.get('has_label_file', False) else 'No'
                 
                 # Add detected counts
                 detected_counts = item.get('detected_counts', {})
                 total_detected = 0
-                for class_name in all_class_names:
+                for offset, class_name in enumerate(all_class_names):
                     count = detected_counts.get(class_name, 0)
-                    row[f'detected_{class_name}'] = count
+                    row[detected_start + offset] = count
                     total_detected += count
                 
                 # Add manual counts
                 manual_counts = item.get('manual_counts', {})
                 total_manual = 0
-                for class_name in all_class_names:
+                for offset, class_name in enumerate(all_class_names):
                     count = manual_counts.get(class_name, 0)
-                    row[f'manual_{class_name}'] = count
+                    row[manual_start + offset] = count
                     total_manual += count
                 
                 # Add summary
-                row['total_detected'] = total_detected
-                row['total_manual'] = total_manual
-                row['processed'] = 'Yes'
+                row[-3] = total_detected
+                row[-2] = total_manual
                 
                 writer.writerow(row)
+                exported += 1
         
-        print(f"Exported {sum(1 for item in validation_data if item.get('processed', False))} "
-              f"records to {output_path}")
+        return {'exported': exported, 'skipped': skipped}
     
-    def export_summary_stats(self, validation_data: List[Dict], class_names: Dict[int, str],
-                            output_path: str):
+    @metrics.timed('export.columnar')
+    def export_to_columnar(self, session: ValidationSession, output_path: str,
+                           layout: str = 'long', file_format: str = 'parquet',
+                           compression: str = 'zstd',
+                           row_group_size: int = 128 * 1024) -> int:
         """
-        Export summary statistics to CSV.
+        Export the processed images of a session to Parquet or Arrow IPC.
+        
+        The 'long' layout writes one row per (image, class) pair with a
+        non-zero detected or manual count, so it stays small with hundreds of
+        classes; an image without any count gets one row with a null
+        class_name and zero counts, so every processed image is present. The
+        'wide' layout mirrors the CSV columns; zero-heavy columns
+        are compressed by the columnar encoding and readers can load only
+        the columns they need. Requires the optional pyarrow package.
         
         Args:
-            validation_data: List of validation data dictionaries
-            class_names: Dictionary mapping class IDs to class names
-            output_path: Path to save the summary CSV file
+            session: Validation session
+            output_path: Path to save the file
+            layout: 'long' or 'wide'
+            file_format: 'parquet' or 'arrow'
+            compression: Compression codec (e.g. 'zstd', 'lz4', 'none')
+            row_group_size: Maximum rows per Parquet row group / Arrow batch
+            
+        Returns:
+            Number of rows written
         """
-        processed_data = [item for item in validation_data if item.get('processed', False)]
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet/Arrow export requires pyarrow "
+                              "(pip install pyarrow)") from None
         
-        if not processed_data:
-            raise ValueError("No processed data to generate summary")
+        if layout not in ('long', 'wide'):
+            raise ValueError(f"Unsupported layout: {layout}")
+        if file_format not in ('parquet', 'arrow'):
+            raise ValueError(f"Unsupported format: {file_format}")
         
-        # Calculate statistics per class
-        all_class_names = sorted(set(class_names.values()))
-        
-        stats = []
+        processed = np.flatnonzero(session.processed)
+        detected = session.detected[processed]
+        manual = session.manual[processed]
+        image_names = pa.array(session.image_names, type=pa.string())
         
-        for class_name in all_class_names:
-            total_detected = sum(
-                item.get('detected_counts', {}).get(class_name, 0) 
-                for item in processed_data
-            )
-            total_manual = sum(
-                item.get('manual_counts', {}).get(class_name, 0) 
-                for item in processed_data
-            )
+        if layout == 'long':
+            nonzero = (detected != 0) | (manual != 0)
+            rows, columns = np.nonzero(nonzero)
             
-            images_with_detected = sum(
-                1 for item in processed_data 
-                if item.get('detected_counts', {}).get(class_name, 0) > 0
-            )
-            images_with_manual = sum(
-                1 for item in processed_data 
-                if item.get('manual_counts', {}).get(class_name, 0) > 0
-            )
+            # Placeholder rows (class -1) for images with all-zero counts
+            empty = np.flatnonzero(~nonzero.any(axis=1))
+            rows = np.concatenate([rows, empty])
+            columns = np.concatenate([columns, np.full(len(empty), -1, dtype=columns.dtype)])
+            order = np.argsort(rows, kind='stable')
+            rows, columns = rows[order], columns[order]
+            placeholder = columns < 0
+            counted = ~placeholder
             
-            stats.append({
-                'class_name': class_name,
-                'total_detected': total_detected,
-                'total_manual': total_manual,
-                'images_with_detected': images_with_detected,
-                'images_with_manual': images_with_manual,
-                'total_count': total_detected + total_manual
+            detected_values = np.zeros(len(rows), dtype=detected.dtype)
+            manual_values = np.zeros(len(rows), dtype=manual.dtype)
+            detected_values[counted] = detected[rows[counted], columns[counted]]
+            manual_values[counted] = manual[rows[counted], columns[counted]]
+            image_index = processed[rows]
+            table = pa.table({
+                'image_name': pa.DictionaryArray.from_arrays(
+                    pa.array(image_index.astype(np.int32)), image_names),
+                'class_name': pa.DictionaryArray.from_arrays(
+                    pa.array(columns.astype(np.int32), mask=placeholder),
+                    pa.array(session.class_columns, type=pa.string())),
+                'detected': pa.array(detected_values),
+                'manual': pa.array(manual_values),
+                'has_label_file': pa.array(session.has_label[image_index])
             })
+        else:
+            data = {
+                'image_name': image_names.take(pa.array(processed)),
+                'has_label_file': pa.array(session.has_label[processed])
+            }
+            for column, class_name in enumerate(session.class_columns):
+                data[f'detected_{class_name}'] = pa.array(detected[:, column])
+            for column, class_name in enumerate(session.class_columns):
+                data[f'manual_{class_name}'] = pa.array(manual[:, column])
+            data['total_detected'] = pa.array(detected.sum(axis=1))
+            data['total_manual'] = pa.array(manual.sum(axis=1))
+            table = pa.table(data)
+        
+        codec = None if compression == 'none' else compression
+        
+        if file_format == 'parquet':
+            pq.write_table(table, output_path, compression=codec or 'none',
+                           row_group_size=row_group_size)
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=codec)
+            with pa.OSFile(str(output_path), 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                    writer.write_table(table, max_chunksize=row_group_size)
+        
+        print(f"Exported {table.num_rows} rows ({layout} layout) to {output_path}")
+        
+        return table.num_rows
+    
+    @metrics.timed('export.summary')
+    def export_summary_stats(self, validation_data: Union[List[Dict], ValidationSession],
+                            class_names: Dict[int, str], output_path: str):
+        """
+        Export summary statistics to CSV.
+        
+        Args:
+            validation_data: ValidationSession or list of validation data dictionaries
+            class_names: Dictionary mapping class IDs to class names
+            output_path: Path to save the summary CSV file
+        """
+        if isinstance(validation_data, ValidationSession):
+            all_class_names = validation_data.class_columns
+            detected = validation_data.detected[validation_data.processed]
+            manual = validation_data.manual[validation_data.processed]
+        else:
+            all_class_names = sorted(set(class_names.values()))
+            detected, manual = self._build_count_matrices(validation_data, all_class_names)
+        
+        if len(detected) == 0:
+            raise ValueError("No processed data to generate summary")
+        
+        stats = self.compute_summary_stats(detected, manual, all_class_names)
         
         # Write summary CSV
         headers = ['class_name', 'total_detected', 'total_manual', 'total_count',
-                  'images_with_detected', 'images_with_manual']
+                  'images_with_detected', 'images_with_manual',
+                  'mean_abs_error', 'median_abs_error',
+                  'over_count_images', 'under_count_images', 'agreement_rate']
         
         with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.DictWriter(csvfile, fieldnames=headers)
@@ -141,6 +308,168 @@ class DataExporter:
         
         print(f"Exported summary statistics to {output_path}")
     
+    def export_evaluation(self, metrics: Dict, class_names: Dict[int, str],
+                          output_path: str):
+        """
+        Export per-class detection accuracy metrics to CSV.
+        
+        Args:
+            metrics: Result of evaluation.evaluate_detections()
+            class_names: Dictionary mapping class IDs to class names
+            output_path: Path to save the metrics CSV file
+        """
+        headers = ['class_id', 'class_name', 'num_truth', 'num_predictions',
+                  'tp', 'fp', 'fn', 'precision', 'recall', 'ap50', 'ap50_95']
+        
+        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(headers)
+            
+            for class_id in sorted(class_names):
+                if class_id >= len(metrics['num_truth']):
+                    continue
+                writer.writerow([
+                    class_id, class_names[class_id],
+                    int(metrics['num_truth'][class_id]),
+                    int(metrics['num_predictions'][class_id]),
+                    int(metrics['tp'][class_id]), int(metrics['fp'][class_id]),
+                    int(metrics['fn'][class_id]),
+                    round(float(metrics['precision'][class_id]), 4),
+                    round(float(metrics['recall'][class_id]), 4),
+                    round(float(metrics['ap50'][class_id]), 4),
+                    round(float(metrics['ap50_95'][class_id]), 4)
+                ])
+            
+            # Overall row: totals and mAP over classes with ground truth
+            tp, fp, fn = (int(metrics[key].sum()) for key in ('tp', 'fp', 'fn'))
+            writer.writerow([
+                '', 'all', int(metrics['num_truth'].sum()),
+                int(metrics['num_predictions'].sum()), tp, fp, fn,
+                round(tp / (tp + fp), 4) if tp + fp else 0.0,
+                round(tp / (tp + fn), 4) if tp + fn else 0.0,
+                round(metrics['map50'], 4), round(metrics['map50_95'], 4)
+            ])
+        
+        print(f"Exported evaluation metrics to {output_path}")
+    
+    def export_threshold_sweep(self, sweep: Dict, output_path: str):
+        """
+        Export confidence-threshold sweep curves to CSV.
+        
+        Args:
+            sweep: Result of threshold_sweep.sweep_confidence()
+            output_path: Path to save the sweep CSV file
+        """
+        class_names = sweep['class_names']
+        headers = ['threshold', 'total_abs_error']
+        headers.extend(f'detected_{name}' for name in class_names)
+        headers.extend(f'abs_error_{name}' for name in class_names)
+        
+        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(headers)
+            
+            for column, threshold in enumerate(sweep['thresholds']):
+                writer.writerow([round(float(threshold), 4),
+                                 int(sweep['total_abs_error'][column]),
+                                 *sweep['detected'][:, column].tolist(),
+                                 *sweep['abs_error'][:, column].tolist()])
+        
+        print(f"Exported threshold sweep to {output_path}")
+    
+    @staticmethod
+    def _build_count_matrices(validation_data: Iterable[Dict],
+                              all_class_names: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Gather processed records into dense count matrices in a single pass.
+        
+        Args:
+            validation_data: Iterable of validation data dictionaries
+            all_class_names: Sorted class names, defining the column order
+            
+        Returns:
+            Tuple of (detected, manual) arrays of shape (processed images, classes)
+        """
+        column = {class_name: index for index, class_name in enumerate(all_class_names)}
+        rows = []
+        cols = []
+        values = []
+        num_processed = 0
+        
+        # Detected and manual entries share one flat list; manual columns are
+        # offset by the number of classes
+        for item in validation_data:
+            if not item.get('processed', False):
+                continue
+            
+            for offset, counts in ((0, item.get('detected_counts', {})),
+                                   (len(column), item.get('manual_counts', {}))):
+                for class_name, count in counts.items():
+                    index = column.get(class_name)
+                    if index is not None:
+                        rows.append(num_processed)
+                        cols.append(offset + index)
+                        values.append(count)
+            
+            num_processed += 1
+        
+        matrix = np.zeros((num_processed, 2 * len(column)), dtype=np.int64)
+        matrix[rows, cols] = values
+        
+        return matrix[:, :len(column)], matrix[:, len(column):]
+    
+    @staticmethod
+    def compute_summary_stats(detected: np.ndarray, manual: np.ndarray,
+                              all_class_names: List[str]) -> List[Dict]:
+        """
+        Compute per-class summary statistics from dense count matrices.
+        
+        All statistics are NumPy reductions over the image axis.
+        
+        Args:
+            detected: Detected counts, shape (processed images, classes)
+            manual: Manual counts, shape (processed images, classes)
+            all_class_names: Class names, one per column
+            
+        Returns:
+            List of per-class statistics dictionaries
+        """
+        total_detected = detected.sum(axis=0)
+        total_manual = manual.sum(axis=0)
+        images_with_detected = (detected > 0).sum(axis=0)
+        images_with_manual = (manual > 0).sum(axis=0)
+        
+        difference = detected - manual
+        abs_error = np.abs(difference)
+        num_images = len(detected)
+        
+        if num_images:
+            mean_abs_error = abs_error.mean(axis=0)
+            median_abs_error = np.median(abs_error, axis=0)
+        else:
+            mean_abs_error = median_abs_error = np.zeros(len(all_class_names))
+        
+        over_count_images = (difference > 0).sum(axis=0)
+        under_count_images = (difference < 0).sum(axis=0)
+        agreement_rate = (num_images - over_count_images - under_count_images) / max(num_images, 1)
+        
+        return [
+            {
+                'class_name': class_name,
+                'total_detected': int(total_detected[index]),
+                'total_manual': int(total_manual[index]),
+                'total_count': int(total_detected[index] + total_manual[index]),
+                'images_with_detected': int(images_with_detected[index]),
+                'images_with_manual': int(images_with_manual[index]),
+                'mean_abs_error': round(float(mean_abs_error[index]), 4),
+                'median_abs_error': float(median_abs_error[index]),
+                'over_count_images': int(over_count_images[index]),
+                'under_count_images': int(under_count_images[index]),
+                'agreement_rate': round(float(agreement_rate[index]), 4)
+            }
+            for index, class_name in enumerate(all_class_names)
+        ]
+    
     def get_export_metadata(self) -> Dict:
         """
         Get metadata for the export.
@@ -0,0 +1,113 @@
+"""
+Module for importing previously exported validation data.
+"""
+
+import csv
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from .session import ValidationSession
+
+
+class DataImporter:
+    """Importer for CSV files written by DataExporter.export_to_csv."""
+
+    def import_csv(self, csv_path: Path, session: ValidationSession,
+                   include_detected: bool = True) -> Dict[str, int]:
+        """
+        Load counts from an exported CSV back into a session.
+
+        The header is mapped to session columns once; rows are collected as
+        strings and converted to integer arrays in bulk, then scattered into
+        the session by image name. Rows for images that are not in the
+        session are skipped.
+
+        Args:
+            csv_path: Path to the CSV file
+            session: Session to load the counts into
+            include_detected: Also restore detected_* columns (otherwise only
+                manual counts are imported)
+
+        Returns:
+            Dictionary with 'imported' and 'skipped' row counts
+        """
+        with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+            reader = csv.reader(csvfile)
+            headers = next(reader, [])
+
+            if 'image_name' not in headers:
+                raise ValueError(f"Not a validation CSV (no image_name column): {csv_path}")
+
+            # Column index mapping, built once for the whole file
+            position = {header: index for index, header in enumerate(headers)}
+            name_column = position['image_name']
+            label_column = position.get('has_label_file')
+            manual_map = self._column_map(position, 'manual_', session.class_columns)
+            detected_map = (self._column_map(position, 'detected_', session.class_columns)
+                            if include_detected else ([], []))
+
+            index_of = {name: index for index, name in enumerate(session.image_names)}
+            manual_fields = manual_map[0]
+            detected_fields = detected_map[0]
+
+            rows: List[int] = []
+            has_label: List[bool] = []
+            manual_values: List[List[str]] = []
+            detected_values: List[List[str]] = []
+            skipped = 0
+
+            for row in reader:
+                index = index_of.get(row[name_column]) if len(row) == len(headers) else None
+                if index is None:
+                    skipped += 1
+                    continue
+
+                rows.append(index)
+                manual_values.append([row[field] or '0' for field in manual_fields])
+                if include_detected:
+                    detected_values.append([row[field] or '0' for field in detected_fields])
+                if label_column is not None:
+                    has_label.append(row[label_column] == 'Yes')
+
+        if rows:
+            indices = np.array(rows, dtype=np.int64)
+            self._scatter(session.manual, indices, manual_map[1], manual_values)
+            if include_detected:
+                self._scatter(session.detected, indices, detected_map[1], detected_values)
+            if label_column is not None:
+                session.has_label[indices] = has_label
+            session.mark_processed(indices)
+
+        return {'imported': len(rows), 'skipped': skipped}
+
+    @staticmethod
+    def _column_map(position: Dict[str, int], prefix: str,
+                    class_columns: List[str]) -> tuple:
+        """
+        Map CSV columns with a prefix to session columns.
+
+        Returns:
+            Tuple of (CSV field indices, matching session column indices)
+        """
+        fields = []
+        columns = []
+
+        for column, class_name in enumerate(class_columns):
+            field = position.get(f'{prefix}{class_name}')
+            if field is not None:
+                fields.append(field)
+                columns.append(column)
+
+        return fields, columns
+
+    @staticmethod
+    def _scatter(target: np.ndarray, indices: np.ndarray, columns: List[int],
+                 values: List[List[str]]):
+        """Convert string rows in bulk and write them into a count matrix."""
+        if not columns:
+            return
+
+        matrix = np.array(values, dtype=str).astype(np.int64)
+        target[np.ix_(indices, np.array(columns))] = matrix
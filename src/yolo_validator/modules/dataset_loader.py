@@ -0,0 +1,134 @@
+"""
+Module for loading a dataset on a background thread.
+"""
+
+import queue
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .yaml_parser import YAMLParser
+from .validator import InferenceValidator, ResultsFolders
+
+
+class LoadCancelled(Exception):
+    """Raised inside the loader thread when loading is cancelled."""
+
+
+class DatasetLoader:
+    """
+    Loads a dataset on a worker thread and reports progress as events.
+
+    Events are tuples put on ``events`` in this order:
+
+    - ``('scan', images_found, first_image)``: batched while the folders
+      are scanned; first_image is the first image found (in directory order)
+    - ``('indexed', validator, images, validation_summary)``: the image
+      index is complete; label files are still being parsed
+    - ``('labels', files_done, total_files)``: batched while label files
+      are parsed
+    - ``('done', label_table)``: loading finished
+
+    or, at any point, ``('error', exception)`` or ``('cancelled',)``.
+    The Tk thread drains the queue with ``root.after`` polling, so no
+    widget is touched from the worker.
+    """
+
+    def __init__(self, results_folder: ResultsFolders, yaml_file: Path,
+                 recursive: bool = False):
+        """
+        Initialize the loader.
+
+        Args:
+            results_folder: YOLOv8 results folder, glob pattern or list of
+                either (see InferenceValidator)
+            yaml_file: Class configuration YAML file
+            recursive: Also load images in subfolders
+        """
+        self.results_folder = results_folder
+        self.recursive = recursive
+        self.yaml_file = Path(yaml_file)
+        self.class_names = {}
+        self.events: queue.SimpleQueue = queue.SimpleQueue()
+
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start loading on a daemon thread."""
+        self._thread = threading.Thread(target=self._run, name='dataset-loader',
+                                        daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """Ask the worker to stop at its next progress check."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancel() has been called."""
+        return self._cancel.is_set()
+
+    def join(self, timeout: Optional[float] = None):
+        """Wait for the worker thread to finish."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _check_cancelled(self):
+        """Abort the worker if loading was cancelled."""
+        if self._cancel.is_set():
+            raise LoadCancelled()
+
+    def _on_scan(self, images_found: int, first_image: Path):
+        """Report scan progress (called from the folder scanning threads)."""
+        self._check_cancelled()
+        self.events.put(('scan', images_found, first_image))
+
+    def _on_labels(self, done: int, total: int):
+        """Report label parsing progress."""
+        self._check_cancelled()
+        self.events.put(('labels', done, total))
+
+    def _run(self):
+        """Worker thread body."""
+        try:
+            self.class_names = YAMLParser(self.yaml_file).get_class_names()
+            validator = InferenceValidator(self.results_folder, self.class_names,
+                                           recursive=self.recursive)
+
+            validator.refresh_index(progress=self._on_scan)
+            self._check_cancelled()
+            images = validator.get_image_files()
+            self.events.put(('indexed', validator, images, validator.validate_labels()))
+
+            if images:
+                table = validator.load_label_table(use_cache=True, progress=self._on_labels)
+                self._check_cancelled()
+                self.events.put(('done', table))
+        except LoadCancelled:
+            self.events.put(('cancelled',))
+        except Exception as e:
+            self.events.put(('error', e))
+
+    def drain(self) -> List[Tuple]:
+        """
+        Get all pending events, keeping only the latest progress event of a
+        run of 'scan' or 'labels' events.
+
+        Returns:
+            List of events in order
+        """
+        events = []
+
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+
+            if events and event[0] in ('scan', 'labels') and events[-1][0] == event[0]:
+                events[-1] = event
+            else:
+                events.append(event)
+
+        return events
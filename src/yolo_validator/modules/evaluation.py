@@ -0,0 +1,280 @@
+"""
+Module for matching detections to ground truth and computing accuracy metrics.
+"""
+
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+
+from .label_table import LabelTable
+
+
+# COCO IoU thresholds 0.50:0.05:0.95; the first one is used for TP/FP/FN
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+
+# Recall points of the COCO 101-point interpolated precision/recall curve
+RECALL_POINTS = np.linspace(0.0, 1.0, 101)
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Compute the IoU of matching rows of two box arrays.
+
+    Args:
+        a: Array of shape (n, 4) with x_center, y_center, width, height
+        b: Array of shape (n, 4) in the same format
+
+    Returns:
+        Array of length n with the IoU of a[i] and b[i]
+    """
+    a_half = a[:, 2:] / 2
+    b_half = b[:, 2:] / 2
+    top_left = np.maximum(a[:, :2] - a_half, b[:, :2] - b_half)
+    bottom_right = np.minimum(a[:, :2] + a_half, b[:, :2] + b_half)
+
+    inter = np.clip(bottom_right - top_left, 0, None).prod(axis=1)
+    union = a[:, 2:].prod(axis=1) + b[:, 2:].prod(axis=1) - inter
+
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def _box_keys(table: LabelTable, num_classes: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the (image, class) group key of every box with a valid class ID.
+
+    Returns:
+        Tuple of (box row indices, keys image_index * num_classes + class_id)
+    """
+    rows = np.flatnonzero((table.class_id >= 0) & (table.class_id < num_classes))
+    keys = table.image_index[rows].astype(np.int64) * num_classes + table.class_id[rows]
+    return rows, keys
+
+
+def _candidate_pairs(pred_keys: np.ndarray, truth_keys: np.ndarray,
+                     max_pairs: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Enumerate every (prediction, ground truth) pair sharing an image and class.
+
+    Ground-truth boxes are grouped by key with one argsort, and each
+    prediction finds its group with a binary search, so memory grows with
+    the number of boxes rather than images x classes. Predictions are then
+    expanded against their groups with np.repeat, in blocks of at most
+    ``max_pairs`` pairs to bound memory on crowded images.
+
+    Yields:
+        Tuples of (prediction positions, ground-truth positions) into the
+        key arrays
+    """
+    truth_order = np.argsort(truth_keys, kind='stable')
+    sorted_keys = truth_keys[truth_order]
+    group_start = np.searchsorted(sorted_keys, pred_keys, side='left')
+    pairs_per_pred = np.searchsorted(sorted_keys, pred_keys, side='right') - group_start
+    pair_end = np.cumsum(pairs_per_pred)
+    start = 0
+
+    while start < len(pred_keys):
+        # Largest block of predictions whose pairs fit in the budget
+        budget = (pair_end[start - 1] if start else 0) + max_pairs
+        end = max(int(np.searchsorted(pair_end, budget, side='right')), start + 1)
+
+        counts = pairs_per_pred[start:end]
+        block_starts = np.cumsum(counts) - counts
+        within = np.arange(int(counts.sum())) - np.repeat(block_starts, counts)
+
+        pred_index = np.repeat(np.arange(start, end), counts)
+        truth_index = truth_order[np.repeat(group_start[start:end], counts) + within]
+        yield pred_index, truth_index
+        start = end
+
+
+def match_predictions(predictions: LabelTable, ground_truth: LabelTable,
+                      num_classes: int, iou_thresholds: np.ndarray = IOU_THRESHOLDS,
+                      max_pairs: int = 4_000_000) -> np.ndarray:
+    """
+    Greedily match predicted boxes to ground-truth boxes of the same class.
+
+    IoU is computed for every same-image, same-class pair in bulk. For each
+    threshold, pairs above it are taken in order of decreasing IoU and a pair
+    is accepted if neither of its boxes is matched yet.
+
+    Args:
+        predictions: Predicted boxes
+        ground_truth: Ground-truth boxes, with the same image order
+        num_classes: Number of classes; IDs outside [0, num_classes) are ignored
+        iou_thresholds: IoU thresholds to match at
+        max_pairs: Maximum number of candidate pairs held in memory at once
+
+    Returns:
+        Boolean array of shape (len(predictions), len(iou_thresholds)), True
+        where the prediction is a true positive at that threshold
+    """
+    if predictions.num_images != ground_truth.num_images:
+        raise ValueError("Predictions and ground truth must cover the same images")
+
+    iou_thresholds = np.asarray(iou_thresholds, dtype=np.float64)
+    true_positive = np.zeros((len(predictions), len(iou_thresholds)), dtype=bool)
+
+    pred_rows, pred_keys = _box_keys(predictions, num_classes)
+    truth_rows, truth_keys = _box_keys(ground_truth, num_classes)
+    if not len(pred_rows) or not len(truth_rows):
+        return true_positive
+
+    pred_boxes = predictions.boxes()
+    truth_boxes = ground_truth.boxes()
+    min_iou = iou_thresholds.min()
+    pair_pred = []
+    pair_truth = []
+    pair_iou = []
+
+    for pred_index, truth_index in _candidate_pairs(pred_keys, truth_keys, max_pairs):
+        pred_index = pred_rows[pred_index]
+        truth_index = truth_rows[truth_index]
+        iou = box_iou(pred_boxes[pred_index], truth_boxes[truth_index])
+
+        keep = iou >= min_iou
+        pair_pred.append(pred_index[keep])
+        pair_truth.append(truth_index[keep])
+        pair_iou.append(iou[keep])
+
+    pair_iou = np.concatenate(pair_iou)
+    order = np.argsort(-pair_iou, kind='stable')
+    pair_pred = np.concatenate(pair_pred)[order]
+    pair_truth = np.concatenate(pair_truth)[order]
+    pair_iou = pair_iou[order]
+
+    for column, threshold in enumerate(iou_thresholds):
+        # Pairs are sorted by IoU, so the pairs above a threshold are a prefix
+        count = np.searchsorted(-pair_iou, -threshold, side='right')
+        pred_index = pair_pred[:count]
+        truth_index = pair_truth[:count]
+        pred_matched = np.zeros(len(predictions), dtype=bool)
+        truth_matched = np.zeros(len(ground_truth), dtype=bool)
+
+        # Accept the pairs that come first for both of their boxes, drop the
+        # pairs touching a matched box and repeat. Every accepted pair is one
+        # the sequential greedy walk accepts, and the first remaining pair is
+        # always accepted, so the loop ends with the greedy matching.
+        while len(pred_index):
+            pred_first = np.unique(pred_index, return_index=True)[1]
+            truth_first = np.unique(truth_index, return_index=True)[1]
+            accepted = np.intersect1d(pred_first, truth_first, assume_unique=True)
+            pred_matched[pred_index[accepted]] = True
+            truth_matched[truth_index[accepted]] = True
+
+            remaining = ~(pred_matched[pred_index] | truth_matched[truth_index])
+            pred_index = pred_index[remaining]
+            truth_index = truth_index[remaining]
+
+        true_positive[:, column] = pred_matched
+
+    return true_positive
+
+
+def _average_precision(true_positive: np.ndarray, num_truth: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute COCO-style interpolated AP from confidence-sorted matches.
+
+    Args:
+        true_positive: Boolean array (predictions, thresholds) sorted by
+            decreasing confidence
+        num_truth: Number of ground-truth boxes
+
+    Returns:
+        Tuple of (AP per threshold, interpolated precision at RECALL_POINTS
+        for each threshold)
+    """
+    num_thresholds = true_positive.shape[1]
+
+    if num_truth == 0:
+        return (np.full(num_thresholds, np.nan),
+                np.zeros((num_thresholds, len(RECALL_POINTS))))
+    if not len(true_positive):
+        return (np.zeros(num_thresholds),
+                np.zeros((num_thresholds, len(RECALL_POINTS))))
+
+    tp_cumsum = np.cumsum(true_positive, axis=0)
+    recall = tp_cumsum / num_truth
+    precision = tp_cumsum / np.arange(1, len(true_positive) + 1)[:, None]
+
+    # Precision envelope: best precision at this or any higher recall
+    envelope = np.maximum.accumulate(precision[::-1], axis=0)[::-1]
+    envelope = np.vstack([envelope, np.zeros((1, num_thresholds))])
+
+    curves = np.empty((num_thresholds, len(RECALL_POINTS)))
+    for column in range(num_thresholds):
+        positions = np.searchsorted(recall[:, column], RECALL_POINTS, side='left')
+        curves[column] = envelope[positions, column]
+
+    return curves.mean(axis=1), curves
+
+
+def evaluate_detections(predictions: LabelTable, ground_truth: LabelTable,
+                        num_classes: int) -> Dict:
+    """
+    Compute detection accuracy metrics for a whole run.
+
+    Predictions are ranked by confidence (file order where label files have
+    no confidence column). TP/FP/FN, precision and recall use every
+    prediction at IoU 0.5.
+
+    Args:
+        predictions: Predicted boxes
+        ground_truth: Ground-truth boxes, with the same image order
+        num_classes: Number of classes
+
+    Returns:
+        Dictionary with per-class arrays ('num_truth', 'num_predictions', 'tp',
+        'fp', 'fn', 'precision', 'recall', 'ap50', 'ap50_95', and 'ap' of shape
+        (classes, thresholds)), the precision/recall curves at IoU 0.5
+        ('pr_recall', 'pr_precision'), the per-prediction 'true_positive'
+        matrix, and 'map50' and 'map50_95' over classes with ground truth
+    """
+    true_positive = match_predictions(predictions, ground_truth, num_classes)
+    num_thresholds = len(IOU_THRESHOLDS)
+
+    valid = (predictions.class_id >= 0) & (predictions.class_id < num_classes)
+    conf = (np.ones(len(predictions), dtype=np.float32) if predictions.conf is None
+            else np.nan_to_num(predictions.conf, nan=1.0))
+
+    # Sort by class, then by decreasing confidence; classes become contiguous
+    rows = np.flatnonzero(valid)
+    rows = rows[np.lexsort((-conf[rows], predictions.class_id[rows]))]
+    class_start = np.searchsorted(predictions.class_id[rows], np.arange(num_classes + 1))
+
+    num_truth = ground_truth.class_histogram(num_classes)
+    num_predictions = np.diff(class_start)
+    ap = np.zeros((num_classes, num_thresholds))
+    curves = np.zeros((num_classes, len(RECALL_POINTS)))
+    tp = np.zeros(num_classes, dtype=np.int64)
+
+    for class_id in range(num_classes):
+        matches = true_positive[rows[class_start[class_id]:class_start[class_id + 1]]]
+        ap[class_id], class_curves = _average_precision(matches, int(num_truth[class_id]))
+        curves[class_id] = class_curves[0]
+        tp[class_id] = matches[:, 0].sum()
+
+    fp = num_predictions - tp
+    fn = num_truth - tp
+    precision = np.divide(tp, num_predictions, out=np.zeros(num_classes),
+                          where=num_predictions > 0)
+    recall = np.divide(tp, num_truth, out=np.zeros(num_classes), where=num_truth > 0)
+    present = num_truth > 0
+
+    return {
+        'iou_thresholds': IOU_THRESHOLDS,
+        'num_truth': num_truth,
+        'num_predictions': num_predictions,
+        'tp': tp,
+        'fp': fp,
+        'fn': fn,
+        'precision': precision,
+        'recall': recall,
+        'ap': ap,
+        'ap50': ap[:, 0],
+        'ap50_95': ap.mean(axis=1),
+        'map50': float(ap[present, 0].mean()) if present.any() else 0.0,
+        'map50_95': float(ap[present].mean()) if present.any() else 0.0,
+        'pr_recall': RECALL_POINTS,
+        'pr_precision': curves,
+        'true_positive': true_positive
+    }
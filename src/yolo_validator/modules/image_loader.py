@@ -0,0 +1,365 @@
+"""
+Module for decoding preview images off the Tk main thread.
+"""
+
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Hashable, List, Optional,
+                    Sequence, Tuple)
+
+from .metrics import metrics
+
+# Pillow is imported by the decoder threads on first use, keeping it off the
+# GUI's startup path
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+# (image path, (max width, max height)) - identifies one decoded preview
+ImageKey = Tuple[Path, Tuple[int, int]]
+
+# Called on the Tk thread with (path, size, image, error)
+DecodeCallback = Callable[[Path, Tuple[int, int], Optional["Image.Image"],
+                           Optional[Exception]], None]
+
+
+def decode_image(image_path: Path, size: Tuple[int, int],
+                 full_quality: bool = False) -> "Image.Image":
+    """
+    Decode an image and resize it to fit within the given size.
+
+    By default JPEGs are decoded in draft mode, letting libjpeg scale the
+    image down by 1/2, 1/4 or 1/8 during decoding so that it is only just
+    larger than the target size; other formats are shrunk with a fast
+    integer reduce first. Either way only a small image is left for the
+    final LANCZOS resample.
+
+    Args:
+        image_path: Path to the image file
+        size: Maximum (width, height) of the result
+        full_quality: Decode at native resolution and downsample with
+            LANCZOS only, for inspecting small objects
+
+    Returns:
+        Decoded image, resized while maintaining aspect ratio
+    """
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        if full_quality:
+            img.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=None)
+        else:
+            img.draft(None, size)
+            img.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=1.0)
+        img.load()
+        return img
+
+
+class ImagePrefetcher:
+    """
+    Thread-pool decoder that keeps images around the current one ready.
+
+    Decoding runs on worker threads; completed results are handed back to
+    the Tk thread by a ``root.after`` poll loop, so callbacks may safely
+    touch widgets.
+
+    With a ``source_size``, each image is decoded once at that
+    mid resolution (e.g. the screen size) and kept in a source cache;
+    previews for any canvas size are then scaled from it, so re-rendering
+    after a window resize does not touch the disk.
+    """
+
+    def __init__(self, root, ahead: int = 3, behind: int = 1, max_workers: int = 2,
+                 poll_interval: int = 15, cache: Optional["ImageCache"] = None,
+                 source_size: Optional[Tuple[int, int]] = None,
+                 source_cache_bytes: int = 128 * 1024 * 1024):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            root: Tk root (or any object with an ``after(ms, func)`` method)
+            ahead: Number of images after the current one to decode ahead
+            behind: Number of images before the current one to decode ahead
+            max_workers: Number of decoder threads
+            poll_interval: Milliseconds between checks for finished decodes
+            cache: Cache of display-ready images; keys found there are not
+                prefetched again
+            source_size: Maximum (width, height) of cached mid-resolution
+                decodes, or None to decode directly at the requested size
+            source_cache_bytes: Memory budget of the mid-resolution decodes
+        """
+        self.root = root
+        self.cache = cache
+        self.full_quality = False
+        self.ahead = ahead
+        self.behind = behind
+        self.poll_interval = poll_interval
+        self.source_size = source_size
+        self.source_cache = ImageCache(source_cache_bytes)
+
+        # The source cache is shared by the worker threads
+        self._source_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='image-prefetch')
+        self._futures: Dict[ImageKey, Future] = {}
+        self._callbacks: Dict[ImageKey, List[DecodeCallback]] = {}
+        self._finished: queue.SimpleQueue = queue.SimpleQueue()
+        self._poll_scheduled = False
+
+    def _submit(self, key: ImageKey):
+        """Start decoding an image unless it is already pending or done."""
+        if key in self._futures:
+            return
+
+        future = self._executor.submit(self._render, *key, self.full_quality)
+        future.add_done_callback(lambda f, key=key: self._finished.put(key))
+        self._futures[key] = future
+        self._schedule_poll()
+
+    def _render(self, image_path: Path, size: Tuple[int, int],
+                full_quality: bool) -> "Image.Image":
+        """Decode an image for one size, via the mid-resolution source if enabled."""
+        if self.source_size is None:
+            with metrics.timer('image.decode'):
+                return decode_image(image_path, size, full_quality)
+
+        source_key = (image_path, full_quality)
+        with self._source_lock:
+            source = self.source_cache.get(source_key)
+
+        if source is None:
+            with metrics.timer('image.decode'):
+                source = decode_image(image_path, self.source_size, full_quality)
+            with self._source_lock:
+                self.source_cache.put(source_key, source,
+                                      source.width * source.height * len(source.getbands()))
+
+        from PIL import Image
+
+        with metrics.timer('image.resize'):
+            image = source.copy()
+            image.thumbnail(size, Image.Resampling.LANCZOS)
+        return image
+
+    def _schedule_poll(self):
+        """Make sure the Tk poll loop is running."""
+        if not self._poll_scheduled:
+            self._poll_scheduled = True
+            self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """Deliver finished decodes to their callbacks on the Tk thread."""
+        self._poll_scheduled = False
+
+        while True:
+            try:
+                key = self._finished.get_nowait()
+            except queue.Empty:
+                break
+
+            future = self._futures.get(key)
+            callbacks = self._callbacks.pop(key, [])
+            if future is None or future.cancelled():
+                continue
+
+            for callback in callbacks:
+                self._deliver(key, future, callback)
+
+        # A future is done before its done-callback queues the key, so poll
+        # until every waiting callback is delivered rather than until every
+        # future is done
+        if self._callbacks or not self._finished.empty():
+            self._schedule_poll()
+
+    @staticmethod
+    def _deliver(key: ImageKey, future: Future, callback: DecodeCallback):
+        """Call a callback with the result of a finished decode."""
+        error = future.exception()
+        image = future.result() if error is None else None
+        callback(key[0], key[1], image, error)
+
+    def request(self, image_path: Path, size: Tuple[int, int], callback: DecodeCallback):
+        """
+        Request a decoded image.
+
+        If the image is already decoded the callback runs immediately,
+        otherwise it runs on the Tk thread once the decode finishes.
+
+        Args:
+            image_path: Path to the image file
+            size: Maximum (width, height) of the decoded image
+            callback: Called with (path, size, image, error)
+        """
+        key = (image_path, size)
+        future = self._futures.get(key)
+
+        if future is not None and future.done() and not future.cancelled():
+            metrics.count('prefetch.ready')
+            self._deliver(key, future, callback)
+            return
+
+        metrics.count('prefetch.waited')
+        self._callbacks.setdefault(key, []).append(callback)
+        self._submit(key)
+
+    def cancel_stale(self, image_path: Path, size: Tuple[int, int]):
+        """
+        Drop requests for anything but one image and size.
+
+        Callbacks of other requests are discarded, and their decodes are
+        cancelled if they have not started yet (running decodes finish and
+        stay available for later requests).
+
+        Args:
+            image_path: Path of the image still wanted
+            size: Size still wanted
+        """
+        for key in list(self._callbacks):
+            if key != (image_path, size):
+                del self._callbacks[key]
+                future = self._futures.get(key)
+                if future is not None and future.cancel():
+                    del self._futures[key]
+
+    def prefetch(self, image_paths: Sequence[Path], index: int, size: Tuple[int, int]):
+        """
+        Decode the neighbours of the current image ahead of time.
+
+        Pending or decoded images outside the window are dropped.
+
+        Args:
+            image_paths: All image paths in navigation order
+            index: Index of the current image
+            size: Maximum (width, height) of the decoded images
+        """
+        # Interleave next/previous so the likeliest targets are decoded first
+        order = [index]
+        for step in range(1, max(self.ahead, self.behind) + 1):
+            if step <= self.ahead and index + step < len(image_paths):
+                order.append(index + step)
+            if step <= self.behind and index - step >= 0:
+                order.append(index - step)
+
+        if self.cache is not None:
+            order = [i for i in order if (image_paths[i], size) not in self.cache]
+
+        wanted = {(image_paths[i], size) for i in order}
+
+        for key in list(self._futures):
+            if key not in wanted and key not in self._callbacks:
+                self._futures.pop(key).cancel()
+
+        for i in order:
+            self._submit((image_paths[i], size))
+
+    def clear(self):
+        """Drop all pending and decoded images."""
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._callbacks.clear()
+
+    def shutdown(self):
+        """Cancel outstanding work and stop the worker threads."""
+        self.clear()
+        self._executor.shutdown(wait=False)
+
+
+class ImageCache:
+    """
+    Least-recently-used cache of display-ready images with a byte budget.
+
+    Entries are evicted by total size rather than count, so a handful of
+    large previews cannot push memory use past the budget.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Maximum total size of cached images in bytes
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        """Number of cached images."""
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Check for an entry without touching the counters or LRU order."""
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached image and mark it as most recently used.
+
+        Args:
+            key: Cache key, typically (image path, canvas size)
+
+        Returns:
+            Cached image, or None on a miss
+        """
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any, nbytes: int):
+        """
+        Add an image, evicting least recently used ones to stay within budget.
+
+        Images larger than the whole budget are not cached.
+
+        Args:
+            key: Cache key, typically (image path, canvas size)
+            value: Image to cache
+            nbytes: Memory used by the image in bytes
+        """
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+
+        if nbytes > self.max_bytes:
+            return
+
+        self._entries[key] = (value, nbytes)
+        self.current_bytes += nbytes
+
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_bytes
+
+    def clear(self):
+        """Remove all entries (counters are kept)."""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit/miss counters, hit rate and memory use
+        """
+        lookups = self.hits + self.misses
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes
+        }
@@ -0,0 +1,210 @@
+"""
+Module for persisting parsed label tables between sessions.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .label_table import LabelTable, ProgressCallback, load_label_table
+
+
+class LabelCache:
+    """
+    On-disk cache of parsed label files keyed by (mtime, size) fingerprints.
+
+    The cache is a single uncompressed ``.npz`` file holding the boxes of
+    every label file together with the fingerprint each file had when it was
+    parsed. On reload only files whose fingerprint changed are reparsed.
+    """
+
+    CACHE_FILENAME = '.yolo_validator_cache.npz'
+    CACHE_VERSION = 2
+
+    def __init__(self, cache_path: Path, base_folder: Path):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_path: Path of the cache file
+            base_folder: Folder label paths are stored relative to
+        """
+        self.cache_path = Path(cache_path)
+        self.base_folder = Path(base_folder)
+        self._prefix = str(self.base_folder) + os.sep
+
+        # Statistics of the last load() call
+        self.reused_files = 0
+        self.parsed_files = 0
+
+    def _key(self, label_path: Path) -> str:
+        """Get the cache key (path relative to the base folder) of a label file."""
+        path = str(label_path)
+        return path[len(self._prefix):] if path.startswith(self._prefix) else path
+
+    def _read(self) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Read the cache file.
+
+        Returns:
+            Dictionary of cached arrays, or None if missing, stale or unreadable
+        """
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as data:
+                if int(data['version']) != self.CACHE_VERSION:
+                    return None
+                return {name: data[name] for name in data.files}
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable label cache {self.cache_path}: {e}")
+            return None
+
+    def _write(self, keys: List[str], fingerprints: np.ndarray, table: LabelTable,
+               file_offsets: np.ndarray, file_has_label: np.ndarray):
+        """Write the cache file atomically."""
+        tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+        conf = table.conf if table.conf is not None else np.zeros(0, dtype=np.float32)
+
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.savez(
+                    f,
+                    version=np.int64(self.CACHE_VERSION),
+                    keys=np.array(keys, dtype=str),
+                    fingerprints=fingerprints,
+                    has_label=file_has_label,
+                    offsets=file_offsets,
+                    class_id=table.class_id,
+                    boxes=table.boxes(),
+                    conf=conf
+                )
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            # A read-only results folder only costs us the cache
+            print(f"Could not write label cache {self.cache_path}: {e}")
+
+    def load(self, image_paths: Sequence[Path],
+             label_paths: Sequence[Optional[Path]],
+             progress: Optional[ProgressCallback] = None) -> LabelTable:
+        """
+        Load a LabelTable, reparsing only label files that changed.
+
+        Args:
+            image_paths: Image paths, defining the image index order
+            label_paths: Label file for each image, or None where there is none
+            progress: Called with (files parsed, files to parse) while stale
+                files are reparsed; may raise to abort loading
+
+        Returns:
+            LabelTable equivalent to load_label_table(image_paths, label_paths)
+        """
+        labelled = [i for i, path in enumerate(label_paths) if path is not None]
+        keys = [self._key(label_paths[i]) for i in labelled]
+        stats = []
+
+        for index in labelled:
+            try:
+                stat = os.stat(label_paths[index])
+                stats.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stats.append((-1, -1))
+
+        fingerprints = np.array(stats, dtype=np.int64).reshape(-1, 2)
+
+        cached = self._read()
+        cached_rows = np.full(len(labelled), -1, dtype=np.int64)
+
+        if cached is not None:
+            lookup = {key: row for row, key in enumerate(cached['keys'].tolist())}
+            cached_rows = np.array([lookup.get(key, -1) for key in keys],
+                                   dtype=np.int64)
+            hit = cached_rows >= 0
+            hit[hit] = (cached['fingerprints'][cached_rows[hit]]
+                        == fingerprints[hit]).all(axis=1)
+            cached_rows[~hit] = -1
+
+        stale = np.flatnonzero(cached_rows < 0)
+        self.reused_files = len(labelled) - len(stale)
+        self.parsed_files = len(stale)
+
+        fresh = load_label_table([image_paths[labelled[row]] for row in stale],
+                                 [label_paths[labelled[row]] for row in stale],
+                                 progress)
+
+        table, file_offsets, file_has_label = self._merge(
+            image_paths, labelled, cached_rows, stale, cached, fresh
+        )
+
+        if len(stale) or cached is None or len(cached['keys']) != len(keys):
+            self._write(keys, fingerprints, table, file_offsets, file_has_label)
+
+        return table
+
+    def _merge(self, image_paths: Sequence[Path], labelled: List[int],
+               cached_rows: np.ndarray, stale: np.ndarray,
+               cached: Optional[Dict[str, np.ndarray]],
+               fresh: LabelTable) -> Tuple[LabelTable, np.ndarray, np.ndarray]:
+        """
+        Combine cached and freshly parsed boxes into one table in image order.
+
+        Returns:
+            Tuple of (table, per-label-file offsets, per-label-file has_label)
+        """
+        num_cached_boxes = 0 if cached is None else len(cached['class_id'])
+
+        # Per label file: start row in the combined source arrays and box count
+        starts = np.zeros(len(labelled), dtype=np.int64)
+        counts = np.zeros(len(labelled), dtype=np.int64)
+        file_has_label = np.zeros(len(labelled), dtype=bool)
+
+        hit = cached_rows >= 0
+        if hit.any():
+            rows = cached_rows[hit]
+            starts[hit] = cached['offsets'][rows]
+            counts[hit] = cached['offsets'][rows + 1] - cached['offsets'][rows]
+            file_has_label[hit] = cached['has_label'][rows]
+
+        starts[stale] = num_cached_boxes + fresh.offsets[:-1]
+        counts[stale] = np.diff(fresh.offsets)
+        file_has_label[stale] = fresh.has_label
+
+        file_offsets = np.zeros(len(labelled) + 1, dtype=np.int64)
+        np.cumsum(counts, out=file_offsets[1:])
+        gather = (np.repeat(starts - file_offsets[:-1], counts)
+                  + np.arange(file_offsets[-1], dtype=np.int64))
+
+        if cached is not None:
+            source_class = np.concatenate([cached['class_id'], fresh.class_id])
+            source_boxes = np.concatenate([cached['boxes'], fresh.boxes()])
+            cached_conf = cached['conf']
+            if len(cached_conf) != num_cached_boxes:
+                cached_conf = np.full(num_cached_boxes, np.nan, dtype=np.float32)
+        else:
+            source_class = fresh.class_id
+            source_boxes = fresh.boxes()
+            cached_conf = np.zeros(0, dtype=np.float32)
+
+        fresh_conf = fresh.conf
+        if fresh_conf is None:
+            fresh_conf = np.full(len(fresh), np.nan, dtype=np.float32)
+        source_conf = np.concatenate([cached_conf, fresh_conf])
+
+        conf = source_conf[gather]
+        if np.isnan(conf).all():
+            conf = None
+
+        image_counts = np.zeros(len(image_paths), dtype=np.int64)
+        image_counts[labelled] = counts
+        image_has_label = np.zeros(len(image_paths), dtype=bool)
+        image_has_label[labelled] = file_has_label
+        offsets = np.zeros(len(image_paths) + 1, dtype=np.int64)
+        np.cumsum(image_counts, out=offsets[1:])
+
+        table = LabelTable(image_paths, image_has_label, offsets,
+                           source_class[gather], source_boxes[gather], conf)
+
+        return table, file_offsets, file_has_label
@@ -0,0 +1,303 @@
+"""
+Module for bulk loading YOLO label files into NumPy column arrays.
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Called with (files done, total files) while label files are parsed
+ProgressCallback = Callable[[int, int], None]
+
+# Number of label files between progress callbacks
+PROGRESS_INTERVAL = 1000
+
+
+class LabelTable:
+    """
+    Column-oriented store of every detection in a results folder.
+
+    Boxes are stored as contiguous arrays (one entry per box) and grouped by
+    image through a CSR-style offsets array: the boxes of image ``i`` live in
+    ``offsets[i]:offsets[i + 1]``.
+    """
+
+    def __init__(self, image_paths: Sequence[Path], has_label: np.ndarray,
+                 offsets: np.ndarray, class_id: np.ndarray, boxes: np.ndarray,
+                 conf: Optional[np.ndarray] = None):
+        """
+        Initialize the table.
+
+        Args:
+            image_paths: Image paths, in the order used for image indices
+            has_label: Boolean array, True where the image has a label file
+            offsets: Array of length ``len(image_paths) + 1`` with box offsets
+            class_id: Class ID of every box
+            boxes: Array of shape (num_boxes, 4) with x_center, y_center,
+                width and height in normalized coordinates
+            conf: Confidence of every box (NaN where missing), or None if no
+                label file carried a confidence column
+        """
+        self.image_paths = list(image_paths)
+        self.has_label = np.asarray(has_label, dtype=bool)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.class_id = np.asarray(class_id, dtype=np.int32)
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.x = np.ascontiguousarray(boxes[:, 0])
+        self.y = np.ascontiguousarray(boxes[:, 1])
+        self.w = np.ascontiguousarray(boxes[:, 2])
+        self.h = np.ascontiguousarray(boxes[:, 3])
+        self.conf = None if conf is None else np.asarray(conf, dtype=np.float32)
+        self.image_index = np.repeat(
+            np.arange(len(self.image_paths), dtype=np.int32), np.diff(self.offsets)
+        )
+
+    @property
+    def num_images(self) -> int:
+        """Number of images in the table."""
+        return len(self.image_paths)
+
+    def __len__(self) -> int:
+        """Number of boxes in the table."""
+        return len(self.class_id)
+
+    def boxes(self) -> np.ndarray:
+        """
+        Get all boxes as a single array.
+
+        Returns:
+            Array of shape (num_boxes, 4) with x_center, y_center, width, height
+        """
+        return np.stack([self.x, self.y, self.w, self.h], axis=1)
+
+    def image_slice(self, index: int) -> slice:
+        """
+        Get the slice of box rows belonging to an image.
+
+        Args:
+            index: Image index
+
+        Returns:
+            Slice into the box columns
+        """
+        return slice(int(self.offsets[index]), int(self.offsets[index + 1]))
+
+    def get_detections(self, index: int) -> Optional[List[int]]:
+        """
+        Get detection class IDs for an image.
+
+        Mirrors InferenceValidator.get_detections().
+
+        Args:
+            index: Image index
+
+        Returns:
+            List of class IDs, or None if the image has no label file
+        """
+        if not self.has_label[index]:
+            return None
+
+        return self.class_id[self.image_slice(index)].tolist()
+
+    def class_histogram(self, num_classes: int) -> np.ndarray:
+        """
+        Count boxes per class over the whole table.
+
+        Args:
+            num_classes: Number of classes; IDs outside [0, num_classes) are ignored
+
+        Returns:
+            Array of length num_classes with box counts
+        """
+        valid = (self.class_id >= 0) & (self.class_id < num_classes)
+        return np.bincount(self.class_id[valid], minlength=num_classes)
+
+    def count_matrix(self, num_classes: int) -> np.ndarray:
+        """
+        Count boxes per image and class.
+
+        Args:
+            num_classes: Number of classes; IDs outside [0, num_classes) are ignored
+
+        Returns:
+            Array of shape (num_images, num_classes) with box counts
+        """
+        valid = (self.class_id >= 0) & (self.class_id < num_classes)
+        flat = (self.image_index[valid].astype(np.int64) * num_classes
+                + self.class_id[valid])
+        counts = np.bincount(flat, minlength=self.num_images * num_classes)
+        return counts.reshape(self.num_images, num_classes)
+
+    def summary(self, num_classes: int) -> Dict:
+        """
+        Compute summary statistics for the table.
+
+        Args:
+            num_classes: Number of classes
+
+        Returns:
+            Dictionary with image/box totals and per-class box and image counts
+        """
+        matrix = self.count_matrix(num_classes)
+        boxes_per_image = np.diff(self.offsets)
+
+        return {
+            'total_images': self.num_images,
+            'images_with_labels': int(self.has_label.sum()),
+            'images_with_detections': int((boxes_per_image > 0).sum()),
+            'total_detections': len(self),
+            'detections_per_class': matrix.sum(axis=0),
+            'images_per_class': (matrix > 0).sum(axis=0)
+        }
+
+
+def load_label_table(image_paths: Sequence[Path],
+                     label_paths: Sequence[Optional[Path]],
+                     progress: Optional[ProgressCallback] = None) -> LabelTable:
+    """
+    Read a set of YOLO label files into a LabelTable.
+
+    Lines are split in Python but all numeric conversion is done in single
+    NumPy calls over the whole dataset, so no per-box objects are created.
+
+    Malformed values are handled like InferenceValidator.get_detections():
+    a file with a class ID that is not an integer keeps its label flag but
+    contributes no boxes, while malformed coordinates or confidences only
+    become NaN, so the class counts of the file are kept.
+
+    Args:
+        image_paths: Image paths, defining the image index order
+        label_paths: Label file for each image, or None where there is none
+        progress: Called with (images done, total images) every
+            PROGRESS_INTERVAL images; may raise to abort loading
+
+    Returns:
+        LabelTable with every parsed box
+    """
+    num_images = len(image_paths)
+    has_label = np.zeros(num_images, dtype=bool)
+    counts = np.zeros(num_images, dtype=np.int64)
+    classes: List[str] = []
+    coords: List[str] = []
+    confs: List[str] = []
+    file_ranges = []
+
+    for index, label_path in enumerate(label_paths):
+        if progress is not None and index % PROGRESS_INTERVAL == 0:
+            progress(index, num_images)
+
+        if label_path is None:
+            continue
+
+        try:
+            with open(label_path, 'r') as f:
+                text = f.read()
+        except Exception as e:
+            print(f"Error reading label file {label_path}: {e}")
+            has_label[index] = True
+            continue
+
+        has_label[index] = True
+        start = len(classes)
+
+        for line in text.splitlines():
+            # YOLO format: class_id x_center y_center width height [confidence]
+            parts = line.split()
+            if len(parts) >= 5:
+                classes.append(parts[0])
+                coords.extend(parts[1:5])
+                confs.append(parts[5] if len(parts) == 6 else 'nan')
+
+        counts[index] = len(classes) - start
+        file_ranges.append((index, start, len(classes), label_path))
+
+    try:
+        class_id = np.array(classes, dtype=str).astype(np.int64)
+        keep = None
+    except ValueError:
+        class_id, keep = _convert_class_ids(classes, counts, file_ranges)
+
+    boxes = _to_float(coords, np.float64).reshape(-1, 4)
+    conf = _to_float(confs, np.float32)
+    if keep is not None:
+        boxes = boxes[keep]
+        conf = conf[keep]
+
+    if progress is not None:
+        progress(num_images, num_images)
+
+    offsets = np.zeros(num_images + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    if np.isnan(conf).all():
+        conf = None
+
+    return LabelTable(image_paths, has_label, offsets, class_id.astype(np.int32), boxes, conf)
+
+
+def count_label_files(label_paths: Sequence[Path],
+                      num_classes: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parse label files and count boxes per file and class.
+
+    Worker entry point for parallel aggregation: only the compact count
+    arrays are sent back to the parent process, not the parsed boxes.
+
+    Args:
+        label_paths: Label files to parse
+        num_classes: Number of classes; IDs outside [0, num_classes) are ignored
+
+    Returns:
+        Tuple of (has_label array, count matrix of shape (files, num_classes))
+    """
+    table = load_label_table(label_paths, label_paths)
+    return table.has_label, table.count_matrix(num_classes).astype(np.int32)
+
+
+def _to_float(values: List[str], dtype) -> np.ndarray:
+    """Convert strings to floats in bulk, with NaN for malformed values."""
+    try:
+        return np.array(values, dtype=dtype)
+    except ValueError:
+        pass
+
+    converted = np.empty(len(values), dtype=dtype)
+    for index, value in enumerate(values):
+        try:
+            converted[index] = float(value)
+        except ValueError:
+            converted[index] = np.nan
+    return converted
+
+
+def _convert_class_ids(classes: List[str], counts: np.ndarray,
+                       file_ranges: List) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert class IDs file by file, dropping files with a non-integer class ID.
+
+    Slow path used only when the bulk conversion fails. Dropped files get a
+    box count of 0.
+
+    Returns:
+        Tuple of (class IDs of the kept boxes, boolean mask of kept boxes)
+    """
+    keep = np.zeros(len(classes), dtype=bool)
+    class_ids = []
+
+    for index, start, end, label_path in file_ranges:
+        try:
+            file_ids = np.array(classes[start:end], dtype=str).astype(np.int64)
+        except ValueError as e:
+            print(f"Error reading label file {label_path}: {e}")
+            counts[index] = 0
+            continue
+
+        keep[start:end] = True
+        class_ids.append(file_ids)
+
+    if not class_ids:
+        return np.zeros(0, dtype=np.int64), keep
+
+    return np.concatenate(class_ids), keep
@@ -0,0 +1,200 @@
+"""
+Module for lightweight timing instrumentation of hot paths.
+
+Code under measurement wraps itself in ``metrics.timer(name)`` or is
+decorated with ``metrics.timed(name)``. While collection is disabled (the
+default) the timer is a shared no-op context manager, so instrumented code
+pays only for one attribute check.
+"""
+
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Callable, Deque, Dict
+
+
+# Returned by Metrics.timer() while collection is disabled
+_NO_TIMER = nullcontext()
+
+
+class _Timer:
+    """Context manager that records its elapsed time on exit."""
+
+    __slots__ = ('_metrics', '_name', '_start')
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._metrics.record(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class Metrics:
+    """
+    Registry of timers, counters and cache statistics.
+
+    Timers keep their most recent samples for percentiles plus running
+    totals over all samples. Recording is thread-safe, so timers can be
+    used on decoder worker threads.
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        """
+        Initialize an empty, disabled registry.
+
+        Args:
+            max_samples: Number of recent samples kept per timer for percentiles
+        """
+        self.enabled = False
+        self.max_samples = max_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._totals: Dict[str, list] = {}
+        self._counters: Dict[str, int] = {}
+        self._caches: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def enable(self, enabled: bool = True):
+        """
+        Turn collection on or off.
+
+        Args:
+            enabled: Whether timers and counters record anything
+        """
+        self.enabled = enabled
+
+    def timer(self, name: str):
+        """
+        Time a block of code.
+
+        Args:
+            name: Timer name, e.g. 'image.decode'
+
+        Returns:
+            Context manager recording the block's duration under name
+        """
+        if not self.enabled:
+            return _NO_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name: str) -> Callable[[Callable], Callable]:
+        """
+        Decorator timing every call of a function.
+
+        Args:
+            name: Timer name
+
+        Returns:
+            Decorator
+        """
+        def decorate(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Timer(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def record(self, name: str, seconds: float):
+        """
+        Add a timing sample.
+
+        Args:
+            name: Timer name
+            seconds: Duration in seconds
+        """
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.max_samples)
+                self._totals[name] = [0, 0.0]
+            samples.append(seconds)
+            totals = self._totals[name]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def count(self, name: str, amount: int = 1):
+        """
+        Increase a counter if collection is enabled.
+
+        Args:
+            name: Counter name
+            amount: Amount to add
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def register_cache(self, name: str, cache):
+        """
+        Include a cache's hit/miss statistics in snapshots.
+
+        The cache keeps its own counters, so registering it costs nothing
+        on lookups.
+
+        Args:
+            name: Name to report the cache under
+            cache: Object with a ``get_stats()`` method returning 'hits',
+                'misses' and 'hit_rate', e.g. ImageCache
+        """
+        self._caches[name] = cache
+
+    def reset(self):
+        """Drop all timer samples and counters."""
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict:
+        """
+        Summarize everything recorded so far.
+
+        Returns:
+            Dictionary with 'timers' (per timer: 'count', 'total_ms',
+            'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms' and 'max_ms', with
+            percentiles over the most recent samples), 'counters' and
+            'caches' (per registered cache: its get_stats())
+        """
+        import numpy as np
+
+        with self._lock:
+            samples = {name: np.fromiter(values, dtype=np.float64, count=len(values))
+                       for name, values in self._samples.items()}
+            totals = {name: tuple(values) for name, values in self._totals.items()}
+            counters = dict(self._counters)
+
+        timers = {}
+        for name in sorted(samples):
+            count, total = totals[name]
+            p50, p95, p99 = np.percentile(samples[name], [50, 95, 99]) * 1000
+            timers[name] = {
+                'count': count,
+                'total_ms': total * 1000,
+                'mean_ms': total * 1000 / count,
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'p99_ms': float(p99),
+                'max_ms': float(samples[name].max() * 1000)
+            }
+
+        return {
+            'enabled': self.enabled,
+            'timers': timers,
+            'counters': dict(sorted(counters.items())),
+            'caches': {name: cache.get_stats() for name, cache in self._caches.items()}
+        }
+
+
+# Registry shared by all instrumented modules
+metrics = Metrics()
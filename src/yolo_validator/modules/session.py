@@ -0,0 +1,217 @@
+"""
+Module for storing per-image validation state in dense arrays.
+"""
+
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+
+class ValidationSession:
+    """
+    Array-backed store of detected and manual counts for a validation run.
+
+    Counts are kept in dense (images x classes) integer arrays whose columns
+    follow the exporter's column order (sorted unique class names), plus a
+    processed bitmap with an incrementally maintained counter.
+    """
+
+    def __init__(self, image_names: Sequence[str], class_names: Dict[int, str]):
+        """
+        Initialize an empty session.
+
+        Args:
+            image_names: Image file names, in navigation order
+            class_names: Dictionary mapping class IDs to class names
+        """
+        self.image_names = list(image_names)
+        self.class_names = class_names
+        self.class_columns: List[str] = sorted(set(class_names.values()))
+        self._column = {name: index for index, name in enumerate(self.class_columns)}
+
+        num_images = len(self.image_names)
+        num_columns = len(self.class_columns)
+        self.detected = np.zeros((num_images, num_columns), dtype=np.int32)
+        self.manual = np.zeros((num_images, num_columns), dtype=np.int32)
+        self.has_label = np.zeros(num_images, dtype=bool)
+        self.processed = np.zeros(num_images, dtype=bool)
+        self.processed_count = 0
+
+    def __len__(self) -> int:
+        """Number of images in the session."""
+        return len(self.image_names)
+
+    def column_of(self, class_name: str) -> Optional[int]:
+        """
+        Get the array column of a class.
+
+        Args:
+            class_name: Class name
+
+        Returns:
+            Column index, or None for unknown classes
+        """
+        return self._column.get(class_name)
+
+    def load_detections(self, has_label: np.ndarray, class_counts: np.ndarray):
+        """
+        Fill detected counts for every image from a per-class-ID count matrix.
+
+        Args:
+            has_label: Boolean array, True where the image has a label file
+            class_counts: Array of shape (images, num_class_ids) indexed by class ID,
+                e.g. LabelTable.count_matrix()
+        """
+        self.has_label[:] = has_label
+        self.detected[:] = 0
+
+        for class_id, class_name in self.class_names.items():
+            if 0 <= class_id < class_counts.shape[1]:
+                self.detected[:, self._column[class_name]] += class_counts[:, class_id]
+
+    def set_processed(self, index: int, processed: bool = True):
+        """
+        Mark an image as processed (or not), keeping the counter up to date.
+
+        Args:
+            index: Image index
+            processed: New processed state
+        """
+        if self.processed[index] != processed:
+            self.processed[index] = processed
+            self.processed_count += 1 if processed else -1
+
+    def mark_processed(self, indices: np.ndarray):
+        """
+        Mark several images as processed at once.
+
+        Args:
+            indices: Image indices
+        """
+        self.processed[indices] = True
+        self.processed_count = int(self.processed.sum())
+
+    def mark_all_processed(self):
+        """Mark every image as processed."""
+        self.processed[:] = True
+        self.processed_count = len(self)
+
+    def set_manual_counts(self, index: int, manual_counts: Dict[str, int]):
+        """
+        Replace the manual counts of an image.
+
+        Args:
+            index: Image index
+            manual_counts: Dictionary mapping class names to counts;
+                unknown class names are ignored
+        """
+        row = self.manual[index]
+        row[:] = 0
+
+        for class_name, count in manual_counts.items():
+            column = self._column.get(class_name)
+            if column is not None:
+                row[column] = count
+
+    def save(self, index: int, manual_counts: Dict[str, int]):
+        """
+        Store the manual counts of an image and mark it processed.
+
+        Args:
+            index: Image index
+            manual_counts: Dictionary mapping class names to counts
+        """
+        self.set_manual_counts(index, manual_counts)
+        self.set_processed(index)
+
+    def get_manual_counts(self, index: int) -> Dict[str, int]:
+        """
+        Get the non-zero manual counts of an image.
+
+        Args:
+            index: Image index
+
+        Returns:
+            Dictionary mapping class names to counts
+        """
+        row = self.manual[index]
+        return {self.class_columns[column]: int(row[column])
+                for column in np.flatnonzero(row)}
+
+    def get_detected_counts(self, index: int) -> Dict[str, int]:
+        """
+        Get the non-zero detected counts of an image.
+
+        Args:
+            index: Image index
+
+        Returns:
+            Dictionary mapping class names to counts
+        """
+        row = self.detected[index]
+        return {self.class_columns[column]: int(row[column])
+                for column in np.flatnonzero(row)}
+
+    def get_record(self, index: int) -> Dict:
+        """
+        Get an image's state as a validation data dictionary.
+
+        Args:
+            index: Image index
+
+        Returns:
+            Dictionary in the format accepted by DataExporter
+        """
+        return {
+            'image_name': self.image_names[index],
+            'detected_counts': self.get_detected_counts(index),
+            'manual_counts': self.get_manual_counts(index),
+            'has_label_file': bool(self.has_label[index]),
+            'processed': bool(self.processed[index])
+        }
+
+    def iter_records(self) -> Iterator[Dict]:
+        """
+        Iterate over processed images as validation data dictionaries.
+
+        Yields:
+            Dictionary per processed image, in navigation order
+        """
+        for index in np.flatnonzero(self.processed):
+            yield self.get_record(int(index))
+
+    def first_unprocessed(self) -> Optional[int]:
+        """
+        Get the index of the first image not yet processed.
+
+        Returns:
+            Image index, or None if every image is processed
+        """
+        remaining = np.flatnonzero(~self.processed)
+        return int(remaining[0]) if len(remaining) else None
+
+    @classmethod
+    def from_records(cls, validation_data: Sequence[Dict],
+                     class_names: Dict[int, str]) -> 'ValidationSession':
+        """
+        Build a session from a list of validation data dictionaries.
+
+        Args:
+            validation_data: List of validation data dictionaries
+            class_names: Dictionary mapping class IDs to class names
+
+        Returns:
+            Equivalent ValidationSession
+        """
+        session = cls([item.get('image_name', '') for item in validation_data], class_names)
+
+        for index, item in enumerate(validation_data):
+            for class_name, count in item.get('detected_counts', {}).items():
+                column = session.column_of(class_name)
+                if column is not None:
+                    session.detected[index, column] = count
+            session.set_manual_counts(index, item.get('manual_counts', {}))
+            session.has_label[index] = item.get('has_label_file', False)
+            session.set_processed(index, bool(item.get('processed', False)))
+
+        return session
@@ -0,0 +1,160 @@
+"""
+Module for journaling manual counts so sessions survive crashes.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict
+
+from .session import ValidationSession
+
+
+class SessionJournal:
+    """
+    Append-only JSONL journal of saved manual counts.
+
+    Every save appends one small record (image name and non-zero manual
+    counts) and fsyncs it, so at most the save in progress is lost on a
+    crash. Replaying the journal restores the session; later records for the
+    same image win. The journal is compacted to one record per processed
+    image once it grows well beyond that.
+
+    A journal may hold records for images outside the loaded session, e.g.
+    after loading only some of the folders that share it. Those records are
+    kept as they are through compaction.
+    """
+
+    JOURNAL_FILENAME = '.yolo_validator_journal.jsonl'
+
+    # Compact once the journal holds this many records and at least twice
+    # as many as there are processed images
+    COMPACT_MIN_RECORDS = 1000
+
+    def __init__(self, journal_path: Path):
+        """
+        Initialize the journal.
+
+        Args:
+            journal_path: Path of the journal file
+        """
+        self.journal_path = Path(journal_path)
+        self.num_records = 0
+
+        # Latest record of every journaled image that is not in the session,
+        # in journal order
+        self._other_records: Dict[str, Dict] = {}
+
+        # Set when replay finds a partial last line that must be terminated
+        self._needs_newline = False
+
+    def replay(self, session: ValidationSession) -> int:
+        """
+        Apply the journal to a session.
+
+        Records for images that are not in the session are set aside for
+        compaction; a truncated final line left by a crash is ignored.
+
+        Args:
+            session: Session to restore manual counts into
+
+        Returns:
+            Number of records applied
+        """
+        if not self.journal_path.exists():
+            return 0
+
+        index_of = {name: index for index, name in enumerate(session.image_names)}
+        applied = 0
+        self.num_records = 0
+        self._other_records = {}
+
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                self._needs_newline = not line.endswith('\n')
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+
+                self.num_records += 1
+                index = index_of.get(record.get('image'))
+                if index is not None:
+                    session.save(index, record.get('manual', {}))
+                    applied += 1
+                elif 'image' in record:
+                    self._other_records.pop(record['image'], None)
+                    self._other_records[record['image']] = record
+
+        return applied
+
+    @staticmethod
+    def _record(session: ValidationSession, index: int) -> Dict:
+        """Build the journal record of an image."""
+        return {
+            'image': session.image_names[index],
+            'manual': session.get_manual_counts(index)
+        }
+
+    def append(self, session: ValidationSession, index: int):
+        """
+        Append the saved state of an image, compacting the journal if needed.
+
+        Args:
+            session: Session holding the saved counts
+            index: Image index that was just saved
+        """
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            if self._needs_newline:
+                f.write('\n')
+                self._needs_newline = False
+            f.write(json.dumps(self._record(session, index)) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.num_records += 1
+
+        if (self.num_records >= self.COMPACT_MIN_RECORDS
+                and self.num_records >= 2 * self._live_records(session)):
+            self.compact(session)
+
+    def _live_records(self, session: ValidationSession) -> int:
+        """Number of records a compacted journal holds."""
+        return session.processed_count + len(self._other_records)
+
+    def is_compact(self, session: ValidationSession) -> bool:
+        """
+        Check whether the journal holds only one record per journaled image.
+
+        Args:
+            session: Session the journal was replayed into
+
+        Returns:
+            True if compacting would not shrink the journal
+        """
+        return self.num_records <= self._live_records(session)
+
+    def compact(self, session: ValidationSession):
+        """
+        Rewrite the journal with one record per processed image.
+
+        Records of images outside the session found by replay() are written
+        first, unchanged. The new journal is written to a temporary file and swapped in
+        atomically, so a crash during compaction keeps the old journal.
+
+        Args:
+            session: Session whose processed images are written
+        """
+        tmp_path = self.journal_path.with_name(self.journal_path.name + '.tmp')
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in self._other_records.values():
+                f.write(json.dumps(record) + '\n')
+            for index in session.processed.nonzero()[0]:
+                f.write(json.dumps(self._record(session, int(index))) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, self.journal_path)
+        self.num_records = self._live_records(session)
+        self._needs_newline = False
@@ -0,0 +1,152 @@
+"""
+Module for sweeping the confidence threshold against manual counts.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from .label_table import LabelTable
+from .session import ValidationSession
+
+
+# Thresholds reported in the sweep curves: 0.00, 0.01, ..., 1.00
+SWEEP_THRESHOLDS = np.round(np.linspace(0.0, 1.0, 101), 2)
+
+
+def _best_cut(conf: np.ndarray, error: np.ndarray, base_error: int) -> tuple:
+    """
+    Find the threshold with the lowest count error along a sorted pass.
+
+    Args:
+        conf: Confidences sorted in decreasing order
+        error: Count error after keeping each prefix of the boxes
+        base_error: Count error when no box is kept
+
+    Returns:
+        Tuple of (threshold, error); the threshold is inf if keeping no box
+        is best
+    """
+    if not len(conf):
+        return float('inf'), int(base_error)
+
+    # Boxes with equal confidence pass or fail together, so only the last
+    # box of each run of equal values is a valid cut
+    cuts = np.flatnonzero(np.append(conf[1:] != conf[:-1], True))
+    best = cuts[np.argmin(error[cuts])]
+    if error[best] >= base_error:
+        return float('inf'), int(base_error)
+
+    return round(float(conf[best]), 6), int(error[best])
+
+
+def sweep_confidence(table: LabelTable, session: ValidationSession,
+                     images: Optional[np.ndarray] = None,
+                     thresholds: np.ndarray = SWEEP_THRESHOLDS) -> Dict:
+    """
+    Compute detected counts and count error for every confidence threshold.
+
+    All boxes are sorted by confidence once. Lowering the threshold past a
+    box raises the detected count of its (image, class) cell by one, which
+    lowers the absolute error against the manual count if the box's rank in
+    its cell is within the manual count and raises it otherwise. A cumulative
+    sum of these +/-1 steps therefore gives the error at every threshold.
+
+    Args:
+        table: Predictions with a confidence column, in session image order
+        session: Session holding the manual counts
+        images: Boolean mask of images to include (default: processed images)
+        thresholds: Thresholds to report the curves at; boxes with confidence
+            >= threshold are kept
+
+    Returns:
+        Dictionary with 'thresholds', per-class 'detected' and 'abs_error'
+        curves of shape (classes, thresholds) in session column order,
+        'total_abs_error' per threshold, 'manual_total' per class, the
+        per-class 'best_threshold' and 'best_error', and the
+        'overall_best_threshold' and 'overall_best_error' for a single
+        threshold shared by all classes
+    """
+    if table.conf is None:
+        raise ValueError("Label files have no confidence column (save_conf=True)")
+    if table.num_images != len(session):
+        raise ValueError("Label table and session must cover the same images")
+
+    if images is None:
+        images = session.processed
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    num_columns = len(session.class_columns)
+
+    # Class ID -> session column lookup
+    column_of = np.full(max(session.class_names, default=-1) + 1, -1, dtype=np.int64)
+    for class_id, class_name in session.class_names.items():
+        if class_id >= 0:
+            column_of[class_id] = session.column_of(class_name)
+
+    known = (table.class_id >= 0) & (table.class_id < len(column_of))
+    rows = np.flatnonzero(known)
+    rows = rows[images[table.image_index[rows]] & (column_of[table.class_id[rows]] >= 0)]
+
+    columns = column_of[table.class_id[rows]]
+    image_index = table.image_index[rows].astype(np.int64)
+    conf = np.nan_to_num(table.conf[rows], nan=1.0).astype(np.float64)
+
+    # Rank of each box within its (image, class) cell, by decreasing confidence
+    cells = image_index * num_columns + columns
+    order = np.lexsort((-conf, cells))
+    sorted_cells = cells[order]
+    run_start = np.flatnonzero(np.append(True, sorted_cells[1:] != sorted_cells[:-1]))
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order)) - np.repeat(
+        run_start, np.diff(np.append(run_start, len(order))))
+
+    manual = session.manual[images]
+    manual_total = manual.sum(axis=0).astype(np.int64)
+    step = np.where(rank < session.manual[image_index, columns], -1, 1)
+
+    # One pass in decreasing confidence, grouped by class for per-class curves
+    order = np.lexsort((-conf, columns))
+    conf_sorted = conf[order]
+    step_sorted = step[order]
+    class_start = np.searchsorted(columns[order], np.arange(num_columns + 1))
+
+    detected = np.zeros((num_columns, len(thresholds)), dtype=np.int64)
+    abs_error = np.zeros((num_columns, len(thresholds)), dtype=np.int64)
+    best_threshold = np.full(num_columns, np.inf)
+
+    # Compare at the float32 precision of the parsed confidences, so that a
+    # box written as 0.25 passes the 0.25 threshold
+    cut_values = thresholds.astype(np.float32).astype(np.float64)
+    best_error = manual_total.copy()
+
+    for column in range(num_columns):
+        part = slice(class_start[column], class_start[column + 1])
+        class_conf = conf_sorted[part]
+        error = manual_total[column] + np.cumsum(step_sorted[part])
+
+        # Number of boxes with confidence >= each threshold
+        kept = np.searchsorted(-class_conf, -cut_values, side='right')
+        detected[column] = kept
+        abs_error[column] = np.append(manual_total[column], error)[kept]
+
+        best_threshold[column], best_error[column] = _best_cut(
+            class_conf, error, manual_total[column])
+
+    # A single threshold for every class: the same pass over all boxes
+    order = np.argsort(-conf, kind='stable')
+    total_error = int(manual_total.sum()) + np.cumsum(step[order])
+    overall_threshold, overall_error = _best_cut(conf[order], total_error,
+                                                 int(manual_total.sum()))
+
+    return {
+        'thresholds': thresholds,
+        'class_names': list(session.class_columns),
+        'detected': detected,
+        'abs_error': abs_error,
+        'total_abs_error': abs_error.sum(axis=0),
+        'manual_total': manual_total,
+        'best_threshold': best_threshold,
+        'best_error': best_error,
+        'overall_best_threshold': overall_threshold,
+        'overall_best_error': overall_error
+    }
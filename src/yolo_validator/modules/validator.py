@@ -3,9 +3,143 @@ Module for validating YOLOv8 inference results.
 Handles image and label file validation.
 """
 
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor,
+                                wait)
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+import glob
+import hashlib
 import os
+import sys
+import threading
+
+import numpy as np
+
+from .label_cache import LabelCache
+from .label_table import (LabelTable, ProgressCallback, count_label_files,
+                          load_label_table)
+from .metrics import metrics
+
+
+# Called with (images found so far, first image found) while folders are scanned
+ScanProgressCallback = Callable[[int, Path], None]
+
+# One results folder, a glob pattern, or a list of either
+ResultsFolders = Union[str, os.PathLike, Sequence[Union[str, os.PathLike]]]
+
+
+def resolve_results_folders(results_folders: ResultsFolders,
+                            recursive: bool = False) -> List[Path]:
+    """
+    Expand results folder arguments into a list of existing folders.
+    
+    Arguments containing glob characters are expanded (``**`` matches any
+    number of subfolders); other arguments must exist. Duplicates are
+    dropped, as are folders inside another folder when walking recursively.
+    
+    Args:
+        results_folders: Results folder, glob pattern, or a list of either
+        recursive: Whether the folders will be walked recursively
+        
+    Returns:
+        List of results folders, in argument order
+    """
+    if isinstance(results_folders, (str, os.PathLike)):
+        results_folders = [results_folders]
+    
+    roots = []
+    for folder in map(str, results_folders):
+        if any(char in folder for char in '*?['):
+            matches = sorted(match for match in glob.glob(folder, recursive=True)
+                             if os.path.isdir(match))
+            if not matches:
+                raise ValueError(f"No results folders match: {folder}")
+            roots.extend(Path(match) for match in matches)
+        else:
+            if not os.path.exists(folder):
+                raise ValueError(f"Results folder does not exist: {folder}")
+            roots.append(Path(folder))
+    
+    if not roots:
+        raise ValueError("No results folder given")
+    
+    unique = {}
+    for root in roots:
+        unique.setdefault(os.path.normcase(os.path.abspath(root)), root)
+    
+    if recursive:
+        # Images below a nested root are already found by walking its parent
+        keys = list(unique)
+        unique = {key: root for key, root in unique.items()
+                  if not any(key.startswith(other + os.sep) for other in keys)}
+    
+    return list(unique.values())
+
+
+def app_data_folder() -> Path:
+    """
+    Get the per-user folder for files that do not belong in a results folder.
+    
+    Returns:
+        ``%LOCALAPPDATA%``, ``~/Library/Caches`` or ``$XDG_CACHE_HOME``
+        (default ``~/.cache``), followed by ``yolo_validator``
+    """
+    if sys.platform == 'win32' and os.environ.get('LOCALAPPDATA'):
+        base = Path(os.environ['LOCALAPPDATA'])
+    elif sys.platform == 'darwin':
+        base = Path.home() / 'Library' / 'Caches'
+    else:
+        base = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache')
+    return base / 'yolo_validator'
+
+
+def state_folder_for(roots: Sequence[Path]) -> Path:
+    """
+    Get the folder holding the label cache and session journal of a root set.
+    
+    A single results folder keeps them inside itself. Several folders share
+    a folder under app_data_folder() named after a hash of the sorted
+    absolute folder paths, so the same set finds its files again whatever
+    the argument order, and unrelated sets never overwrite each other.
+    
+    Args:
+        roots: Results folders from resolve_results_folders()
+        
+    Returns:
+        Folder path (it may not exist yet)
+    """
+    if len(roots) == 1:
+        return Path(roots[0])
+    
+    key = '\n'.join(sorted(os.path.normcase(os.path.abspath(root)) for root in roots))
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return app_data_folder() / 'sessions' / digest
+
+
+class _ScanCounter:
+    """Thread-safe image counter that reports scan progress in batches."""
+    
+    def __init__(self, progress: ScanProgressCallback, interval: int):
+        self.progress = progress
+        self.interval = interval
+        self.count = 0
+        self.first: Optional[Path] = None
+        self._next_report = 1
+        self._lock = threading.Lock()
+    
+    def add(self, count: int, first: str):
+        """Count newly found images; may raise to abort the scan."""
+        with self._lock:
+            self.count += count
+            if self.first is None:
+                self.first = Path(first)
+            if self.count < self._next_report:
+                return
+            self._next_report = self.count + self.interval
+            total = self.count
+        
+        self.progress(total, self.first)
 
 
 class InferenceValidator:
@@ -13,35 +147,218 @@ class InferenceValidator:
     
     SUPPORTED_IMAGE_FORMATS = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
     
-    def __init__(self, results_folder: Path, class_names: Dict[int, str]):
+    # Subfolders of a predict run that are not walked recursively: label
+    # files, and the per-class box crops written with save_crop=True
+    SKIPPED_SUBFOLDERS = {'labels', 'crops'}
+    
+    def __init__(self, results_folder: ResultsFolders, class_names: Dict[int, str],
+                 recursive: bool = False, scan_workers: int = 8):
         """
         Initialize the validator.
         
+        Every folder holding images is paired with its own ``labels``
+        subfolder, as written by Ultralytics ``predict``.
+        
         Args:
-            results_folder: Path to the folder containing inference results
+            results_folder: Path to the folder containing inference results,
+                a glob pattern such as ``runs/detect/predict*``, or a list
+                of either
             class_names: Dictionary mapping class IDs to class names
+            recursive: Also index images in subfolders (``labels`` and
+                ``crops`` folders are skipped)
+            scan_workers: Number of threads walking folders concurrently
         """
-        self.results_folder = Path(results_folder)
-        self.labels_folder = self.results_folder / 'labels'
+        self.roots = resolve_results_folders(results_folder, recursive)
+        self.recursive = recursive
+        self.scan_workers = max(1, scan_workers)
         self.class_names = class_names
         
-        if not self.results_folder.exists():
-            raise ValueError(f"Results folder does not exist: {self.results_folder}")
+        # Folder holding every root; image names are relative to it
+        try:
+            self.results_folder = Path(os.path.commonpath([str(root) for root in self.roots]))
+        except ValueError:
+            self.results_folder = self.roots[0]
+        self.labels_folder = self.results_folder / 'labels'
+        
+        # Where the label cache and the session journal are kept
+        self.state_folder = state_folder_for(self.roots)
+        
+        # Directory index, built lazily on first use (see _build_index)
+        self._image_files: Optional[List[Path]] = None
+        self._image_stems: List[str] = []
+        self._image_labels: List[Optional[str]] = []
+        self._label_of: Optional[Dict[str, Optional[str]]] = None
+    
+    # Number of images found between scan progress callbacks
+    SCAN_PROGRESS_INTERVAL = 2000
+    
+    # Images counted locally by a folder scan before updating the total
+    SCAN_BATCH = 256
+    
+    def _scan_folder(self, folder: str,
+                     counter: Optional[_ScanCounter]) -> Tuple[str, List[str], Dict[str, str],
+                                                               List[str]]:
+        """
+        Read one folder with a single os.scandir pass.
+        
+        Args:
+            folder: Folder to scan
+            counter: Progress counter, if reporting progress
+            
+        Returns:
+            Tuple of (folder, image names in directory order, label files of
+            the folder's labels subfolder by stem, subfolders to walk)
+        """
+        image_names = []
+        subfolders = []
+        reported = 0
+        
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if (os.path.splitext(entry.name)[1] in self.SUPPORTED_IMAGE_FORMATS
+                        and entry.is_file()):
+                    image_names.append(entry.name)
+                    if counter is not None and (len(image_names) == 1
+                                                or len(image_names) - reported >= self.SCAN_BATCH):
+                        counter.add(len(image_names) - reported, entry.path)
+                        reported = len(image_names)
+                elif (self.recursive and entry.name not in self.SKIPPED_SUBFOLDERS
+                      and entry.is_dir(follow_symlinks=False)):
+                    subfolders.append(entry.path)
+        
+        if counter is not None and len(image_names) > reported:
+            counter.add(len(image_names) - reported, os.path.join(folder, image_names[0]))
+        
+        # No labels folder - every image is treated as unlabelled
+        label_files = (self._scan_label_folder(Path(folder) / 'labels')
+                       if image_names else {})
+        
+        return folder, image_names, label_files, subfolders
+    
+    @metrics.timed('scan')
+    def _build_index(self, progress: Optional[ScanProgressCallback] = None):
+        """
+        Scan the results folders once and join images to labels.
+        
+        Folders are read on a thread pool, one os.scandir pass each, so no
+        per-image stat calls are needed afterwards; subfolders found while
+        walking recursively are queued on the same pool. Labels are joined
+        to images by stem within each folder. Names are kept as strings
+        until the end, as building and comparing Path objects dominates the
+        scan time on large folders.
+        
+        Args:
+            progress: Called with (images found so far, first image found)
+                after the first image and then about every
+                SCAN_PROGRESS_INTERVAL images, possibly from a scanning
+                thread; may raise to abort the scan
+        """
+        counter = (_ScanCounter(progress, self.SCAN_PROGRESS_INTERVAL)
+                   if progress is not None else None)
+        folders = []
+        
+        with ThreadPoolExecutor(max_workers=self.scan_workers,
+                                thread_name_prefix='folder-scan') as executor:
+            pending = {executor.submit(self._scan_folder, str(root), counter)
+                       for root in self.roots}
+            
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        folder, image_names, label_files, subfolders = future.result()
+                        if image_names:
+                            folders.append((folder, image_names, label_files))
+                        pending.update(executor.submit(self._scan_folder, subfolder, counter)
+                                       for subfolder in subfolders)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+        
+        # Folders in path order, each folder's images by name (the same order
+        # as sorting the Path objects for a single folder; case-insensitive
+        # on Windows), so the images of a folder stay together
+        folders.sort(key=lambda entry: os.path.normcase(entry[0]))
+        self._image_files = []
+        self._image_stems = []
+        self._image_labels = []
+        
+        for folder, image_names, label_files in folders:
+            image_names.sort(key=os.path.normcase)
+            folder_path = Path(folder)
+            stems = [os.path.splitext(name)[0] for name in image_names]
+            
+            self._image_files.extend(folder_path / name for name in image_names)
+            self._image_stems.extend(stems)
+            self._image_labels.extend(map(label_files.get, stems))
+        
+        self._label_of = None
+    
+    @staticmethod
+    def _scan_label_folder(folder: Path) -> Dict[str, str]:
+        """
+        Map label file stems to paths with a single os.scandir pass.
+        
+        Args:
+            folder: Folder containing YOLO .txt label files
+            
+        Returns:
+            Dictionary mapping stems to label file paths (empty if the
+            folder does not exist)
+        """
+        label_files = {}
+        
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    stem, ext = os.path.splitext(entry.name)
+                    if ext == '.txt' and entry.is_file():
+                        label_files[stem] = entry.path
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+        
+        return label_files
+    
+    def refresh_index(self, progress: Optional[ScanProgressCallback] = None):
+        """
+        Rescan the results folders, picking up added or removed files.
+        
+        Args:
+            progress: Scan progress callback, see _build_index()
+        """
+        self._build_index(progress)
     
     def get_image_files(self) -> List[Path]:
         """
-        Get all image files from the results folder.
+        Get all image files from the results folders.
         
         Returns:
-            List of image file paths, sorted by name
+            List of image file paths, sorted by folder and then by name
         """
-        image_files = []
+        if self._image_files is None:
+            self._build_index()
         
-        for file_path in self.results_folder.iterdir():
-            if file_path.is_file() and file_path.suffix in self.SUPPORTED_IMAGE_FORMATS:
-                image_files.append(file_path)
+        return list(self._image_files)
+    
+    def get_image_names(self) -> List[str]:
+        """
+        Get image names that are unique across all results folders.
+        
+        Names are paths relative to results_folder with '/' separators, so
+        images directly in a single results folder keep their file name.
+        
+        Returns:
+            List of image names, in the order of get_image_files()
+        """
+        prefix = str(self.results_folder) + os.sep
+        names = []
+        
+        for path in map(str, self.get_image_files()):
+            name = path[len(prefix):] if path.startswith(prefix) else path
+            names.append(name.replace(os.sep, '/'))
         
-        return sorted(image_files)
+        return names
     
     def get_label_file(self, image_path: Path) -> Optional[Path]:
         """
@@ -53,13 +370,16 @@ class InferenceValidator:
         Returns:
             Path to label file if it exists, None otherwise
         """
-        # Get image stem (filename without extension)
-        image_stem = image_path.stem
+        if self._image_files is None:
+            self._build_index()
         
-        # Construct label file path
-        label_path = self.labels_folder / f"{image_stem}.txt"
+        # Built on first use; bulk loading works on the aligned lists instead
+        if self._label_of is None:
+            self._label_of = dict(zip(map(str, self._image_files), self._image_labels))
         
-        return label_path if label_path.exists() else None
+        label_path = self._label_of.get(str(image_path))
+        
+        return Path(label_path) if label_path is not None else None
     
     def validate_labels(self) -> Dict:
         """
@@ -70,14 +390,10 @@ class InferenceValidator:
         """
         image_files = self.get_image_files()
         
-        images_with_labels = 0
-        images_without_labels = 0
-        
-        for image_path in image_files:
-            if self.get_label_file(image_path) is not None:
-                images_with_labels += 1
-            else:
-                images_without_labels += 1
+        images_with_labels = sum(
+            1 for label_path in self._image_labels if label_path is not None
+        )
+        images_without_labels = len(image_files) - images_with_labels
         
         return {
             'total_images': len(image_files),
@@ -85,6 +401,7 @@ class InferenceValidator:
             'images_without_labels': images_without_labels
         }
     
+    @metrics.timed('get_detections')
     def get_detections(self, image_path: Path) -> Optional[List[int]]:
         """
         Get detection class IDs from the label file.
@@ -122,6 +439,103 @@ class InferenceValidator:
         
         return class_ids
     
+    @metrics.timed('load_label_table')
+    def load_label_table(self, use_cache: bool = False,
+                         progress: Optional[ProgressCallback] = None) -> LabelTable:
+        """
+        Load every label file into a column-oriented LabelTable.
+        
+        Image indices in the table follow the order of get_image_files().
+        
+        Args:
+            use_cache: Reuse the on-disk label cache in state_folder,
+                reparsing only label files whose mtime or size changed
+            progress: Called with (files done, total files) while label
+                files are parsed; may raise to abort loading
+        
+        Returns:
+            LabelTable with all detections in the results folder
+        """
+        image_files = self.get_image_files()
+        label_files = list(self._image_labels)
+        
+        if use_cache:
+            cache = LabelCache(self.state_folder / LabelCache.CACHE_FILENAME,
+                               self.results_folder)
+            return cache.load(image_files, label_files, progress)
+        
+        return load_label_table(image_files, label_files, progress)
+    
+    def load_ground_truth_table(self, ground_truth_folder: Path) -> LabelTable:
+        """
+        Load ground-truth label files for the images in the results folder.
+        
+        Ground-truth files are joined to images by stem, so image indices
+        match those of load_label_table(). All ground-truth files are read
+        from one folder, so image stems should be unique across the results
+        folders.
+        
+        Args:
+            ground_truth_folder: Folder containing ground-truth .txt label files
+            
+        Returns:
+            LabelTable with all ground-truth boxes
+        """
+        ground_truth_folder = Path(ground_truth_folder)
+        if not ground_truth_folder.is_dir():
+            raise ValueError(f"Ground truth folder does not exist: {ground_truth_folder}")
+        
+        image_files = self.get_image_files()
+        truth_files = self._scan_label_folder(ground_truth_folder)
+        
+        return load_label_table(image_files,
+                                [truth_files.get(stem) for stem in self._image_stems])
+    
+    @metrics.timed('count_detections')
+    def count_detections(self, num_classes: int, workers: int = 1, use_cache: bool = False,
+                         chunk_size: int = 1000) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Count detections per image and class.
+        
+        With more than one worker the label files are split into chunks that
+        are parsed in a process pool; each worker only returns compact count
+        arrays. The result is identical to the serial path.
+        
+        Args:
+            num_classes: Number of classes; IDs outside [0, num_classes) are ignored
+            workers: Number of worker processes (1 parses in this process)
+            use_cache: Use the on-disk label cache (serial path only)
+            chunk_size: Number of label files per worker task
+        
+        Returns:
+            Tuple of (has_label array, count matrix of shape (images, num_classes)),
+            in the order of get_image_files()
+        """
+        if workers <= 1:
+            table = self.load_label_table(use_cache=use_cache)
+            return table.has_label, table.count_matrix(num_classes)
+        
+        image_files = self.get_image_files()
+        labelled = [index for index, label_path in enumerate(self._image_labels)
+                    if label_path is not None]
+        chunks = [
+            [self._image_labels[index] for index in labelled[start:start + chunk_size]]
+            for start in range(0, len(labelled), chunk_size)
+        ]
+        
+        has_label = np.zeros(len(image_files), dtype=bool)
+        counts = np.zeros((len(image_files), num_classes), dtype=np.int64)
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(count_label_files, chunks, repeat(num_classes))
+            for start, (chunk_has_label, chunk_counts) in zip(
+                    range(0, len(labelled), chunk_size), results):
+                rows = labelled[start:start + chunk_size]
+                has_label[rows] = chunk_has_label
+                counts[rows] = chunk_counts
+        
+        return has_label, counts
+    
     def parse_label_file(self, label_path: Path) -> List[Dict]:
         """
         Parse a YOLO label file and return detailed information.
@@ -149,14 +563,20 @@ class InferenceValidator:
                         width = float(parts[3])
                         height = float(parts[4])
                         
-                        detections.append({
+                        detection = {
                             'class_id': class_id,
                             'class_name': self.class_names.get(class_id, f"Unknown ({class_id})"),
                             'x_center': x_center,
                             'y_center': y_center,
                             'width': width,
                             'height': height
-                        })
+                        }
+                        
+                        # Optional confidence column written with save_conf=True
+                        if len(parts) == 6:
+                            detection['confidence'] = float(parts[5])
+                        
+                        detections.append(detection)
         
         except Exception as e:
             print(f"Error parsing label file {label_path}: {e}")
@@ -0,0 +1,532 @@
+"""
+Reusable tkinter widgets for YOLOv8 Inference Validator.
+"""
+
+from __future__ import annotations
+
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk
+from typing import TYPE_CHECKING, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# NumPy is only needed once boxes are drawn, after the window is up
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class ClassRows:
+    """
+    Row model behind ManualEntryPanel, independent of any widgets.
+
+    Holds the manual count of every class as a sparse dictionary and the
+    list of classes currently shown, which is either every class or only
+    the classes present in the current image plus recently used ones.
+    """
+
+    def __init__(self, max_recent: int = 20):
+        """
+        Initialize an empty model.
+
+        Args:
+            max_recent: Number of recently used classes kept for the filter
+        """
+        self.class_names: List[str] = []
+        self.counts: Dict[str, int] = {}
+        self.present: List[str] = []
+        self.only_relevant = False
+        self.max_recent = max_recent
+        self._recent: 'OrderedDict[str, None]' = OrderedDict()
+        self._position: Dict[str, int] = {}
+        self._rows: List[str] = []
+
+    def set_classes(self, class_names: List[str]):
+        """
+        Replace the class list.
+
+        Args:
+            class_names: Class names in display order
+        """
+        self.class_names = list(class_names)
+        self._position = {name: index for index, name in enumerate(self.class_names)}
+        self.counts = {}
+        self.present = []
+        self._recent.clear()
+        self._update_rows()
+
+    def set_counts(self, counts: Dict[str, int], present: Iterable[str] = ()):
+        """
+        Replace the counts and the classes present in the current image.
+
+        Args:
+            counts: Non-zero manual counts by class name
+            present: Classes detected in the current image
+        """
+        self.counts = {name: count for name, count in counts.items()
+                       if count and name in self._position}
+        self.present = [name for name in present if name in self._position]
+        if self.only_relevant:
+            self._update_rows()
+
+    def set_count(self, class_name: str, count: int):
+        """Set the count of one class."""
+        if count:
+            self.counts[class_name] = count
+        else:
+            self.counts.pop(class_name, None)
+
+    def mark_used(self, class_names: Iterable[str]):
+        """
+        Remember classes for the present/recent filter.
+
+        Args:
+            class_names: Classes the user just entered counts for
+        """
+        for name in class_names:
+            self._recent[name] = None
+            self._recent.move_to_end(name)
+        while len(self._recent) > self.max_recent:
+            self._recent.popitem(last=False)
+        if self.only_relevant:
+            self._update_rows()
+
+    def set_filter(self, only_relevant: bool):
+        """Show only present/recent classes (True) or every class (False)."""
+        self.only_relevant = only_relevant
+        self._update_rows()
+
+    def _update_rows(self):
+        """Rebuild the list of shown classes."""
+        if not self.only_relevant:
+            self._rows = self.class_names
+            return
+
+        # Classes with a count stay visible so they can be corrected
+        relevant = set(self.present) | set(self._recent) | set(self.counts)
+        self._rows = sorted((name for name in relevant if name in self._position),
+                            key=self._position.__getitem__)
+
+    @property
+    def rows(self) -> List[str]:
+        """Class names currently shown, in display order."""
+        return self._rows
+
+
+class ManualEntryPanel(ttk.Frame):
+    """
+    Virtualized list of class name / count rows.
+
+    Only a fixed pool of label and spinbox rows (enough to fill the visible
+    height) is created. Scrolling rebinds the pool to other classes, and
+    loading an image only rewrites rows whose value changed, so the cost of
+    navigation does not grow with the number of classes.
+    """
+
+    def __init__(self, parent: tk.Widget, visible_rows: int = 12, max_count: int = 100):
+        """
+        Initialize the panel.
+
+        Args:
+            parent: Parent widget
+            visible_rows: Number of rows shown (and widgets created)
+            max_count: Upper bound of the spinboxes
+        """
+        super().__init__(parent)
+        self.model = ClassRows()
+        self.first_row = 0
+        self._updating = False
+
+        self.filter_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self, text="Only present/recent classes",
+                        variable=self.filter_var, command=self._toggle_filter).grid(
+            row=0, column=0, columnspan=3, sticky=tk.W, padx=2, pady=(0, 2))
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scroll)
+        self.scrollbar.grid(row=1, column=2, rowspan=visible_rows, sticky=(tk.N, tk.S))
+
+        self._labels: List[ttk.Label] = []
+        self._vars: List[tk.StringVar] = []
+        self._spinboxes: List[ttk.Spinbox] = []
+        self._bound: List[str] = []
+
+        for slot in range(visible_rows):
+            label = ttk.Label(self, text="", font=("Arial", 8), width=28)
+            label.grid(row=slot + 1, column=0, padx=2, pady=1, sticky=tk.W)
+
+            var = tk.StringVar(value="0")
+            var.trace_add('write', lambda *args, slot=slot: self._on_edit(slot))
+            spinbox = ttk.Spinbox(self, from_=0, to=max_count, width=5, textvariable=var)
+            spinbox.grid(row=slot + 1, column=1, padx=2, pady=1, sticky=tk.W)
+
+            for widget in (label, spinbox):
+                widget.bind('<MouseWheel>', self._on_wheel)
+                widget.bind('<Button-4>', lambda e: self._scroll_to(self.first_row - 1))
+                widget.bind('<Button-5>', lambda e: self._scroll_to(self.first_row + 1))
+
+            self._labels.append(label)
+            self._vars.append(var)
+            self._spinboxes.append(spinbox)
+            self._bound.append('')
+
+        self.bind('<MouseWheel>', self._on_wheel)
+
+    def set_classes(self, class_names: List[str]):
+        """
+        Show a new class list (e.g. after loading a dataset).
+
+        Args:
+            class_names: Class names in display order
+        """
+        self.model.set_classes(class_names)
+        self.first_row = 0
+        self._refresh()
+
+    def set_counts(self, counts: Dict[str, int], present: Iterable[str] = ()):
+        """
+        Show the counts of a new image.
+
+        Args:
+            counts: Non-zero manual counts by class name
+            present: Classes detected in the image
+        """
+        self.model.set_counts(counts, present)
+        if self.model.only_relevant:
+            self.first_row = 0
+        self._refresh()
+
+    def get_counts(self) -> Dict[str, int]:
+        """
+        Get the entered counts.
+
+        Returns:
+            Dictionary mapping class names to non-zero counts
+        """
+        return dict(self.model.counts)
+
+    def mark_used(self, class_names: Iterable[str]):
+        """Remember classes for the present/recent filter."""
+        self.model.mark_used(class_names)
+        self._refresh()
+
+    def _toggle_filter(self):
+        """Switch between all classes and present/recent classes."""
+        self.model.set_filter(self.filter_var.get())
+        self.first_row = 0
+        self._refresh()
+
+    def _refresh(self):
+        """Bind the row pool to the visible classes, touching only changed rows."""
+        rows = self.model.rows
+        self.first_row = max(0, min(self.first_row, len(rows) - len(self._labels)))
+        self._updating = True
+
+        try:
+            for slot, label in enumerate(self._labels):
+                row = self.first_row + slot
+                class_name = rows[row] if row < len(rows) else ''
+
+                if class_name != self._bound[slot]:
+                    self._bound[slot] = class_name
+                    display_name = (class_name if len(class_name) <= 25
+                                    else class_name[:22] + "...")
+                    label.config(text=display_name)
+                    self._spinboxes[slot].config(
+                        state=tk.NORMAL if class_name else tk.DISABLED)
+
+                value = str(self.model.counts.get(class_name, 0)) if class_name else ''
+                if self._vars[slot].get() != value:
+                    self._vars[slot].set(value)
+        finally:
+            self._updating = False
+
+        if rows:
+            visible = min(len(self._labels), len(rows))
+            self.scrollbar.set(self.first_row / len(rows),
+                               (self.first_row + visible) / len(rows))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_edit(self, slot: int):
+        """
+        Store a value typed or spun by the user in the model.
+
+        An empty field counts as 0. Anything else that is not a count is
+        replaced by the stored value, so the field always shows what is saved.
+        """
+        if self._updating or not self._bound[slot]:
+            return
+
+        class_name = self._bound[slot]
+        text = self._vars[slot].get().strip()
+
+        try:
+            count = int(text) if text else 0
+        except ValueError:
+            count = -1
+
+        if count < 0:
+            self._updating = True
+            try:
+                self._vars[slot].set(str(self.model.counts.get(class_name, 0)))
+            finally:
+                self._updating = False
+            return
+
+        self.model.set_count(class_name, count)
+
+    def _scroll_to(self, first_row: int):
+        """Show rows starting at first_row."""
+        if first_row != self.first_row:
+            self.first_row = first_row
+            self._refresh()
+
+    def _on_scroll(self, *args):
+        """Handle scrollbar commands ('moveto', fraction or 'scroll', n, units)."""
+        total = len(self.model.rows)
+
+        if args[0] == 'moveto':
+            self._scroll_to(int(float(args[1]) * total))
+        elif args[0] == 'scroll':
+            step = len(self._labels) if args[2] == 'pages' else 1
+            self._scroll_to(self.first_row + int(args[1]) * step)
+
+    def _on_wheel(self, event: tk.Event):
+        """Scroll with the mouse wheel (Windows/macOS)."""
+        self._scroll_to(self.first_row - (1 if event.delta > 0 else -1))
+
+
+class BoxOverlay:
+    """
+    Detection boxes drawn over the preview image as canvas items.
+
+    Rectangles are pooled canvas items that are moved with coords() and
+    hidden when unused, so switching images, toggling the overlay or
+    redrawing never re-renders the image bitmap. Scaled pixel geometry is
+    cached per (key, displayed image rectangle).
+    """
+
+    # Distinct outline colors, picked by class ID
+    PALETTE = [
+        '#FF3838', '#FF9D97', '#FF701F', '#FFB21D', '#CFD231', '#48F90A',
+        '#92CC17', '#3DDB86', '#1A9334', '#00D4BB', '#2C99A8', '#00C2FF',
+        '#344593', '#6473FF', '#0018EC', '#8438FF', '#520085', '#CB38FF',
+        '#FF95C8', '#FF37C7'
+    ]
+
+    TAG = 'overlay'
+
+    def __init__(self, canvas: tk.Canvas, cache_size: int = 64):
+        """
+        Initialize the overlay.
+
+        Args:
+            canvas: Canvas the image is shown on
+            cache_size: Number of scaled box sets kept
+        """
+        self.canvas = canvas
+        self.visible = True
+        self.cache_size = cache_size
+        self._geometry: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        self._items: List[int] = []
+        self._colors: List[str] = []
+        self._shown = 0
+        self._current: Optional[tuple] = None
+
+    @classmethod
+    def color_of(cls, class_id: int) -> str:
+        """Get the outline color of a class."""
+        return cls.PALETTE[class_id % len(cls.PALETTE)]
+
+    def _scaled(self, key: Hashable, class_ids: np.ndarray, boxes: np.ndarray,
+                image_box: Tuple[int, int, int, int]) -> tuple:
+        """Get (class IDs, pixel corners) for a box set, scaling it once."""
+        cache_key = (key, image_box)
+        cached = self._geometry.get(cache_key)
+        if cached is not None:
+            self._geometry.move_to_end(cache_key)
+            return cached
+
+        import numpy as np
+
+        left, top, width, height = image_box
+        scale = np.array([width, height, width, height], dtype=np.float64)
+        offset = np.array([left, top, left, top], dtype=np.float64)
+        centers = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        corners = np.concatenate([centers[:, :2] - centers[:, 2:] / 2,
+                                  centers[:, :2] + centers[:, 2:] / 2], axis=1)
+        pixels = np.rint(corners * scale + offset).astype(np.int64)
+
+        cached = (np.asarray(class_ids).tolist(), pixels.tolist())
+        self._geometry[cache_key] = cached
+        if len(self._geometry) > self.cache_size:
+            self._geometry.popitem(last=False)
+
+        return cached
+
+    def draw(self, key: Hashable, class_ids: np.ndarray, boxes: np.ndarray,
+             image_box: Tuple[int, int, int, int]):
+        """
+        Show a set of boxes over the displayed image.
+
+        Args:
+            key: Identifies the box set (e.g. the image index) for caching
+            class_ids: Class ID of each box
+            boxes: Array of shape (n, 4) with normalized x_center, y_center,
+                width and height
+            image_box: Displayed image rectangle (left, top, width, height)
+        """
+        self._current = (key, class_ids, boxes, image_box)
+        if not self.visible:
+            return
+
+        ids, pixels = self._scaled(key, class_ids, boxes, image_box)
+        state = tk.NORMAL
+
+        while len(self._items) < len(pixels):
+            self._items.append(self.canvas.create_rectangle(
+                0, 0, 0, 0, width=2, tags=(self.TAG,), state=tk.HIDDEN))
+            self._colors.append('')
+
+        for index, (class_id, coords) in enumerate(zip(ids, pixels)):
+            item = self._items[index]
+            self.canvas.coords(item, *coords)
+            color = self.color_of(class_id)
+            if self._colors[index] != color:
+                self.canvas.itemconfigure(item, outline=color)
+                self._colors[index] = color
+            if index >= self._shown:
+                self.canvas.itemconfigure(item, state=state)
+
+        for item in self._items[len(pixels):self._shown]:
+            self.canvas.itemconfigure(item, state=tk.HIDDEN)
+
+        self._shown = len(pixels)
+        self.canvas.tag_raise(self.TAG)
+
+    def hide(self):
+        """Hide all boxes (e.g. while the next image is loading)."""
+        self.canvas.itemconfigure(self.TAG, state=tk.HIDDEN)
+        self._shown = 0
+        self._current = None
+
+    def clear(self):
+        """Hide all boxes and forget cached geometry (e.g. when labels change)."""
+        self.hide()
+        self._geometry.clear()
+
+    def set_visible(self, visible: bool):
+        """
+        Show or hide the overlay without touching the image.
+
+        Args:
+            visible: True to show boxes
+        """
+        self.visible = visible
+        current = self._current
+
+        if not visible:
+            self.canvas.itemconfigure(self.TAG, state=tk.HIDDEN)
+            self._shown = 0
+        elif current is not None:
+            self.draw(*current)
+
+
+class MetricsPanel(tk.Toplevel):
+    """
+    Debug window listing hot-path latencies and cache hit rates.
+
+    Collection is enabled while the window is open and disabled again when
+    it is closed, so instrumented code costs nothing the rest of the time.
+    """
+
+    COLUMNS = ('count', 'p50', 'p95', 'p99', 'max', 'hit_rate')
+
+    # Column headings; latency columns are in milliseconds
+    HEADINGS = {'count': 'count', 'p50': 'p50 (ms)', 'p95': 'p95 (ms)',
+                'p99': 'p99 (ms)', 'max': 'max (ms)', 'hit_rate': 'hit rate'}
+
+    def __init__(self, parent: tk.Widget, metrics, refresh_ms: int = 1000):
+        """
+        Open the panel.
+
+        Args:
+            parent: Parent widget
+            metrics: Metrics registry to display
+            refresh_ms: Milliseconds between refreshes
+        """
+        super().__init__(parent)
+        self.title("Performance Metrics")
+        self.metrics = metrics
+        self.refresh_ms = refresh_ms
+        self._job: Optional[str] = None
+
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, height=16)
+        self.tree.heading('#0', text='Timer / cache')
+        self.tree.column('#0', width=180)
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=self.HEADINGS[column])
+            self.tree.column(column, width=80, anchor=tk.E)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        ttk.Button(self, text="Reset", command=self._reset).pack(side=tk.RIGHT, padx=5, pady=5)
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.metrics.enable()
+        self._refresh()
+
+    @staticmethod
+    def rows(snapshot: Dict) -> List[Tuple[str, Tuple]]:
+        """
+        Format a metrics snapshot as table rows.
+
+        Args:
+            snapshot: Result of Metrics.snapshot()
+
+        Returns:
+            List of (name, values) with values in COLUMNS order; caches show
+            their lookup count and hit rate
+        """
+        rows = []
+
+        for name, timer in snapshot['timers'].items():
+            rows.append((name, (timer['count'], f"{timer['p50_ms']:.1f}",
+                                f"{timer['p95_ms']:.1f}", f"{timer['p99_ms']:.1f}",
+                                f"{timer['max_ms']:.1f}", '')))
+
+        for name, count in snapshot['counters'].items():
+            rows.append((name, (count, '', '', '', '', '')))
+
+        for name, stats in snapshot['caches'].items():
+            rows.append((name, (stats['hits'] + stats['misses'], '', '', '', '',
+                                f"{stats['hit_rate']:.1%}")))
+
+        return rows
+
+    def _refresh(self):
+        """Redraw the table and schedule the next refresh."""
+        rows = self.rows(self.metrics.snapshot())
+        shown = set(self.tree.get_children())
+
+        for name, values in rows:
+            if name in shown:
+                self.tree.item(name, values=values)
+            else:
+                self.tree.insert('', tk.END, iid=name, text=name, values=values)
+
+        stale = shown - {name for name, _ in rows}
+        if stale:
+            self.tree.delete(*stale)
+
+        self._job = self.after(self.refresh_ms, self._refresh)
+
+    def _reset(self):
+        """Drop the samples collected so far."""
+        self.metrics.reset()
+        self.tree.delete(*self.tree.get_children())
+
+    def close(self):
+        """Stop collecting and close the window."""
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        self.metrics.enable(False)
+        self.destroy()
@@ -0,0 +1,84 @@
+# -*- mode: python ; coding: utf-8 -*-
+#
+# Lean one-folder build. Unlike the one-file build it does not unpack the
+# bundle to a temporary folder on every launch, and it leaves out Pillow
+# plugins and Tk data the validator never uses.
+#
+#   pyinstaller --clean yolo_validator_lean.spec
+#
+# Check the time to first window with:
+#
+#   YOLO_VALIDATOR_STARTUP_CHECK=1 dist/YOLOv8_Validator/YOLOv8_Validator
+
+import pkgutil
+from pathlib import Path
+
+import PIL
+
+# Pillow plugins for the supported formats (.jpg, .jpeg, .png); JPEG files
+# may be MPO and carry TIFF-encoded EXIF data
+KEEP_PIL_PLUGINS = {'JpegImagePlugin', 'MpoImagePlugin', 'PngImagePlugin', 'TiffImagePlugin'}
+
+PIL_EXCLUDES = [
+    f'PIL.{module.name}' for module in pkgutil.iter_modules(PIL.__path__)
+    if module.name.endswith('ImagePlugin') and module.name not in KEEP_PIL_PLUGINS
+] + ['PIL.ImageQt', 'PIL.ImageShow']
+
+# Unused parts of the standard library and optional dependencies
+STDLIB_EXCLUDES = ['tkinter.tix', 'tkinter.dnd', 'tkinter.test', 'turtle', 'turtledemo',
+                   'idlelib', 'lib2to3', 'pydoc_data', 'pyarrow']
+
+# Tcl/Tk data folders the validator does not need: time zones, translated
+# messages, demos and sample images
+TK_DATA_EXCLUDES = {'tzdata', 'msgs', 'demos', 'images'}
+
+
+def _keep_data(dest_name):
+    parts = Path(dest_name).parts
+    return not (len(parts) > 1 and parts[0] in ('tcl', 'tk', '_tcl_data', '_tk_data')
+                and parts[1] in TK_DATA_EXCLUDES)
+
+
+a = Analysis(
+    ['../../run.py'],
+    pathex=['..'],
+    binaries=[],
+    datas=[],
+    hiddenimports=['PIL._tkinter_finder'],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=PIL_EXCLUDES + STDLIB_EXCLUDES,
+    noarchive=False,
+)
+
+a.datas = [entry for entry in a.datas if _keep_data(entry[0])]
+
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='YOLOv8_Validator',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,  # Decompressing UPX-packed libraries slows every launch
+    console=False,  # No console window for GUI app
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    name='YOLOv8_Validator',
+)
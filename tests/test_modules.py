@@ -1,9 +1,19 @@
 """
 Test suite for YOLOv8 Validator modules
 """
-import pytest
-from pathlib import Path
+import csv
+import json
+import os
+import subprocess
 import sys
+import time
+import tracemalloc
+from concurrent.futures import Future
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -11,6 +21,30 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from yolo_validator.modules.yaml_parser import YAMLParser
 from yolo_validator.modules.validator import InferenceValidator
 from yolo_validator.modules.data_exporter import DataExporter
+from yolo_validator.modules.data_importer import DataImporter
+from yolo_validator.modules.label_cache import LabelCache
+from yolo_validator.modules.label_table import LabelTable
+from yolo_validator.modules.session import ValidationSession
+from yolo_validator.modules.session_journal import SessionJournal
+from yolo_validator.modules.dataset_loader import DatasetLoader
+from yolo_validator.modules.evaluation import evaluate_detections, match_predictions
+from yolo_validator.modules.threshold_sweep import sweep_confidence
+from yolo_validator.modules.image_loader import ImageCache, ImagePrefetcher, decode_image
+from yolo_validator.modules.metrics import Metrics
+from yolo_validator.cli import main as cli_main
+from yolo_validator import benchmark
+from yolo_validator.widgets import BoxOverlay, ClassRows, ManualEntryPanel, MetricsPanel
+
+
+def _make_results_folder(root: Path, labels: dict, unlabelled=()):
+    """Create a fake YOLO results folder with the given label file contents."""
+    (root / "labels").mkdir(parents=True, exist_ok=True)
+    for stem, content in labels.items():
+        (root / f"{stem}.jpg").write_bytes(b"")
+        (root / "labels" / f"{stem}.txt").write_text(content)
+    for stem in unlabelled:
+        (root / f"{stem}.jpg").write_bytes(b"")
+    return root
 
 
 class TestYAMLParser:
@@ -39,6 +73,187 @@ class TestInferenceValidator:
         assert hasattr(InferenceValidator, 'SUPPORTED_IMAGE_FORMATS')
         assert '.jpg' in InferenceValidator.SUPPORTED_IMAGE_FORMATS
         assert '.png' in InferenceValidator.SUPPORTED_IMAGE_FORMATS
+    
+    def test_directory_index(self, tmp_path):
+        """Test that images are joined to label files by stem"""
+        _make_results_folder(tmp_path, {"b": "0 0.5 0.5 0.1 0.1\n", "a": ""},
+                             unlabelled=["c"])
+        (tmp_path / "notes.txt").write_text("not an image")
+        
+        validator = InferenceValidator(tmp_path, {0: "car"})
+        images = validator.get_image_files()
+        
+        assert [p.name for p in images] == ["a.jpg", "b.jpg", "c.jpg"]
+        assert validator.get_label_file(images[1]) == tmp_path / "labels" / "b.txt"
+        assert validator.get_label_file(images[2]) is None
+        assert validator.validate_labels() == {
+            'total_images': 3,
+            'images_with_labels': 2,
+            'images_without_labels': 1
+        }
+        assert validator.get_detections(images[0]) == []
+        assert validator.get_detections(images[1]) == [0]
+        assert validator.get_detections(images[2]) is None
+    
+    def test_label_table(self, tmp_path):
+        """Test that the bulk loader matches per-image parsing"""
+        _make_results_folder(tmp_path, {
+            "a": "0 0.5 0.5 0.2 0.2\n\n1 0.1 0.1 0.05 0.05 0.9\n",
+            "b": "",
+            "c": "1 0.3 0.3 0.1 0.1\nbad line\n"
+        }, unlabelled=["d"])
+        
+        validator = InferenceValidator(tmp_path, {0: "car", 1: "truck"})
+        table = validator.load_label_table()
+        images = validator.get_image_files()
+        
+        assert len(table) == 3
+        assert table.offsets.tolist() == [0, 2, 2, 3, 3]
+        for index, image_path in enumerate(images):
+            assert table.get_detections(index) == validator.get_detections(image_path)
+        assert table.class_histogram(2).tolist() == [1, 2]
+        assert table.count_matrix(2).tolist() == [[1, 1], [0, 0], [0, 1], [0, 0]]
+        assert np.isnan(table.conf[0]) and table.conf[1] == pytest.approx(0.9)
+        assert table.w[0] == pytest.approx(0.2)
+    
+    def test_label_table_malformed_values(self, tmp_path):
+        """Test that malformed values are counted like get_detections()"""
+        _make_results_folder(tmp_path, {
+            "a": "1.5 0.5 0.5 0.1 0.1\n0 0.5 0.5 0.1 0.1\n",
+            "b": "1 x 0.5 0.1 0.1\n0 0.2 0.2 0.1 0.1 bad\n",
+            "c": "1 0.3 0.3 0.1 0.1 0.7\n"
+        })
+        
+        validator = InferenceValidator(tmp_path, {0: "car", 1: "truck"})
+        table = validator.load_label_table()
+        
+        for index, image_path in enumerate(validator.get_image_files()):
+            assert table.get_detections(index) == validator.get_detections(image_path)
+        assert table.count_matrix(2).tolist() == [[0, 0], [1, 1], [0, 1]]
+        assert table.has_label.tolist() == [True, True, True]
+        assert np.isnan(table.x[0]) and table.x[1] == pytest.approx(0.2)
+        assert np.isnan(table.conf[1]) and table.conf[2] == pytest.approx(0.7)
+    
+    def test_recursive_folders(self, tmp_path):
+        """Test that nested predict folders are paired with their own labels"""
+        _make_results_folder(tmp_path / "cam1" / "day1" / "predict",
+                             {"a": "0 0.5 0.5 0.1 0.1\n"}, unlabelled=["b"])
+        _make_results_folder(tmp_path / "cam2" / "predict2", {
+            "a": "1 0.5 0.5 0.1 0.1\n1 0.2 0.2 0.1 0.1\n",
+            "c": "0 0.5 0.5 0.1 0.1\n"
+        })
+        # Box crops written by predict with save_crop=True are not images to review
+        (tmp_path / "cam2" / "predict2" / "crops" / "car").mkdir(parents=True)
+        (tmp_path / "cam2" / "predict2" / "crops" / "car" / "c.jpg").write_bytes(b"")
+        
+        assert InferenceValidator(tmp_path, {0: "car"}).get_image_files() == []
+        
+        reported = []
+        validator = InferenceValidator(tmp_path, {0: "car", 1: "truck"}, recursive=True,
+                                       scan_workers=2)
+        validator.refresh_index(lambda count, first: reported.append(count))
+        images = validator.get_image_files()
+        
+        assert validator.get_image_names() == [
+            "cam1/day1/predict/a.jpg", "cam1/day1/predict/b.jpg",
+            "cam2/predict2/a.jpg", "cam2/predict2/c.jpg"
+        ]
+        assert (validator.get_label_file(images[2])
+                == tmp_path / "cam2" / "predict2" / "labels" / "a.txt")
+        assert validator.get_detections(images[1]) is None
+        assert validator.get_detections(images[2]) == [1, 1]
+        assert validator.validate_labels()['images_with_labels'] == 3
+        expected = [[1, 0], [0, 0], [0, 2], [1, 0]]
+        assert validator.load_label_table().count_matrix(2).tolist() == expected
+        assert validator.count_detections(2, workers=2)[1].tolist() == expected
+        assert reported and reported[-1] <= 4
+    
+    def test_results_folder_patterns(self, tmp_path):
+        """Test that glob patterns and lists of folders are merged into one index"""
+        for name in ("predict", "predict2", "other"):
+            _make_results_folder(tmp_path / "runs" / name, {f"{name}_img": ""})
+        
+        validator = InferenceValidator(str(tmp_path / "runs" / "predict*"), {0: "car"})
+        assert validator.results_folder == tmp_path / "runs"
+        assert validator.get_image_names() == ["predict/predict_img.jpg",
+                                               "predict2/predict2_img.jpg"]
+        
+        validator = InferenceValidator([tmp_path / "runs" / "other", tmp_path / "runs",
+                                        tmp_path / "runs" / "other"], {0: "car"},
+                                       recursive=True)
+        assert len(validator.get_image_files()) == 3
+        
+        assert validator.state_folder == tmp_path / "runs"
+        
+        with pytest.raises(ValueError):
+            InferenceValidator(str(tmp_path / "missing*"), {0: "car"})
+        with pytest.raises(ValueError):
+            InferenceValidator([tmp_path / "runs", tmp_path / "missing"], {0: "car"})
+    
+    def test_state_folder(self, tmp_path, monkeypatch):
+        """Test that several roots keep the label cache outside the results folders"""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        monkeypatch.setattr(sys, "platform", "linux")
+        first = _make_results_folder(tmp_path / "one" / "predict", {"a": "0 0.5 0.5 0.1 0.1\n"})
+        second = _make_results_folder(tmp_path / "two" / "predict", {"b": ""})
+        
+        assert InferenceValidator(first, {0: "car"}).state_folder == first
+        
+        validator = InferenceValidator([first, second], {0: "car"})
+        reordered = InferenceValidator([second, first], {0: "car"})
+        assert validator.state_folder == reordered.state_folder
+        assert validator.state_folder.parent == tmp_path / "cache" / "yolo_validator" / "sessions"
+        assert InferenceValidator([first, tmp_path], {0: "car"}).state_folder != \
+            validator.state_folder
+        
+        assert validator.load_label_table(use_cache=True).count_matrix(1).tolist() == [[1], [0]]
+        assert (validator.state_folder / LabelCache.CACHE_FILENAME).exists()
+        assert not (tmp_path / LabelCache.CACHE_FILENAME).exists()
+    
+    def test_parallel_counts_match_serial(self, tmp_path):
+        """Test that process-pool aggregation gives the serial result"""
+        _make_results_folder(tmp_path, {
+            f"img{index}": "".join(f"{(index + box) % 3} 0.5 0.5 0.1 0.1\n"
+                                   for box in range(index % 4))
+            for index in range(9)
+        }, unlabelled=["x", "y"])
+        
+        validator = InferenceValidator(tmp_path, {0: "a", 1: "b", 2: "c"})
+        serial = validator.count_detections(3)
+        parallel = validator.count_detections(3, workers=2, chunk_size=2)
+        
+        assert serial[0].tolist() == parallel[0].tolist()
+        assert serial[1].tolist() == parallel[1].tolist()
+    
+    def test_label_cache(self, tmp_path):
+        """Test that cached reloads only reparse changed label files"""
+        _make_results_folder(tmp_path, {
+            "a": "0 0.5 0.5 0.2 0.2\n1 0.1 0.1 0.05 0.05\n",
+            "b": "1 0.3 0.3 0.1 0.1\n"
+        }, unlabelled=["c"])
+        
+        first = InferenceValidator(tmp_path, {0: "car", 1: "truck"})
+        first.load_label_table(use_cache=True)
+        assert (tmp_path / LabelCache.CACHE_FILENAME).exists()
+        
+        (tmp_path / "labels" / "b.txt").write_text("0 0.3 0.3 0.1 0.1\n0 0.2 0.2 0.1 0.1\n")
+        _make_results_folder(tmp_path, {"d": "1 0.4 0.4 0.1 0.1\n"})
+        
+        validator = InferenceValidator(tmp_path, {0: "car", 1: "truck"})
+        cache = LabelCache(tmp_path / LabelCache.CACHE_FILENAME, tmp_path)
+        images = validator.get_image_files()
+        labels = [validator.get_label_file(path) for path in images]
+        cached = cache.load(images, labels)
+        
+        assert (cache.reused_files, cache.parsed_files) == (1, 2)
+        expected = validator.load_label_table()
+        assert cached.offsets.tolist() == expected.offsets.tolist()
+        assert cached.class_id.tolist() == expected.class_id.tolist()
+        assert np.array_equal(cached.boxes(), expected.boxes())
+        assert cached.has_label.tolist() == expected.has_label.tolist()
+        
+        cache.load(images, labels)
+        assert (cache.reused_files, cache.parsed_files) == (3, 0)
 
 
 class TestDataExporter:
@@ -52,6 +267,848 @@ class TestDataExporter:
         """Test that DataExporter can be instantiated"""
         exporter = DataExporter()
         assert exporter is not None
+    
+    def test_stream_export(self, tmp_path):
+        """Test that generators are exported in one pass with counts"""
+        def records():
+            yield {'image_name': 'a.jpg', 'has_label_file': True, 'processed': True,
+                   'detected_counts': {'car': 2}, 'manual_counts': {'truck': 1}}
+            yield {'processed': False}
+        
+        output = tmp_path / "out.csv"
+        counts = DataExporter().export_stream_to_csv(records(), {0: 'car', 1: 'truck'},
+                                                     str(output))
+        
+        assert counts == {'exported': 1, 'skipped': 1}
+        assert output.read_text().splitlines() == [
+            'image_name,has_label_file,detected_car,detected_truck,'
+            'manual_car,manual_truck,total_detected,total_manual,processed',
+            'a.jpg,Yes,2,0,0,1,2,1,Yes'
+        ]
+
+
+    def test_summary_stats(self, tmp_path):
+        """Test per-class totals and agreement statistics"""
+        records = [
+            {'processed': True, 'detected_counts': {'car': 2}, 'manual_counts': {'car': 2}},
+            {'processed': True, 'detected_counts': {'car': 3}, 'manual_counts': {'car': 1}},
+            {'processed': True, 'detected_counts': {}, 'manual_counts': {'car': 1, 'truck': 4}},
+            {'processed': False, 'detected_counts': {'car': 9}}
+        ]
+        output = tmp_path / "summary.csv"
+        DataExporter().export_summary_stats(records, {0: 'car', 1: 'truck'}, str(output))
+        
+        with open(output, newline='') as f:
+            car, truck = list(csv.DictReader(f))
+        assert (car['total_detected'], car['total_manual'], car['total_count']) == ("5", "4", "9")
+        assert (car['images_with_detected'], car['images_with_manual']) == ("2", "3")
+        assert (car['over_count_images'], car['under_count_images']) == ("1", "1")
+        assert float(car['mean_abs_error']) == pytest.approx(1.0)
+        assert float(car['median_abs_error']) == 1.0
+        assert float(car['agreement_rate']) == pytest.approx(1 / 3, abs=1e-4)
+        assert (truck['total_manual'], truck['under_count_images']) == ("4", "1")
+    
+    def test_columnar_export(self, tmp_path):
+        """Test long and wide Parquet/Arrow exports of a session"""
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        
+        session = ValidationSession(['a.jpg', 'b.jpg', 'c.jpg'], {0: 'car', 1: 'truck'})
+        session.load_detections(np.array([True, True, False]),
+                                np.array([[1, 0], [2, 3], [0, 0]]))
+        session.save(0, {'car': 1})
+        session.save(2, {'truck': 5})
+        exporter = DataExporter()
+        
+        assert exporter.export_to_columnar(session, str(tmp_path / "long.parquet")) == 2
+        long_rows = pq.read_table(tmp_path / "long.parquet").to_pylist()
+        assert long_rows == [
+            {'image_name': 'a.jpg', 'class_name': 'car', 'detected': 1, 'manual': 1,
+             'has_label_file': True},
+            {'image_name': 'c.jpg', 'class_name': 'truck', 'detected': 0, 'manual': 5,
+             'has_label_file': False}
+        ]
+        
+        exporter.export_to_columnar(session, str(tmp_path / "wide.arrow"),
+                                    layout='wide', file_format='arrow')
+        wide = pa.ipc.open_file(str(tmp_path / "wide.arrow")).read_all().to_pydict()
+        assert wide['image_name'] == ['a.jpg', 'c.jpg']
+        assert wide['manual_truck'] == [0, 5]
+        assert wide['total_detected'] == [1, 0]
+        
+        # Reviewed true negatives keep a placeholder row
+        session.load_detections(np.array([True, True, False]),
+                                np.array([[1, 0], [0, 0], [0, 0]]))
+        session.save(1, {})
+        assert exporter.export_to_columnar(session, str(tmp_path / "long.parquet")) == 3
+        long_rows = pq.read_table(tmp_path / "long.parquet").to_pylist()
+        assert long_rows[1] == {'image_name': 'b.jpg', 'class_name': None, 'detected': 0,
+                                'manual': 0, 'has_label_file': True}
+        assert [row['image_name'] for row in long_rows] == ['a.jpg', 'b.jpg', 'c.jpg']
+
+
+class TestValidationSession:
+    """Tests for the array-backed session store"""
+    
+    def test_processed_counter(self):
+        """Test that the processed counter is maintained incrementally"""
+        session = ValidationSession(["a.jpg", "b.jpg"], {0: 'car', 1: 'truck'})
+        session.load_detections(np.array([True, False]), np.array([[2, 1], [0, 0]]))
+        
+        session.save(1, {'truck': 3, 'unknown': 5})
+        session.save(1, {'truck': 4})
+        
+        assert session.processed_count == 1
+        assert session.first_unprocessed() == 0
+        assert session.get_record(1) == {
+            'image_name': 'b.jpg', 'detected_counts': {}, 'manual_counts': {'truck': 4},
+            'has_label_file': False, 'processed': True
+        }
+        assert session.get_record(0)['detected_counts'] == {'car': 2, 'truck': 1}
+    
+    def test_export_matches_records(self, tmp_path):
+        """Test that exporting a session matches exporting its records"""
+        class_names = {0: 'car', 1: 'truck'}
+        records = [
+            {'image_name': 'a.jpg', 'has_label_file': True, 'processed': True,
+             'detected_counts': {'car': 2}, 'manual_counts': {'truck': 1}},
+            {'image_name': 'b.jpg', 'processed': False},
+            {'image_name': 'c.jpg', 'has_label_file': False, 'processed': True,
+             'detected_counts': {}, 'manual_counts': {'car': 3}}
+        ]
+        session = ValidationSession.from_records(records, class_names)
+        exporter = DataExporter()
+        
+        for name, data in (("list", records), ("session", session)):
+            exporter.export_to_csv(data, class_names, str(tmp_path / f"{name}.csv"))
+            exporter.export_summary_stats(data, class_names,
+                                          str(tmp_path / f"{name}_summary.csv"))
+        
+        assert (tmp_path / "list.csv").read_text() == (tmp_path / "session.csv").read_text()
+        assert ((tmp_path / "list_summary.csv").read_text()
+                == (tmp_path / "session_summary.csv").read_text())
+
+
+    def test_journal_replay_and_compaction(self, tmp_path):
+        """Test that journaled saves are replayed and compacted"""
+        class_names = {0: 'car', 1: 'truck'}
+        journal_path = tmp_path / SessionJournal.JOURNAL_FILENAME
+        session = ValidationSession(["a.jpg", "b.jpg", "c.jpg"], class_names)
+        journal = SessionJournal(journal_path)
+        
+        for count in range(3):
+            session.save(1, {'car': count + 1})
+            journal.append(session, 1)
+        session.save(0, {})
+        journal.append(session, 0)
+        with open(journal_path, 'a') as f:
+            f.write('{"image": "c.jpg", "man')  # Truncated by a crash
+        
+        resumed = ValidationSession(["a.jpg", "b.jpg", "c.jpg"], class_names)
+        replayed = SessionJournal(journal_path)
+        assert replayed.replay(resumed) == 4
+        assert resumed.processed.tolist() == [True, True, False]
+        assert resumed.get_manual_counts(1) == {'car': 3}
+        
+        resumed.save(2, {'truck': 1})
+        replayed.append(resumed, 2)
+        assert SessionJournal(journal_path).replay(
+            ValidationSession(["c.jpg"], class_names)) == 1
+        
+        replayed.compact(resumed)
+        assert len(journal_path.read_text().splitlines()) == 3
+
+    def test_journal_keeps_other_images(self, tmp_path):
+        """Test that compacting a subset load keeps records of unloaded images"""
+        class_names = {0: 'car'}
+        journal_path = tmp_path / SessionJournal.JOURNAL_FILENAME
+        full = ValidationSession(["a/x.jpg", "b/y.jpg"], class_names)
+        journal = SessionJournal(journal_path)
+        for count in range(2):
+            full.save(0, {'car': count + 1})
+            journal.append(full, 0)
+        full.save(1, {'car': 5})
+        journal.append(full, 1)
+
+        subset = ValidationSession(["a/x.jpg"], class_names)
+        replayed = SessionJournal(journal_path)
+        assert replayed.replay(subset) == 2
+        assert not replayed.is_compact(subset)
+        replayed.compact(subset)
+        assert replayed.is_compact(subset)
+        assert len(journal_path.read_text().splitlines()) == 2
+
+        restored = ValidationSession(["a/x.jpg", "b/y.jpg"], class_names)
+        SessionJournal(journal_path).replay(restored)
+        assert restored.get_manual_counts(0) == {'car': 2}
+        assert restored.get_manual_counts(1) == {'car': 5}
+
+    def test_csv_round_trip(self, tmp_path):
+        """Test that an exported CSV can be imported back into a session"""
+        class_names = {0: 'car', 1: 'truck'}
+        names = ["a.jpg", "b.jpg", "c.jpg"]
+        original = ValidationSession(names, class_names)
+        original.load_detections(np.array([True, True, False]),
+                                 np.array([[1, 0], [2, 3], [0, 0]]))
+        original.save(0, {'car': 1})
+        original.save(2, {'truck': 5})
+        DataExporter().export_to_csv(original, class_names, str(tmp_path / "out.csv"))
+        
+        resumed = ValidationSession(names + ["d.jpg"], class_names)
+        counts = DataImporter().import_csv(tmp_path / "out.csv", resumed)
+        
+        assert counts == {'imported': 2, 'skipped': 0}
+        assert resumed.processed.tolist() == [True, False, True, False]
+        assert resumed.processed_count == 2
+        assert resumed.first_unprocessed() == 1
+        assert resumed.manual[:3].tolist() == original.manual.tolist()
+        assert resumed.detected[[0, 2]].tolist() == original.detected[[0, 2]].tolist()
+        assert resumed.has_label[:3].tolist() == [True, False, False]
+
+
+class TestEvaluation:
+    """Tests for matching detections to ground truth"""
+    
+    def test_evaluate_detections(self, tmp_path):
+        """Test greedy IoU matching, TP/FP/FN and AP"""
+        results = _make_results_folder(tmp_path / "results", {
+            # One exact match, one duplicate box, one wrong class
+            "a": "0 0.5 0.5 0.2 0.2 0.9\n0 0.5 0.5 0.2 0.2 0.8\n1 0.2 0.2 0.1 0.1 0.7\n",
+            # Shifted box: IoU 0.6, a match at 0.5 but not at 0.95
+            "b": "0 0.525 0.5 0.2 0.2 0.6\n"
+        })
+        truth = tmp_path / "truth"
+        truth.mkdir()
+        (truth / "a.txt").write_text("0 0.5 0.5 0.2 0.2\n0 0.2 0.2 0.1 0.1\n")
+        (truth / "b.txt").write_text("0 0.5 0.5 0.2 0.2\n")
+        validator = InferenceValidator(results, {0: 'car', 1: 'truck'})
+        
+        metrics = evaluate_detections(validator.load_label_table(),
+                                      validator.load_ground_truth_table(truth), 2)
+        
+        assert metrics['tp'].tolist() == [2, 0]
+        assert metrics['fp'].tolist() == [1, 1]
+        assert metrics['fn'].tolist() == [1, 0]
+        assert metrics['true_positive'][:, 0].tolist() == [True, False, False, True]
+        assert not metrics['true_positive'][3, -1]
+        # 101-point interpolation: precision 1 up to recall 1/3, 2/3 up to 2/3
+        assert metrics['ap50'][0] == pytest.approx((34 + 33 * 2 / 3) / 101)
+        assert np.isnan(metrics['ap50'][1])
+        assert metrics['map50'] == pytest.approx(metrics['ap50'][0])
+        assert metrics['ap50_95'][0] < metrics['ap50'][0]
+
+    def test_match_falls_back_to_next_best(self, tmp_path):
+        """Test that a prediction losing its best ground truth tries the next one"""
+        results = _make_results_folder(tmp_path / "results", {
+            # A covers X exactly; B overlaps X and Y equally (IoU ~0.82)
+            "a": "0 0.5 0.5 0.2 0.2 0.9\n0 0.52 0.5 0.2 0.2 0.8\n"
+        })
+        truth = tmp_path / "truth"
+        truth.mkdir()
+        (truth / "a.txt").write_text("0 0.5 0.5 0.2 0.2\n0 0.54 0.5 0.2 0.2\n")
+        validator = InferenceValidator(results, {0: 'car'})
+
+        metrics = evaluate_detections(validator.load_label_table(),
+                                      validator.load_ground_truth_table(truth), 1)
+
+        assert metrics['true_positive'][:, 0].tolist() == [True, True]
+        assert metrics['tp'].tolist() == [2]
+        assert metrics['fn'].tolist() == [0]
+
+
+    def test_match_memory_scales_with_boxes(self):
+        """Test that a huge images x classes space with few boxes stays small"""
+        num_images, num_boxes = 200_000, 1000
+        rng = np.random.default_rng(0)
+        image_index = np.sort(rng.choice(num_images, num_boxes, replace=False))
+        offsets = np.searchsorted(image_index, np.arange(num_images + 1))
+        class_id = rng.integers(0, 600, num_boxes)
+        boxes = np.tile([0.5, 0.5, 0.2, 0.2], (num_boxes, 1))
+        paths = [Path(f"{index}.jpg") for index in range(num_images)]
+        predictions = LabelTable(paths, np.ones(num_images, bool), offsets, class_id, boxes,
+                                 conf=np.ones(num_boxes))
+        truth = LabelTable(paths, np.ones(num_images, bool), offsets, class_id, boxes)
+        
+        tracemalloc.start()
+        try:
+            true_positive = match_predictions(predictions, truth, 600)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        
+        assert true_positive.all()
+        assert peak < 64 * 1024 * 1024
+
+
+class TestThresholdSweep:
+    """Tests for the confidence-threshold sweep"""
+    
+    def test_sweep_matches_rescan(self, tmp_path):
+        """Test that the single-pass sweep matches re-counting per threshold"""
+        results = _make_results_folder(tmp_path / "results", {
+            "a": "0 0.5 0.5 0.1 0.1 0.9\n0 0.5 0.5 0.1 0.1 0.4\n0 0.5 0.5 0.1 0.1 0.2\n",
+            "b": "0 0.5 0.5 0.1 0.1 0.7\n1 0.5 0.5 0.1 0.1 0.3\n",
+            "c": "1 0.5 0.5 0.1 0.1 0.6\n"
+        })
+        validator = InferenceValidator(results, {0: 'car', 1: 'truck'})
+        table = validator.load_label_table()
+        session = ValidationSession(["a.jpg", "b.jpg", "c.jpg"], {0: 'car', 1: 'truck'})
+        session.save(0, {'car': 2})
+        session.save(1, {'car': 1, 'truck': 1})
+        
+        sweep = sweep_confidence(table, session)
+        
+        for column, threshold in enumerate(sweep['thresholds']):
+            kept = table.conf >= np.float32(threshold)
+            detected = np.zeros((3, 2), dtype=int)
+            np.add.at(detected, (table.image_index[kept], table.class_id[kept]), 1)
+            error = np.abs(detected - session.manual)[:2].sum(axis=0)
+            assert sweep['abs_error'][:, column].tolist() == error.tolist()
+        
+        assert sweep['best_threshold'].tolist() == [0.4, 0.3]
+        assert sweep['best_error'].tolist() == [0, 0]
+        assert sweep['overall_best_threshold'] == pytest.approx(0.3)
+        assert sweep['detected'][:, 50].tolist() == [2, 0]
+
+
+class TestManualEntryRows:
+    """Tests for the row model of the virtualized manual entry panel"""
+    
+    def test_present_recent_filter(self):
+        """Test that the filter shows present, recent and counted classes in order"""
+        rows = ClassRows(max_recent=2)
+        rows.set_classes([f"class{i}" for i in range(600)])
+        assert len(rows.rows) == 600
+        
+        rows.set_filter(True)
+        rows.set_counts({'class7': 2, 'unknown': 1}, present=['class500', 'class3'])
+        assert rows.rows == ['class3', 'class7', 'class500']
+        assert rows.counts == {'class7': 2}
+        
+        rows.mark_used(['class9', 'class1', 'class2'])
+        rows.set_counts({}, present=[])
+        assert rows.rows == ['class1', 'class2']
+        
+        rows.set_count('class1', 0)
+        rows.set_count('class5', 3)
+        assert rows.counts == {'class5': 3}
+        
+        rows.set_filter(False)
+        assert len(rows.rows) == 600
+    
+    def test_edit_matches_saved_value(self):
+        """Test that cleared fields save 0 and invalid text is reverted"""
+        panel = ManualEntryPanel.__new__(ManualEntryPanel)
+        panel.model = ClassRows()
+        panel.model.set_classes(['car'])
+        panel.model.set_counts({'car': 3})
+        panel._vars = [_FakeVar("3")]
+        panel._bound = ['car']
+        panel._updating = False
+        
+        panel._vars[0].set("")
+        panel._on_edit(0)
+        assert panel.get_counts() == {}
+        
+        panel._vars[0].set("5")
+        panel._on_edit(0)
+        panel._vars[0].set("5x")
+        panel._on_edit(0)
+        assert panel.get_counts() == {'car': 5}
+        assert panel._vars[0].get() == "5"
+        
+        panel._vars[0].set("-2")
+        panel._on_edit(0)
+        assert (panel.get_counts(), panel._vars[0].get()) == ({'car': 5}, "5")
+
+
+class _FakeVar:
+    """Stand-in for tk.StringVar"""
+    
+    def __init__(self, value=""):
+        self.value = value
+    
+    def get(self):
+        return self.value
+    
+    def set(self, value):
+        self.value = value
+
+
+class _FakeCanvas:
+    """Stand-in for tk.Canvas that records rectangle items"""
+    
+    def __init__(self):
+        self.items = {}
+    
+    def create_rectangle(self, *coords, **options):
+        self.items[len(self.items) + 1] = {'coords': list(coords), **options}
+        return len(self.items)
+    
+    def coords(self, item, *coords):
+        self.items[item]['coords'] = list(coords)
+    
+    def itemconfigure(self, item, **options):
+        targets = self.items.values() if item == BoxOverlay.TAG else [self.items[item]]
+        for target in targets:
+            target.update(options)
+    
+    def tag_raise(self, tag):
+        pass
+    
+    def shown(self):
+        return [item['coords'] for item in self.items.values() if item['state'] == 'normal']
+
+
+class TestBoxOverlay:
+    """Tests for the pooled canvas box overlay"""
+    
+    def test_draw_reuses_items(self):
+        """Test box scaling, item reuse and toggling"""
+        canvas = _FakeCanvas()
+        overlay = BoxOverlay(canvas)
+        boxes = np.array([[0.5, 0.5, 0.5, 0.5], [0.25, 0.25, 0.1, 0.1]])
+        
+        overlay.draw(0, np.array([0, 1]), boxes, (10, 20, 200, 100))
+        assert canvas.shown() == [[60, 45, 160, 95], [50, 40, 70, 50]]
+        assert canvas.items[2]['outline'] == BoxOverlay.color_of(1)
+        
+        overlay.draw(1, np.array([2]), boxes[:1], (0, 0, 100, 100))
+        assert canvas.shown() == [[25, 25, 75, 75]]
+        assert len(canvas.items) == 2
+        
+        overlay.set_visible(False)
+        assert canvas.shown() == []
+        overlay.set_visible(True)
+        assert canvas.shown() == [[25, 25, 75, 75]]
+
+    def test_clear_drops_cached_geometry(self):
+        """Test that boxes drawn after clear() are rescaled for the same key"""
+        canvas = _FakeCanvas()
+        overlay = BoxOverlay(canvas)
+        overlay.draw((0, True), np.array([0]), np.array([[0.5, 0.5, 0.5, 0.5]]),
+                     (0, 0, 100, 100))
+
+        overlay.clear()
+        assert canvas.shown() == []
+        overlay.draw((0, True), np.array([0]), np.array([[0.2, 0.2, 0.2, 0.2]]),
+                     (0, 0, 100, 100))
+        assert canvas.shown() == [[10, 10, 30, 30]]
+
+
+class _FakeLabel:
+    """Stand-in for ttk.Label that records its text and packing"""
+    
+    def __init__(self, parent=None, **options):
+        self.options = dict(options)
+        self.packed = False
+        self.updates = 0
+    
+    def config(self, **options):
+        self.options.update(options)
+        self.updates += 1
+    
+    def pack(self, **options):
+        self.packed = True
+    
+    def pack_forget(self):
+        self.packed = False
+
+
+class TestDetectionRows:
+    """Tests for the pooled per-class detection rows"""
+    
+    def _make_app(self, monkeypatch):
+        pytest.importorskip("tkinter")
+        from yolo_validator import app as app_module
+        
+        monkeypatch.setattr(app_module.ttk, "Label", _FakeLabel)
+        app = app_module.YOLOValidatorApp.__new__(app_module.YOLOValidatorApp)
+        app.detection_frame = None
+        app.detection_text = _FakeLabel()
+        app.detection_rows = []
+        app.detection_row_texts = []
+        app.detection_rows_shown = 0
+        app.validator = object()
+        app.class_names = {0: 'car', 1: 'truck', 2: 'bus'}
+        # car/truck/bus, truck, two cars, no label file
+        app.label_table = LabelTable([Path(f"{i}.jpg") for i in range(4)],
+                                     np.array([True, True, True, False]),
+                                     np.array([0, 3, 4, 6, 6]), np.array([0, 1, 2, 1, 0, 0]),
+                                     np.zeros((6, 4)))
+        app.images = app.label_table.image_paths
+        return app
+    
+    def _show(self, app, index):
+        app.current_index = index
+        app._load_detections()
+        return [row.options['text'] for row in app.detection_rows if row.packed]
+    
+    def test_rows_reused_and_hidden(self, monkeypatch):
+        """Test that rows are reused, surplus rows hidden and counts updated"""
+        app = self._make_app(monkeypatch)
+        
+        assert self._show(app, 0) == ["  • car: 1", "  • truck: 1", "  • bus: 1"]
+        rows = list(app.detection_rows)
+        
+        assert self._show(app, 1) == ["  • truck: 1"]
+        assert [row.packed for row in rows] == [True, False, False]
+        
+        assert self._show(app, 2) == ["  • car: 2"]
+        assert self._show(app, 0) == ["  • car: 1", "  • truck: 1", "  • bus: 1"]
+        assert app.detection_rows == rows
+        
+        # Unchanged rows are not reconfigured
+        updates = [row.updates for row in rows]
+        self._show(app, 0)
+        assert [row.updates for row in rows] == updates
+        
+        assert self._show(app, 3) == []
+        assert app.detection_rows_shown == 0
+        assert "No label file" in app.detection_text.options['text']
+        assert app.detection_rows == rows
+
+
+class TestDatasetLoader:
+    """Tests for background dataset loading"""
+
+    def _make_dataset(self, tmp_path):
+        results = _make_results_folder(tmp_path / "results", {
+            "a": "0 0.5 0.5 0.2 0.2\n1 0.3 0.3 0.1 0.1\n"
+        }, unlabelled=["b"])
+        yaml_path = tmp_path / "data.yaml"
+        yaml_path.write_text("nc: 2\nnames: ['car', 'truck']\n")
+        return results, yaml_path
+
+    def test_events(self, tmp_path):
+        """Test that loading reports the scan, the index and the label table"""
+        loader = DatasetLoader(*self._make_dataset(tmp_path))
+        loader.start()
+        loader.join(10)
+
+        events = loader.drain()
+        assert [event[0] for event in events] == ['scan', 'indexed', 'labels', 'done']
+        assert [path.name for path in events[1][2]] == ["a.jpg", "b.jpg"]
+        assert events[2][1] == events[2][2]
+        assert events[3][1].count_matrix(2).tolist() == [[1, 1], [0, 0]]
+        assert loader.class_names == {0: 'car', 1: 'truck'}
+
+    def test_cancel(self, tmp_path):
+        """Test that a cancelled load stops at its first progress check"""
+        loader = DatasetLoader(*self._make_dataset(tmp_path))
+        loader.cancel()
+        loader.start()
+        loader.join(10)
+
+        assert [event[0] for event in loader.drain()] == ['cancelled']
+
+    def test_error(self, tmp_path):
+        """Test that loading errors are reported as events"""
+        loader = DatasetLoader(tmp_path, tmp_path / "missing.yaml")
+        loader.start()
+        loader.join(10)
+
+        assert [event[0] for event in loader.drain()] == ['error']
+
+
+class TestBatchCLI:
+    """Tests for the headless batch command"""
+    
+    def test_batch_run(self, tmp_path):
+        """Test that batch mode writes per-image counts and merges manual counts"""
+        results = _make_results_folder(tmp_path / "results", {
+            "a": "0 0.5 0.5 0.2 0.2\n0 0.1 0.1 0.05 0.05\n1 0.3 0.3 0.1 0.1\n"
+        }, unlabelled=["b"])
+        yaml_path = tmp_path / "data.yaml"
+        yaml_path.write_text("nc: 2\nnames: ['car', 'truck']\n")
+        manual_path = tmp_path / "manual.csv"
+        manual_path.write_text("image_name,manual_car,manual_truck\nb.jpg,2,0\n")
+        output = tmp_path / "out.csv"
+        
+        assert cli_main(["batch", str(results), "--yaml", str(yaml_path),
+                         "-o", str(output)]) == 0
+        
+        with open(output, newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert [row['image_name'] for row in rows] == ["a.jpg", "b.jpg"]
+        assert (rows[0]['detected_car'], rows[0]['detected_truck']) == ("2", "1")
+        assert (tmp_path / "out_summary.csv").exists()
+        
+        assert cli_main(["batch", str(results), "--yaml", str(yaml_path),
+                         "--manual", str(manual_path), "-o", str(output)]) == 0
+        
+        with open(output, newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert [row['image_name'] for row in rows] == ["b.jpg"]
+        assert (rows[0]['has_label_file'], rows[0]['manual_car']) == ("No", "2")
+    
+    def test_partial_manual_coverage(self, tmp_path):
+        """Test that images missing from --manual are left out of the summary"""
+        results = _make_results_folder(tmp_path / "results", {
+            stem: "0 0.5 0.5 0.2 0.2\n" for stem in "abcd"
+        })
+        yaml_path = tmp_path / "data.yaml"
+        yaml_path.write_text("nc: 1\nnames: ['car']\n")
+        manual_path = tmp_path / "manual.csv"
+        manual_path.write_text("image_name,manual_car\na.jpg,1\n")
+        output = tmp_path / "out.csv"
+        
+        assert cli_main(["batch", str(results), "--yaml", str(yaml_path),
+                         "--manual", str(manual_path), "-o", str(output)]) == 0
+        
+        with open(tmp_path / "out_summary.csv", newline='') as f:
+            summary = next(csv.DictReader(f))
+        assert (summary['total_detected'], summary['total_manual']) == ("1", "1")
+        assert float(summary['mean_abs_error']) == 0.0
+        assert float(summary['agreement_rate']) == 1.0
+        with open(output, newline='') as f:
+            assert [row['image_name'] for row in csv.DictReader(f)] == ["a.jpg"]
+        
+        manual_path.write_text("image_name,manual_car\nz.jpg,1\n")
+        assert cli_main(["batch", str(results), "--yaml", str(yaml_path),
+                         "--manual", str(manual_path), "-o", str(output)]) == 1
+    
+    def test_no_gui_imports(self):
+        """Test that the CLI does not import tkinter or PIL"""
+        code = ("import sys; import yolo_validator.cli; "
+                "sys.exit(int('tkinter' in sys.modules or 'PIL' in sys.modules))")
+        env = dict(os.environ, PYTHONPATH=str(Path(__file__).parent.parent / "src"))
+        assert subprocess.run([sys.executable, "-c", code], env=env).returncode == 0
+
+
+class TestBenchmark:
+    """Tests for the synthetic benchmark harness"""
+    
+    def test_synthetic_results(self, tmp_path):
+        """Test that synthetic folders follow the requested shape"""
+        yaml_path = benchmark.make_synthetic_results(
+            tmp_path, 50, 3, mean_boxes=2, distribution='constant',
+            missing_label_ratio=0.2, seed=1)
+        class_names = YAMLParser(yaml_path).get_class_names()
+        validator = InferenceValidator(tmp_path, class_names)
+        summary = validator.validate_labels()
+        
+        assert class_names == {0: 'class_0', 1: 'class_1', 2: 'class_2'}
+        assert summary['total_images'] == 50
+        assert 0 < summary['images_without_labels'] < 25
+        assert len(validator.load_label_table()) == 2 * summary['images_with_labels']
+    
+    def test_run_and_compare(self, tmp_path):
+        """Test that benchmark results round-trip and regressions are flagged"""
+        output = tmp_path / "bench.json"
+        assert cli_main(["benchmark", "--images", "30", "--repeat", "1",
+                         "-o", str(output)]) == 0
+        
+        results = benchmark.load_results(output)
+        assert list(results['timings']) == list(benchmark.BENCHMARKS)
+        
+        slower = {name: {'min_s': timing['min_s'] * 2 + 1}
+                  for name, timing in results['timings'].items()}
+        comparison = benchmark.compare_to_baseline(slower, results['timings'])
+        assert all(entry['regression'] for entry in comparison)
+        comparison = benchmark.compare_to_baseline(results['timings'], results['timings'])
+        assert not any(entry['regression'] for entry in comparison)
+
+
+class TestMetrics:
+    """Tests for the timing instrumentation"""
+    
+    def test_disabled_records_nothing(self):
+        """Test that timers and counters are no-ops until enabled"""
+        registry = Metrics()
+        
+        @registry.timed('work')
+        def work():
+            return 42
+        
+        with registry.timer('block'):
+            pass
+        registry.count('events')
+        
+        assert work() == 42
+        snapshot = registry.snapshot()
+        assert (snapshot['timers'], snapshot['counters']) == ({}, {})
+    
+    def test_percentiles_and_caches(self):
+        """Test that enabled timers report percentiles and cache hit rates"""
+        registry = Metrics(max_samples=100)
+        registry.enable()
+        for ms in range(1, 101):
+            registry.record('decode', ms / 1000)
+        registry.count('prefetch.ready', 3)
+        
+        cache = ImageCache(100)
+        cache.put('a', object(), 1)
+        cache.get('a')
+        cache.get('b')
+        registry.register_cache('preview_cache', cache)
+        
+        snapshot = registry.snapshot()
+        decode = snapshot['timers']['decode']
+        assert decode['count'] == 100
+        assert decode['p50_ms'] == pytest.approx(50.5)
+        assert decode['p99_ms'] == pytest.approx(99.01)
+        assert snapshot['counters'] == {'prefetch.ready': 3}
+        assert snapshot['caches']['preview_cache']['hit_rate'] == 0.5
+        
+        rows = dict(MetricsPanel.rows(snapshot))
+        assert rows['decode'][:2] == (100, "50.5")
+        assert rows['preview_cache'][1] == ''
+        assert rows['preview_cache'][MetricsPanel.COLUMNS.index('hit_rate')] == "50.0%"
+    
+    def test_cli_profile(self, tmp_path):
+        """Test that --profile writes the timings of a headless run"""
+        results = _make_results_folder(tmp_path / "results", {"a": "0 0.5 0.5 0.2 0.2\n"})
+        yaml_path = tmp_path / "data.yaml"
+        yaml_path.write_text("nc: 1\nnames: ['car']\n")
+        profile = tmp_path / "profile.json"
+        
+        assert cli_main(["--profile", str(profile), "batch", str(results),
+                         "--yaml", str(yaml_path), "-o", str(tmp_path / "out.csv")]) == 0
+        
+        with open(profile) as f:
+            timers = json.load(f)['timers']
+        assert {'scan', 'count_detections', 'export.csv'} <= set(timers)
+        assert timers['export.csv']['count'] == 1
+
+
+class _FakeRoot:
+    """Stand-in for tk.Tk that runs after() callbacks on demand"""
+    
+    def __init__(self):
+        self.pending = []
+    
+    def after(self, ms, func, *args):
+        self.pending.append((func, args))
+        return len(self.pending)
+    
+    def run_pending(self):
+        pending, self.pending = self.pending, []
+        for func, args in pending:
+            func(*args)
+
+
+class TestImagePrefetcher:
+    """Tests for the background image decoder"""
+    
+    def test_request_and_prefetch(self, tmp_path):
+        """Test that decodes are delivered through after() and neighbours are cached"""
+        paths = []
+        for index in range(4):
+            path = tmp_path / f"{index}.png"
+            Image.new("RGB", (400, 200), "red").save(path)
+            paths.append(path)
+        
+        root = _FakeRoot()
+        prefetcher = ImagePrefetcher(root, ahead=2, behind=1)
+        received = []
+        try:
+            prefetcher.request(paths[0], (100, 100),
+                               lambda *result: received.append(result))
+            prefetcher.prefetch(paths, 0, (100, 100))
+            
+            for _ in range(500):
+                root.run_pending()
+                if received:
+                    break
+                time.sleep(0.01)
+            
+            path, size, image, error = received[0]
+            assert (path, error) == (paths[0], None)
+            assert image.size == (100, 50)
+            
+            # Neighbours are decoded without being requested
+            prefetcher._futures[(paths[2], (100, 100))].result(timeout=5)
+            prefetcher.request(paths[2], (100, 100),
+                               lambda *result: received.append(result))
+            assert len(received) == 2
+            assert (paths[3], (100, 100)) not in prefetcher._futures
+        finally:
+            prefetcher.shutdown()
+    
+    def test_poll_waits_for_queued_key(self):
+        """Test that polling continues while a done future's key is not queued yet"""
+        root = _FakeRoot()
+        prefetcher = ImagePrefetcher(root)
+        key = (Path("a.png"), (10, 10))
+        received = []
+        future = Future()
+        prefetcher._futures[key] = future
+        prefetcher._callbacks[key] = [lambda *result: received.append(result)]
+        prefetcher._schedule_poll()
+        try:
+            # set_result marks the future done before done-callbacks run
+            future.set_result("image")
+            root.run_pending()
+            prefetcher._finished.put(key)
+            root.run_pending()
+            
+            assert received == [(Path("a.png"), (10, 10), "image", None)]
+            root.run_pending()
+            assert root.pending == []
+        finally:
+            prefetcher.shutdown()
+    
+    def test_decode_image_draft(self, tmp_path):
+        """Test that fast and full quality decoding give the same preview size"""
+        path = tmp_path / "large.jpg"
+        Image.new("RGB", (2000, 1000), "blue").save(path)
+        
+        fast = decode_image(path, (200, 200))
+        full = decode_image(path, (200, 200), full_quality=True)
+        
+        assert fast.size == full.size == (200, 100)
+    
+    def test_resize_from_source(self, tmp_path, monkeypatch):
+        """Test that new sizes are scaled from the cached source and stale requests dropped"""
+        import yolo_validator.modules.image_loader as image_loader
+        path = tmp_path / "large.png"
+        Image.new("RGB", (2000, 1000), "green").save(path)
+        decodes = []
+        real_decode = image_loader.decode_image
+        monkeypatch.setattr(image_loader, "decode_image",
+                            lambda *args: decodes.append(args) or real_decode(*args))
+        
+        root = _FakeRoot()
+        prefetcher = ImagePrefetcher(root, max_workers=1, source_size=(800, 800))
+        received = []
+        try:
+            for size in [(100, 100), (300, 300), (500, 500)]:
+                prefetcher.request(path, size, lambda *result: received.append(result))
+            prefetcher.cancel_stale(path, (500, 500))
+            
+            for _ in range(500):
+                root.run_pending()
+                if received:
+                    break
+                time.sleep(0.01)
+            
+            assert [result[1] for result in received] == [(500, 500)]
+            assert received[0][2].size == (500, 250)
+            assert len(decodes) == 1
+        finally:
+            prefetcher.shutdown()
+
+
+class TestImageCache:
+    """Tests for the LRU preview cache"""
+    
+    def test_byte_budget_eviction(self):
+        """Test that entries are evicted by size in least-recently-used order"""
+        cache = ImageCache(max_bytes=100)
+        cache.put("a", "A", 40)
+        cache.put("b", "B", 40)
+        assert cache.get("a") == "A"
+        
+        cache.put("c", "C", 40)
+        assert "b" not in cache
+        assert cache.get("b") is None
+        assert cache.current_bytes == 80
+        
+        cache.put("huge", "H", 200)
+        assert "huge" not in cache
+        assert cache.get_stats()['hits'] == 1
+        assert cache.get_stats()['misses'] == 1
 
 
 class TestPackage:
@@ -71,6 +1128,14 @@ class TestPackage:
         """Test that license is defined"""
         from yolo_validator import __license__
         assert __license__ == "MIT"
+    
+    def test_gui_lazy_imports(self):
+        """Test that the GUI module defers NumPy, Pillow and PyYAML"""
+        pytest.importorskip("tkinter")
+        code = ("import sys; import yolo_validator.app; "
+                "sys.exit(int(any(m in sys.modules for m in ('numpy', 'PIL', 'yaml'))))")
+        env = dict(os.environ, PYTHONPATH=str(Path(__file__).parent.parent / "src"))
+        assert subprocess.run([sys.executable, "-c", code], env=env).returncode == 0
 
 
 if __name__ == "__main__":